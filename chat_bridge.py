@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify, render_template
 import json
 import os
+from src.autonomous_agents.analysis.knowledge_index import get_knowledge_index
 
 app = Flask(__name__)
 COMMAND_FILE = "data/local_commands.json"
@@ -38,6 +39,16 @@ def poll_logs():
             
     return jsonify({"lines": lines})
 
+@app.route('/search')
+def search_knowledge():
+    # Full-text zoeken in research, outputs, PROJECT_MEMORY en lessen (bm25)
+    query = request.args.get('q', '').strip()
+    if not query: return jsonify({"error": "Parameter 'q' ontbreekt"}), 400
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    source = request.args.get('source') or None
+    results = get_knowledge_index().search(query, limit=limit, source=source)
+    return jsonify({"query": query, "count": len(results), "results": results})
+
 if __name__ == '__main__':
     print("PHOENIX WEB SERVER GESTART OP POORT 5000")
     app.run(host='0.0.0.0', port=5000)
@@ -107,3 +107,28 @@ class AIService:
                 raise  # Her-raise de exception om de retry te activeren (belangrijk!)
 
             raise  # Her-raise andere exceptions om de retry te activeren
+
+    async def generate_text_stream(self, prompt):
+        """
+        Streamt het antwoord in stukken, zodat de aanroeper de output al kan
+        controleren (en afbreken) terwijl hij nog gegenereerd wordt.
+        Geen backoff: een afgebroken stream opnieuw proberen is aan de aanroeper.
+        """
+        if not self.online:
+            self._initialize_connection()
+        if not self.online:
+            return
+
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # Chunk zonder tekst (bijv. alleen safety metadata)
+                if text:
+                    yield text
+        except Exception as e:
+            if "403" in str(e):
+                self._rotate_key()
+            raise
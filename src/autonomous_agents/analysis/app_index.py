@@ -0,0 +1,147 @@
+import os
+import re
+import difflib
+import unicodedata
+
+APP_STOPWORDS = {
+    "web", "voeg", "een", "toe", "maak", "bouw", "de", "het", "met", "bij", "aan",
+    "van", "voor", "en", "in", "op", "die", "dat", "deze", "als", "om", "te", "nieuwe",
+    "nieuw", "add", "the", "a", "an", "with", "for", "to", "of", "and", "make", "build",
+    "app", "html", "pagina", "page", "phoenix", "os", "simple", "example", "update",
+    "verbeter", "wijzig", "pas", "fix", "improve", "change", "maken", "toevoegen",
+}
+SLUG_WORDS = 4
+SLUG_LENGTH = 40
+UPDATE_SCORE = 0.6  # Vanaf deze score is een bestaande app de bedoelde
+NEW_SCORE = 0.3  # Onder deze score is het zeker een nieuwe app
+MIN_MARGIN = 0.15  # Minimaal verschil tussen nummer 1 en 2 voor een zekere keuze
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_H1 = re.compile(r"<h1[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _ascii(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def keywords(text):
+    """Betekenisvolle, genormaliseerde woorden ('Power-up Countdown' -> ['power', 'up', 'countdown'])."""
+    words = re.split(r"[^a-z0-9]+", _ascii(text).lower())
+    return [w for w in words if len(w) > 1 and w not in APP_STOPWORDS]
+
+
+def slugify(instruction, max_words=SLUG_WORDS, max_length=SLUG_LENGTH):
+    """'WEB: Voeg een maanfase-indicator toe' -> 'maanfase_indicator'"""
+    instruction = re.sub(r"^\s*\w+:\s*", "", instruction)  # 'WEB:' prefix
+    slug = "_".join(keywords(instruction)[:max_words])[:max_length].strip("_")
+    return slug or "app"
+
+
+def _words_match(a, b):
+    if a == b:
+        return True
+    # Samenstellingen en meervouden: 'maanfase' ~ 'maanfasen', 'sterren' ~ 'sterrenhemel'
+    shorter, longer = sorted((a, b), key=len)
+    return len(shorter) >= 4 and longer.startswith(shorter)
+
+
+class AppIndex:
+    """
+    Index van de single-file apps in `apps/`: per bestand de slug, <title>,
+    eerste <h1> en keywords. Wordt per bestand ververst op mtime.
+    Gebruikt door WebArchitect om zonder LLM te bepalen of een opdracht een
+    bestaande app bijwerkt of een nieuwe maakt.
+    """
+
+    def __init__(self, apps_dir="apps"):
+        self.apps_dir = apps_dir
+        self._apps = {}
+
+    def _describe(self, path):
+        try:
+            with open(path, "r", errors="replace") as f:
+                head = f.read(20000)
+        except OSError:
+            return None
+        filename = os.path.basename(path)
+        slug = filename[: -len(".html")]
+        title = _TITLE.search(head)
+        h1 = _H1.search(head)
+        title = _TAG.sub("", title.group(1)).strip() if title else ""
+        h1 = _TAG.sub("", h1.group(1)).strip() if h1 else ""
+        return {
+            "file": filename,
+            "slug": slug,
+            "title": title,
+            "keywords": sorted(set(keywords(slug.replace(".html", "")) + keywords(title) + keywords(h1))),
+        }
+
+    def refresh(self):
+        if not os.path.isdir(self.apps_dir):
+            self._apps = {}
+            return
+        seen = set()
+        for filename in os.listdir(self.apps_dir):
+            if not filename.endswith(".html"):
+                continue
+            path = os.path.join(self.apps_dir, filename)
+            seen.add(filename)
+            mtime = os.path.getmtime(path)
+            cached = self._apps.get(filename)
+            if cached and cached["mtime"] == mtime:
+                continue
+            entry = self._describe(path)
+            if entry:
+                entry["mtime"] = mtime
+                self._apps[filename] = entry
+        for filename in set(self._apps) - seen:
+            del self._apps[filename]
+
+    def apps(self):
+        self.refresh()
+        return sorted(self._apps.values(), key=lambda a: a["file"])
+
+    def score(self, instruction, app):
+        """0..1: hoe goed een instructie bij een bestaande app past."""
+        wanted = keywords(re.sub(r"^\s*\w+:\s*", "", instruction))
+        if not wanted:
+            return 0.0
+        if slugify(instruction) == app["slug"]:
+            return 1.0
+        matched = sum(1 for w in wanted if any(_words_match(w, k) for k in app["keywords"]))
+        coverage = matched / len(wanted)
+        similarity = difflib.SequenceMatcher(None, slugify(instruction), app["slug"]).ratio()
+        # Keyword-dekking weegt zwaarder; tekstgelijkenis van de slug vangt varianten op
+        return 0.7 * coverage + 0.3 * similarity
+
+    def resolve(self, instruction):
+        """
+        Geeft een dict met 'action' ('update', 'new' of 'ambiguous'), 'file'
+        (bestandsnaam of None bij ambiguous) en 'candidates' (top-3 met score).
+        """
+        apps = self.apps()
+        by_file = {a["file"]: a for a in apps}
+
+        # Een expliciet genoemd .html bestand wint altijd
+        for word in instruction.split():
+            word = word.strip("`'\".,:;()")
+            if word.lower().endswith(".html"):
+                filename = os.path.basename(word)
+                action = "update" if filename in by_file else "new"
+                return {"action": action, "file": filename, "candidates": []}
+
+        ranked = sorted(
+            ((round(self.score(instruction, a), 3), a["file"]) for a in apps), reverse=True
+        )[:3]
+        candidates = [{"file": f, "score": s} for s, f in ranked]
+        slug_file = slugify(instruction) + ".html"
+
+        best = ranked[0][0] if ranked else 0.0
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        if best >= UPDATE_SCORE and best - runner_up >= MIN_MARGIN:
+            return {"action": "update", "file": ranked[0][1], "candidates": candidates}
+        if best < NEW_SCORE:
+            action = "update" if slug_file in by_file else "new"
+            return {"action": action, "file": slug_file, "candidates": candidates}
+        return {"action": "ambiguous", "file": None, "candidates": candidates, "new_file": slug_file}
@@ -0,0 +1,415 @@
+import os
+import re
+import ast
+import json
+from loguru import logger
+from src.autonomous_agents.analysis.file_catalog import FileCatalog, get_catalog
+
+CODE_INDEX_FILE = "data/cache/code_index.json"
+CONTEXT_CHARS = 8000
+STOPWORDS = {
+    "the", "and", "for", "with", "van", "een", "het", "de", "die", "dat", "voor",
+    "met", "naar", "zodat", "maak", "voeg", "toe", "system", "web", "research",
+    "self", "none", "true", "false", "return", "file", "bestand", "code", "py",
+}
+
+
+def split_identifier(name):
+    """'FeatureArchitect._find_file' -> ['feature', 'architect', 'find', 'file']"""
+    parts = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name)
+    return [p.lower() for p in re.split(r"[^A-Za-z0-9]+", parts) if p]
+
+
+def _tokens(text):
+    tokens = set()
+    for t in split_identifier(text):
+        if len(t) > 2 and t not in STOPWORDS:
+            # Grove stemming: 'tests' en 'test' moeten matchen
+            tokens.add(t[:-1] if len(t) > 4 and t.endswith("s") else t)
+    return tokens
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _signature(node):
+    args = [a.arg for a in node.args.posonlyargs + node.args.args]
+    if node.args.vararg:
+        args.append("*" + node.args.vararg.arg)
+    args += [a.arg for a in node.args.kwonlyargs]
+    if node.args.kwarg:
+        args.append("**" + node.args.kwarg.arg)
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    return f"{prefix} {node.name}({', '.join(args)})"
+
+
+def _start_line(node):
+    """Eerste regel inclusief decorators."""
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+
+def interface_signature(source):
+    """
+    Canonieke beschrijving van de publieke interface van een module: publieke
+    functies, classes (met bases), publieke methodes plus __init__, en
+    module-constanten. Implementatie-wijzigingen laten dit ongemoeid.
+    Geeft None terug bij ongeldige syntax.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    def public(name):
+        return not name.startswith("_")
+
+    def function(node, indent=""):
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        return f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and public(node.name):
+            lines.append(function(node))
+        elif isinstance(node, ast.ClassDef) and public(node.name):
+            bases = ", ".join(ast.unparse(b) for b in node.bases)
+            lines.append(f"class {node.name}({bases})")
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                    public(item.name) or item.name == "__init__"
+                ):
+                    lines.append(function(item, "    "))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            lines.extend(
+                f"{t.id} =" for t in targets if isinstance(t, ast.Name) and public(t.id)
+            )
+    return "\n".join(lines)
+
+
+def parse_source(source):
+    """
+    Indexeert één module: symbolen (classes, functies, methodes) met regelbereik,
+    signatuur, docstring en aangeroepen namen, plus de imports.
+    """
+    tree = ast.parse(source)
+    symbols = []
+    imports = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.append({"line": node.lineno, "modules": [a.name for a in node.names]})
+        elif isinstance(node, ast.ImportFrom):
+            imports.append(
+                {
+                    "line": node.lineno,
+                    "modules": [node.module or ""],
+                    "names": [a.name for a in node.names],
+                }
+            )
+
+    def visit(body, parent=None):
+        for node in body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            is_class = isinstance(node, ast.ClassDef)
+            qualname = f"{parent}.{node.name}" if parent else node.name
+            calls = sorted(
+                {
+                    name
+                    for child in ast.walk(node)
+                    if isinstance(child, ast.Call)
+                    for name in [_call_name(child)]
+                    if name
+                }
+            )
+            symbols.append(
+                {
+                    "name": node.name,
+                    "qualname": qualname,
+                    "kind": "class" if is_class else ("method" if parent else "function"),
+                    "parent": parent,
+                    "start": _start_line(node),
+                    "end": node.end_lineno,
+                    "signature": f"class {node.name}" if is_class else _signature(node),
+                    "doc": (ast.get_docstring(node) or "").split("\n")[0][:120],
+                    "calls": calls,
+                }
+            )
+            if is_class:
+                visit(node.body, qualname)
+
+    visit(tree.body)
+    return {"symbols": symbols, "imports": imports}
+
+
+class CodeIndex:
+    """
+    AST-index over `src/`: per bestand de symbolen, imports en call-referenties.
+    Wordt bijgehouden via de FileCatalog (content hash), zodat alleen gewijzigde
+    bestanden opnieuw geparsed worden.
+    """
+
+    def __init__(self, root="src", catalog=None, cache_file=CODE_INDEX_FILE):
+        self.name = "CodeIndex"
+        self.root = root
+        self.catalog = catalog or get_catalog(root)
+        self.cache_file = cache_file
+        self.files = self._load()
+        self._dirty = False
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self):
+        if not self.cache_file or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.files, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not persist code index: {e}")
+
+    def get_file(self, path):
+        """Geeft de (eventueel ververste) index van één bestand terug, of None."""
+        entry = self.catalog.get(path)
+        digest = entry["hash"] if entry else None
+        if entry:
+            # De catalogus ververst hooguit elke 30s: een net gewijzigd bestand
+            # zelf hashen, anders kloppen de regelbereiken niet meer
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            if st.st_mtime != entry["mtime"] or st.st_size != entry["size"]:
+                digest = FileCatalog._hash_file(path)
+        cached = self.files.get(path)
+        if cached and digest and cached.get("hash") == digest:
+            return cached
+
+        try:
+            with open(path, "r") as f:
+                parsed = parse_source(f.read())
+        except (OSError, SyntaxError, ValueError):
+            return None
+        parsed["hash"] = digest
+        if digest:
+            self.files[path] = parsed
+            self._dirty = True
+        return parsed
+
+    def outline(self, path):
+        parsed = self.get_file(path)
+        if not parsed:
+            return ""
+        lines = []
+        for sym in parsed["symbols"]:
+            indent = "    " if sym["parent"] else ""
+            lines.append(f"{indent}L{sym['start']}-{sym['end']}: {sym['signature']}")
+        return "\n".join(lines)
+
+    def relevant_symbols(self, instruction, path, limit=6):
+        """
+        Kiest de symbolen die bij de instructie passen, plus hun directe
+        afhankelijkheden (aangeroepen functies/methodes in hetzelfde bestand).
+        """
+        parsed = self.get_file(path)
+        if not parsed:
+            return []
+        symbols = parsed["symbols"]
+        # Bestandsnamen in de instructie zeggen niets over welke symbolen relevant zijn
+        instruction = " ".join(w for w in instruction.split() if ".py" not in w)
+        wanted = _tokens(instruction)
+        lowered = instruction.lower()
+
+        scored = []
+        for sym in symbols:
+            if sym["kind"] == "class":
+                continue  # Classes komen binnen via hun methodes, niet als geheel
+            score = 0.0
+            if re.search(rf"\b{re.escape(sym['name'].lower())}\b", lowered):
+                score += 10
+            score += 2 * len(wanted & _tokens(sym["name"]))
+            score += 0.5 * len(wanted & _tokens(sym["doc"]))
+            if score > 0:
+                scored.append((score, sym))
+        scored.sort(key=lambda item: (-item[0], item[1]["start"]))
+        selected = [sym for _, sym in scored[:limit]]
+
+        # Directe afhankelijkheden erbij
+        by_name = {}
+        for sym in symbols:
+            if sym["kind"] != "class":
+                by_name.setdefault(sym["name"], []).append(sym)
+        chosen = {sym["qualname"] for sym in selected}
+        for sym in list(selected):
+            for call in sym["calls"]:
+                for dep in by_name.get(call, []):
+                    if dep["qualname"] not in chosen:
+                        chosen.add(dep["qualname"])
+                        selected.append(dep)
+
+        return sorted(selected, key=lambda s: s["start"])
+
+    def symbols_at_lines(self, path, line_numbers):
+        """Kleinste symbolen die de gegeven regels bevatten (bijv. uit een traceback)."""
+        parsed = self.get_file(path)
+        if not parsed:
+            return []
+        found = []
+        for line in line_numbers:
+            containing = [s for s in parsed["symbols"] if s["start"] <= line <= s["end"]]
+            if containing:
+                innermost = min(containing, key=lambda s: s["end"] - s["start"])
+                if innermost not in found:
+                    found.append(innermost)
+        return found
+
+    def render_context(self, path, symbols, max_chars=CONTEXT_CHARS):
+        """Outline + imports + broncode van de gekozen symbolen, met regelnummers."""
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+        parsed = self.get_file(path) or {"imports": []}
+
+        import_lines = sorted({imp["line"] for imp in parsed["imports"]})
+        parts = [
+            f"# FILE: {path} ({len(lines)} regels)",
+            "# OUTLINE:",
+            self.outline(path),
+            "# IMPORTS:",
+            "\n".join(lines[n - 1] for n in import_lines if n <= len(lines)),
+        ]
+        used = sum(len(p) for p in parts)
+        for sym in symbols:
+            segment = "\n".join(lines[sym["start"] - 1 : sym["end"]])
+            block = f"# --- {sym['qualname']} (L{sym['start']}-{sym['end']}) ---\n{segment}"
+            if used + len(block) > max_chars:
+                parts.append(f"# ... {sym['qualname']} weggelaten (context limiet)")
+                continue
+            parts.append(block)
+            used += len(block)
+        return "\n".join(parts)
+
+    def context_for(self, instruction, path, max_chars=CONTEXT_CHARS):
+        """
+        Gerichte prompt-context voor een instructie over één bestand.
+        Geeft None terug als er geen relevante symbolen gevonden zijn.
+        """
+        symbols = self.relevant_symbols(instruction, path)
+        self.save()
+        if not symbols:
+            return None
+        return self.render_context(path, symbols, max_chars=max_chars)
+
+
+def splice_symbols(source, new_code):
+    """
+    Voegt gewijzigde definities in bestaande code in. `new_code` bevat alleen de
+    aangepaste/nieuwe functies en classes (classes met alleen de gewijzigde
+    methodes). Bestaande symbolen worden vervangen, nieuwe toegevoegd, en
+    ontbrekende imports bovenaan ingevoegd. Geeft None terug als `new_code`
+    niet bruikbaar is.
+    """
+    try:
+        old_tree = ast.parse(source)
+        new_tree = ast.parse(new_code)
+    except SyntaxError:
+        return None
+
+    new_lines = new_code.splitlines()
+    old_lines = source.splitlines()
+    defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    if not any(isinstance(n, defs) for n in new_tree.body):
+        return None
+
+    def segment(node, indent_delta=0):
+        chunk = new_lines[_start_line(node) - 1 : node.end_lineno]
+        if indent_delta > 0:
+            return [(" " * indent_delta + line) if line.strip() else line for line in chunk]
+        if indent_delta < 0:
+            return [line[-indent_delta:] if line[: -indent_delta].strip() == "" else line for line in chunk]
+        return chunk
+
+    old_top = {n.name: n for n in old_tree.body if isinstance(n, defs)}
+    edits = []  # (start, end, lines) in oude regelnummers; end exclusief
+    appended = []
+
+    for node in new_tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            line = ast.get_source_segment(new_code, node)
+            if line and line not in old_lines:
+                last_import = max(
+                    [n.end_lineno for n in old_tree.body if isinstance(n, (ast.Import, ast.ImportFrom))],
+                    default=0,
+                )
+                edits.append((last_import, last_import, [line]))
+            continue
+        if not isinstance(node, defs):
+            continue
+
+        old = old_top.get(node.name)
+        if old is None:
+            appended.extend([""] + segment(node))
+        elif isinstance(node, ast.ClassDef) and isinstance(old, ast.ClassDef):
+            old_methods = {
+                m.name: m
+                for m in old.body
+                if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))
+            }
+            for member in node.body:
+                if not isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                target = old_methods.get(member.name)
+                if target is not None:
+                    delta = target.col_offset - member.col_offset
+                    edits.append((_start_line(target) - 1, target.end_lineno, segment(member, delta)))
+                else:
+                    delta = (old.col_offset + 4) - member.col_offset
+                    edits.append((old.end_lineno, old.end_lineno, [""] + segment(member, delta)))
+        else:
+            edits.append((_start_line(old) - 1, old.end_lineno, segment(node)))
+
+    # Van onder naar boven toepassen zodat regelnummers kloppen
+    result = list(old_lines)
+    ordered = sorted(enumerate(edits), key=lambda e: (e[1][0], e[1][1], e[0]), reverse=True)
+    for _, (start, end, lines) in ordered:
+        result[start:end] = lines
+    if appended:
+        result.extend(appended)
+
+    spliced = "\n".join(result) + "\n"
+    try:
+        ast.parse(spliced)
+    except SyntaxError:
+        return None
+    return spliced
+
+
+_index = None
+
+
+def get_code_index(root="src"):
+    """Gedeelde index voor `src`; andere roots (sandboxes) krijgen een losse, niet-persistente."""
+    global _index
+    if root != "src":
+        return CodeIndex(root, catalog=FileCatalog(root, cache_file=None), cache_file=None)
+    if _index is None:
+        _index = CodeIndex(root)
+    return _index
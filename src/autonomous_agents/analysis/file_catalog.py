@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import difflib
+import hashlib
+from loguru import logger
+
+CATALOG_FILE = "data/cache/file_catalog.json"
+REFRESH_INTERVAL = 30  # Seconden tussen filesystem checks
+SKIP_DIRS = {"__pycache__", ".git", ".pytest_cache", ".ruff_cache", "node_modules"}
+
+
+class FileCatalog:
+    """
+    Persistente index van bronbestanden (pad, grootte, mtime, content hash, module).
+    Vervangt losse `os.walk` scans: een refresh herleest alleen directories
+    waarvan de mtime veranderd is en hasht alleen gewijzigde bestanden.
+    """
+
+    def __init__(
+        self,
+        root="src",
+        extensions=(".py",),
+        cache_file=CATALOG_FILE,
+        refresh_interval=REFRESH_INTERVAL,
+    ):
+        self.name = "FileCatalog"
+        self.root = root
+        self.extensions = tuple(extensions)
+        self.cache_file = cache_file
+        self.refresh_interval = refresh_interval
+        self.files = {}  # pad -> entry
+        self.dirs = {}  # dir -> {"mtime", "subdirs", "files"}
+        self.by_name = {}  # basename -> [paden]
+        self._last_refresh = None
+        self._load()
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r") as f:
+                data = json.load(f)
+            if data.get("root") == self.root and data.get("extensions") == list(self.extensions):
+                self.files = data.get("files", {})
+                self.dirs = data.get("dirs", {})
+                self._rebuild_name_index()
+        except Exception as e:
+            logger.warning(f"[{self.name}] Catalog cache unreadable, rebuilding: {e}")
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(
+                    {
+                        "root": self.root,
+                        "extensions": list(self.extensions),
+                        "files": self.files,
+                        "dirs": self.dirs,
+                    },
+                    f,
+                )
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not persist catalog: {e}")
+
+    def _rebuild_name_index(self):
+        self.by_name = {}
+        for path in sorted(self.files):
+            self.by_name.setdefault(os.path.basename(path), []).append(path)
+
+    @staticmethod
+    def _hash_file(path):
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def _module_name(path):
+        return os.path.splitext(os.path.normpath(path))[0].replace(os.sep, ".")
+
+    def refresh(self, force=False):
+        """
+        Brengt de catalogus bij. Binnen `refresh_interval` na de vorige refresh
+        gebeurt er niets (tenzij `force`). Geeft True terug als er iets veranderde.
+        """
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_refresh is not None
+            and now - self._last_refresh < self.refresh_interval
+        ):
+            return False
+        self._last_refresh = now
+
+        changed = False
+        seen_dirs = set()
+        seen_files = set()
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            seen_dirs.add(directory)
+
+            known = self.dirs.get(directory)
+            if known is None or known["mtime"] != dir_mtime:
+                # Alleen gewijzigde directories opnieuw uitlezen
+                subdirs, filenames = [], []
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                                subdirs.append(entry.path)
+                        elif entry.name.endswith(self.extensions):
+                            filenames.append(entry.name)
+                known = {"mtime": dir_mtime, "subdirs": subdirs, "files": filenames}
+                self.dirs[directory] = known
+                changed = True
+            stack.extend(known["subdirs"])
+
+            for filename in known["files"]:
+                path = os.path.join(directory, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen_files.add(path)
+                entry = self.files.get(path)
+                if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                    continue
+                try:
+                    digest = self._hash_file(path)
+                except OSError:
+                    continue
+                self.files[path] = {
+                    "path": path,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime,
+                    "hash": digest,
+                    "module": self._module_name(path),
+                }
+                changed = True
+
+        for path in set(self.files) - seen_files:
+            del self.files[path]
+            changed = True
+        for directory in set(self.dirs) - seen_dirs:
+            del self.dirs[directory]
+            changed = True
+
+        if changed:
+            self._rebuild_name_index()
+            self._save()
+        return changed
+
+    def all_files(self):
+        self.refresh()
+        return sorted(self.files)
+
+    def entries(self):
+        self.refresh()
+        return [self.files[path] for path in sorted(self.files)]
+
+    def get(self, path):
+        self.refresh()
+        return self.files.get(os.path.normpath(path)) or self.files.get(path)
+
+    def largest(self):
+        entries = self.entries()
+        return max(entries, key=lambda e: e["size"]) if entries else None
+
+    def has_name(self, filename):
+        self.refresh()
+        return filename in self.by_name
+
+    def find(self, partial_name, fuzzy=False):
+        """
+        Zoekt een bestand op (deel van de) naam: eerst exacte bestandsnaam,
+        dan substring, en met `fuzzy` ook een difflib-match. Geeft het pad
+        terug of None.
+
+        Fuzzy alleen voor lezende lookups: wie op basis van de uitkomst kiest
+        tussen wijzigen en aanmaken, zou 'csv_parser.py' als 'json_parser.py'
+        vinden en die overschrijven.
+        """
+        self.refresh()
+        needle = partial_name.strip().strip("`'\".,:;()[]")
+        if not needle:
+            return None
+        needle = os.path.basename(needle)
+
+        if needle in self.by_name:
+            return self.by_name[needle][0]
+
+        for name in sorted(self.by_name):
+            if needle in name:
+                return self.by_name[name][0]
+
+        if not fuzzy:
+            return None
+        close = difflib.get_close_matches(needle, list(self.by_name), n=1, cutoff=0.75)
+        if close:
+            return self.by_name[close[0]][0]
+        return None
+
+
+_catalogs = {}
+
+
+def get_catalog(root="src"):
+    """Gedeelde catalogus per root (alleen de standaard 'src' wordt gepersisteerd)."""
+    if root not in _catalogs:
+        cache_file = CATALOG_FILE if root == "src" else None
+        _catalogs[root] = FileCatalog(root=root, cache_file=cache_file)
+    return _catalogs[root]
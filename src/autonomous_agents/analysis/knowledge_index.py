@@ -0,0 +1,279 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from loguru import logger
+from src.autonomous_agents.execution.database_manager import DatabaseManager
+from src.autonomous_agents.learning.lessons_journal import journal_path
+
+KNOWLEDGE_DB = "data/cache/knowledge.db"
+OUTPUT_DIR = "data/output"
+MEMORY_FILE = "PROJECT_MEMORY.md"
+LESSONS_FILE = "data/improvement_plans/lessons_learned.json"
+# bm25 gewichten per kolom (doc_id, source, title, body): titels tellen zwaarder
+BM25_WEIGHTS = (0.0, 0.0, 4.0, 1.0)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS knowledge_files (
+        path TEXT PRIMARY KEY,
+        mtime REAL,
+        size INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS knowledge_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+        doc_id UNINDEXED,
+        source UNINDEXED,
+        title,
+        body,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+"""
+
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$", re.MULTILINE)
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def _markdown_title(text, fallback):
+    match = _HEADING.search(text)
+    return match.group(1).strip() if match else fallback
+
+
+def _memory_documents(text):
+    """PROJECT_MEMORY.md: één document per alinea/les, met de sectiekop als titel."""
+    heading = "PROJECT_MEMORY"
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.splitlines()
+        match = _HEADING.match(lines[0])
+        if match:
+            heading = match.group(1).strip()
+            lines = lines[1:]
+        body = "\n".join(lines).strip()
+        if body:
+            yield heading, body
+
+
+def _lesson_documents(data):
+    for kind, field in (("successful_patterns", "pattern"), ("failed_patterns", "lesson")):
+        for entry in data.get(kind, []):
+            if isinstance(entry, dict) and entry.get(field):
+                yield kind, entry.get("task", ""), entry[field]
+
+
+def fts_query(query, any_term=False):
+    """Zet vrije tekst om naar een veilige FTS5 query (termen gequote, AND of OR)."""
+    terms = [f'"{t}"' for t in _TERM.findall(query)]
+    return (" OR " if any_term else " ").join(terms)
+
+
+class KnowledgeIndex:
+    """
+    Full-text index (SQLite FTS5, bm25-ranking) over alle gegenereerde kennis:
+    research rapporten, `data/output/*.md`, PROJECT_MEMORY.md en
+    lessons_learned.json (snapshot + journal). Bestanden worden incrementeel op mtime/grootte
+    herindexeerd; research rapporten op oplopend id. Agents roepen
+    `refresh_file()` / `sync_research()` aan na het schrijven, `search()`
+    doet zelf eerst een goedkope refresh.
+    """
+
+    def __init__(
+        self,
+        db_path=KNOWLEDGE_DB,
+        output_dir=OUTPUT_DIR,
+        memory_file=MEMORY_FILE,
+        lessons_file=LESSONS_FILE,
+        research_db=None,
+    ):
+        self.name = "KnowledgeIndex"
+        self.db_path = db_path
+        self.output_dir = os.path.normpath(output_dir)
+        self.memory_file = os.path.normpath(memory_file)
+        self.lessons_file = os.path.normpath(lessons_file)
+        # Nog niet gecompacteerde lessen staan in het journal naast de snapshot
+        self.lessons_journal = journal_path(self.lessons_file)
+        self.research_db = research_db  # DatabaseManager met research_results (optioneel)
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete_file_docs(conn, path):
+        prefix = f"{path}#"
+        conn.execute(
+            "DELETE FROM knowledge_fts WHERE substr(doc_id, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+    # --- Bronnen ---
+
+    def _files(self):
+        files = [self.memory_file, self.lessons_file, self.lessons_journal]
+        if os.path.isdir(self.output_dir):
+            files += [
+                os.path.join(self.output_dir, f)
+                for f in sorted(os.listdir(self.output_dir))
+                if f.endswith(".md")
+            ]
+        return files
+
+    def _documents_for(self, path):
+        """(source, title, body) tuples voor één bestand."""
+        with open(path, "r", errors="replace") as f:
+            text = f.read()
+        if path == self.lessons_file:
+            try:
+                data = json.loads(text) if text.strip() else {}
+            except json.JSONDecodeError:
+                return []
+            return [("lessons", task, body) for _, task, body in _lesson_documents(data)]
+        if path == self.lessons_journal:
+            return list(self._journal_documents(text))
+        if path == self.memory_file:
+            return [("memory", title, body) for title, body in _memory_documents(text)]
+        return [("output", _markdown_title(text, os.path.basename(path)), text)]
+
+    @staticmethod
+    def _journal_documents(text):
+        for line in text.splitlines():
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            body = event.get("pattern") or event.get("lesson")
+            if event.get("op") in ("success", "failure") and body:
+                yield "lessons", event.get("task", ""), body
+
+    # --- Incrementeel bijwerken ---
+
+    def refresh_file(self, path, force=False):
+        """Herindexeert één bestand als het gewijzigd (of verdwenen) is. Geeft True bij een wijziging."""
+        path = os.path.normpath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT mtime, size FROM knowledge_files WHERE path = ?", (path,)
+            ).fetchone()
+            if stat is None:
+                if row is None:
+                    return False
+                self._delete_file_docs(conn, path)
+                conn.execute("DELETE FROM knowledge_files WHERE path = ?", (path,))
+                return True
+            if not force and row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+                return False
+
+            try:
+                documents = self._documents_for(path)
+            except OSError as e:
+                logger.warning(f"[{self.name}] Could not index {path}: {e}")
+                return False
+            self._delete_file_docs(conn, path)
+            conn.executemany(
+                "INSERT INTO knowledge_fts (doc_id, source, title, body) VALUES (?, ?, ?, ?)",
+                [(f"{path}#{i}", source, title, body) for i, (source, title, body) in enumerate(documents)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO knowledge_files (path, mtime, size) VALUES (?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size),
+            )
+        return True
+
+    def refresh(self):
+        """Loopt alle bronnen langs (alleen stat-calls en één query als er niets veranderd is)."""
+        if self.research_db is not None:
+            self.sync_research(self.research_db)
+        paths = {os.path.normpath(p) for p in self._files()}
+        with self._connect() as conn:
+            paths |= {row[0] for row in conn.execute("SELECT path FROM knowledge_files")}
+        changed = sum(1 for path in sorted(paths) if self.refresh_file(path))
+        if changed:
+            logger.debug(f"[{self.name}] {changed} bestand(en) herindexeerd.")
+        return changed
+
+    def sync_research(self, db_manager):
+        """Indexeert research_results rijen die nog niet in de index staan."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM knowledge_meta WHERE key = 'research_last_id'"
+            ).fetchone()
+            last_id = int(row[0]) if row else 0
+            rows = db_manager.fetch_all(
+                "SELECT id, query, result FROM research_results WHERE id > ? ORDER BY id",
+                (last_id,),
+            ) or []
+            if not rows:
+                return 0
+            conn.executemany(
+                "INSERT INTO knowledge_fts (doc_id, source, title, body) VALUES (?, 'research', ?, ?)",
+                [(f"research:{rid}", query or "", result or "") for rid, query, result in rows],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO knowledge_meta (key, value) VALUES ('research_last_id', ?)",
+                (str(rows[-1][0]),),
+            )
+        return len(rows)
+
+    # --- Zoeken ---
+
+    def search(self, query, limit=10, source=None, refresh=True):
+        """
+        Gerankte zoekresultaten (beste eerst) als dicts met doc_id, source,
+        title, snippet en score (bm25; lager is beter). Eerst alle termen (AND);
+        levert dat niets op, dan volstaat één term (OR).
+        """
+        if refresh:
+            self.refresh()
+        if not _TERM.search(query or ""):
+            return []
+
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        sql = f"""
+            SELECT doc_id, source, title,
+                   snippet(knowledge_fts, 3, '[', ']', '…', 16),
+                   bm25(knowledge_fts, {weights}) AS score
+            FROM knowledge_fts
+            WHERE knowledge_fts MATCH ? {"AND source = ?" if source else ""}
+            ORDER BY score
+            LIMIT ?
+        """
+        with self._connect() as conn:
+            for any_term in (False, True):
+                params = [fts_query(query, any_term)] + ([source] if source else []) + [int(limit)]
+                rows = conn.execute(sql, params).fetchall()
+                if rows:
+                    break
+        return [
+            {"doc_id": d, "source": s, "title": t, "snippet": snip, "score": round(score, 4)}
+            for d, s, t, snip, score in rows
+        ]
+
+
+_index = None
+
+
+def get_knowledge_index():
+    global _index
+    if _index is None:
+        _index = KnowledgeIndex(research_db=DatabaseManager())
+    return _index
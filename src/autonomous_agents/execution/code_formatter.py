@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+import hashlib
+import subprocess
+from collections import OrderedDict
+from loguru import logger
+
+# Black in-process is veruit het snelst; zonder black vallen we terug op een CLI
+try:
+    import black
+
+    BLACK_AVAILABLE = True
+except ImportError:
+    BLACK_AVAILABLE = False
+
+FORMAT_STATE_FILE = "data/cache/format_state.json"
+CACHE_SIZE = 256
+FALLBACK_COMMANDS = [["ruff", "format", "-"], ["black", "-q", "-"]]
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class CodeFormatter:
+    """
+    Formatteert Python code via de black API (in-process) met een LRU cache op
+    content hash. Houdt per bestand de hash van de laatst geformatteerde versie
+    bij, zodat alleen gewijzigde bestanden opnieuw geformatteerd worden.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE, state_file=FORMAT_STATE_FILE):
+        self.name = "CodeFormatter"
+        self.cache_size = cache_size
+        self.state_file = state_file
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp_file = self.state_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not save format state: {e}")
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _format_uncached(self, code):
+        if BLACK_AVAILABLE:
+            try:
+                return black.format_str(code, mode=black.Mode())
+            except Exception:
+                # Ongeldige syntax of black-interne fout: code ongewijzigd laten
+                return code
+
+        # Eerste formatter die slaagt wint; faalt er een (exit code, timeout), dan de volgende
+        for command in FALLBACK_COMMANDS:
+            if not shutil.which(command[0]):
+                continue
+            try:
+                proc = subprocess.run(
+                    command, input=code, capture_output=True, text=True, timeout=30
+                )
+            except Exception:
+                continue
+            if proc.returncode == 0:
+                return proc.stdout
+        return code
+
+    def format_code(self, code):
+        """Geeft de geformatteerde code terug (of de input als formatteren faalt)."""
+        key = _sha1(code)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.misses += 1
+        formatted = self._format_uncached(code)
+        self._remember(key, formatted)
+        # Formatteren is idempotent: de output is zijn eigen resultaat
+        self._remember(_sha1(formatted), formatted)
+        return formatted
+
+    def pending_files(self, entries):
+        """
+        Filtert catalogus-entries (met 'path' en 'hash') op bestanden die sinds
+        de vorige formatteerronde gewijzigd zijn.
+        """
+        return [e["path"] for e in entries if self.state.get(e["path"]) != e["hash"]]
+
+    def needs_format(self, path):
+        with open(path, "r") as f:
+            source = f.read()
+        return self.format_code(source) != source
+
+    def format_file(self, path):
+        """Formatteert een bestand in-place. Geeft True terug als het wijzigde."""
+        with open(path, "r") as f:
+            source = f.read()
+        formatted = self.format_code(source)
+        if formatted != source:
+            with open(path, "w") as f:
+                f.write(formatted)
+        self.state[path] = _sha1(formatted)
+        return formatted != source
+
+    def mark_clean(self, paths):
+        """Legt de huidige inhoud van `paths` vast als 'al geformatteerd'."""
+        for path in paths:
+            try:
+                with open(path, "r") as f:
+                    self.state[path] = _sha1(f.read())
+            except OSError:
+                self.state.pop(path, None)
+        self._save_state()
+
+
+_formatter = None
+
+
+def get_formatter():
+    """Gedeelde formatter (en dus gedeelde cache) voor het hele proces."""
+    global _formatter
+    if _formatter is None:
+        _formatter = CodeFormatter()
+    return _formatter
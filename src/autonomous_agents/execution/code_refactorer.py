@@ -1,7 +1,12 @@
+import os
+import json
 import subprocess
 from typing import Dict, Any, List
 from loguru import logger
 from ..base_autonomous_agent import BaseAutonomousAgent
+from .snapshot_store import get_snapshot_store
+from .code_formatter import get_formatter
+from ..analysis.file_catalog import get_catalog
 
 
 class CodeRefactorer(BaseAutonomousAgent):
@@ -14,6 +19,26 @@ class CodeRefactorer(BaseAutonomousAgent):
         super().__init__(
             name="CodeRefactorer", layer="execution", interval_seconds=3600
         )
+        self.snapshots = get_snapshot_store()
+        self.last_snapshot = None
+        self.formatter = get_formatter()
+
+    def _lint_fixable(self, candidates: List[str]) -> List[str]:
+        """Vraagt ruff welke bestanden auto-fixbare issues hebben (zonder te schrijven)."""
+        proc_check = subprocess.run(
+            ["ruff", "check", "--output-format=json", *candidates],
+            capture_output=True,
+            text=True,
+        )
+        files = set()
+        try:
+            for item in json.loads(proc_check.stdout or "[]"):
+                if item.get("fix"):
+                    # ruff geeft absolute paden, de catalogus relatieve
+                    files.add(os.path.relpath(item["filename"]))
+        except json.JSONDecodeError:
+            pass
+        return sorted(files)
 
     async def analyze(self) -> Dict[str, Any]:
         """Check of er files zijn die formatted moeten worden."""
@@ -30,24 +55,40 @@ class CodeRefactorer(BaseAutonomousAgent):
         details = ""
 
         try:
-            # 1. Probeer Ruff fixes (linter)
-            proc_check = subprocess.run(
-                ["ruff", "check", "src/", "--fix"], capture_output=True, text=True
-            )
-
-            # 2. Probeer Ruff formatting
-            proc_format = subprocess.run(
-                ["ruff", "format", "src/"], capture_output=True, text=True
-            )
-
-            # Check of er output was die duidt op wijzigingen
-            if "Fixed" in proc_check.stdout or "reformatted" in proc_format.stdout:
+            # Alleen bestanden die sinds de vorige ronde gewijzigd zijn
+            candidates = self.formatter.pending_files(get_catalog("src").entries())
+            if not candidates:
+                logger.info("[CodeRefactorer] Geen gewijzigde bestanden sinds vorige ronde.")
+                return {"status": "success", "changes_made": False, "details": "", "plan": plan}
+
+            fixable = self._lint_fixable(candidates)
+            unformatted = [p for p in candidates if self.formatter.needs_format(p)]
+            files = sorted(set(fixable) | set(unformatted))
+
+            if files:
+                # Vangnet: alleen de bestanden die we gaan aanraken
+                self.last_snapshot = self.snapshots.snapshot(
+                    files, label="CodeRefactorer ruff fixes"
+                )
+
+                # 1. Ruff fixes (linter)
+                if fixable:
+                    subprocess.run(
+                        ["ruff", "check", "--fix", *fixable], capture_output=True, text=True
+                    )
+
+                # 2. Formatting in-process (gecachet op content hash)
+                for path in files:
+                    self.formatter.format_file(path)
+
                 changes_made = True
-                details = "Linter fixed. Formatting applied."
+                details = f"Linter fixed. Formatting applied to {len(files)} files."
                 logger.success("[CodeRefactorer] ✅ Code stijl toegepast.")
             else:
                 logger.info("[CodeRefactorer] Geen wijzigingen nodig.")
 
+            self.formatter.mark_clean(candidates)
+
             return {
                 "status": "success",
                 "changes_made": changes_made,
@@ -65,13 +106,20 @@ class CodeRefactorer(BaseAutonomousAgent):
             }
 
     def rollback(self):
-        """Draai wijzigingen direct terug via Git."""
+        """Zet precies de bestanden terug die deze refactor-ronde heeft aangeraakt."""
         logger.warning(
             "[CodeRefactorer] ↩️ ROLLBACK UITVOEREN: Wijzigingen ongedaan maken..."
         )
+        if not self.last_snapshot:
+            logger.info("[CodeRefactorer] Geen snapshot aanwezig, niets terug te zetten.")
+            return
+
         try:
-            # Herstel alle gewijzigde bestanden in src/ naar de laatste commit
-            subprocess.run(["git", "checkout", "src/"], check=True, capture_output=True)
+            # Andere (niet-gecommitte) wijzigingen in src/ blijven onaangetast
+            restored = self.snapshots.restore(self.last_snapshot)
+            self.last_snapshot = None
+            # Niet elke ronde dezelfde brekende fix opnieuw proberen
+            self.formatter.mark_clean([os.path.relpath(p) for p in restored])
             logger.success("[CodeRefactorer] ✅ Rollback succesvol. Systeem hersteld.")
         except Exception as e:
             logger.critical(f"[CodeRefactorer] 🚨 ROLLBACK MISLUKT: {e}")
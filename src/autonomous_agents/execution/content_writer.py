@@ -1,6 +1,7 @@
 import os
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
+from src.autonomous_agents.analysis.knowledge_index import get_knowledge_index
 
 
 class ContentWriter:
@@ -38,6 +39,7 @@ class ContentWriter:
                             with open(path, "w") as f:
                                 f.write(updated_content)
 
+                            get_knowledge_index().refresh_file(path)
                             expanded_count += 1
                             logger.success(
                                 f"✍️ {file} succesvol uitgebreid door Gemini."
@@ -17,6 +17,7 @@ class DatabaseManager:
                 timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        self._migrate_research_results()
 
         # Voorbeeld: Tabel om features op te slaan
         self.execute_query("""
@@ -30,6 +31,15 @@ class DatabaseManager:
             )
         """)
 
+    def _migrate_research_results(self):
+        """Oudere databases missen de topic_key kolom (genormaliseerd onderwerp) voor de cache."""
+        columns = [row[1] for row in self.fetch_all("PRAGMA table_info(research_results)") or []]
+        if "topic_key" not in columns:
+            self.execute_query("ALTER TABLE research_results ADD COLUMN topic_key TEXT")
+        self.execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_research_topic_key ON research_results (topic_key, timestamp)"
+        )
+
     def execute_query(self, query, params=None):
         try:
             with sqlite3.connect(self.db_file) as conn:
@@ -76,14 +86,28 @@ class DatabaseManager:
             )
             return None
 
-    def insert_research_result(self, agent_name, query, result):
+    def insert_research_result(self, agent_name, query, result, topic_key=None):
         self.execute_query(
             """
-            INSERT INTO research_results (agent_name, query, result)
-            VALUES (?, ?, ?)
+            INSERT INTO research_results (agent_name, query, result, topic_key)
+            VALUES (?, ?, ?, ?)
+        """,
+            (agent_name, query, result, topic_key),
+        )
+
+    def get_cached_research(self, topic_key, max_age_seconds):
+        """Meest recente rapport voor dit genormaliseerde onderwerp dat jonger is dan de TTL."""
+        row = self.fetch_one(
+            """
+            SELECT result
+            FROM research_results
+            WHERE topic_key = ? AND timestamp >= datetime('now', ?)
+            ORDER BY timestamp DESC, id DESC
+            LIMIT 1
         """,
-            (agent_name, query, result),
+            (topic_key, f"-{int(max_age_seconds)} seconds"),
         )
+        return row[0] if row else None
 
     def get_research_results_by_agent(self, agent_name):
         return self.fetch_all(
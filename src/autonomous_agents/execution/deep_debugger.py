@@ -1,5 +1,9 @@
+import os
+import re
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
+from src.autonomous_agents.analysis.code_index import get_code_index
+from src.autonomous_agents.execution.patch_applier import PATCH_FORMAT_INSTRUCTIONS, resolve_edit
 import traceback
 
 
@@ -7,14 +11,60 @@ class DeepDebugger:
     def __init__(self):
         self.name = "DeepDebugger"
         self.ai = AIService()
+        # Boven deze grootte sturen we alleen de falende symbolen mee
+        self.targeted_context_threshold = 6000
+        # Boven deze grootte vragen we om patches in plaats van het hele bestand
+        self.patch_threshold = 2000
+
+    def _error_lines(self, filepath, error_log):
+        """Regelnummers uit de traceback die naar `filepath` wijzen."""
+        pattern = rf'File "[^"]*{re.escape(os.path.basename(filepath))}", line (\d+)'
+        return [int(n) for n in re.findall(pattern, error_log or "")]
+
+    async def _targeted_fix(self, filepath, broken_code, error_log):
+        """Repareert alleen de symbolen uit de traceback en splicet ze terug."""
+        in_src = os.path.relpath(filepath).startswith("src" + os.sep)
+        index = get_code_index("src" if in_src else (os.path.dirname(filepath) or "."))
+        symbols = index.symbols_at_lines(filepath, self._error_lines(filepath, error_log))
+        for sym in index.relevant_symbols(error_log, filepath, limit=3):
+            if sym not in symbols:
+                symbols.append(sym)
+        if not symbols:
+            return None
+
+        context = index.render_context(filepath, sorted(symbols, key=lambda s: s["start"]))
+        prompt = (
+            "Repareer de volgende error met zo klein mogelijke wijzigingen.\n"
+            f"ERROR:\n{error_log}\nRELEVANTE CODE:\n{context}\n{PATCH_FORMAT_INSTRUCTIONS}"
+        )
+        fixed_code, mode = resolve_edit(broken_code, await self.ai.generate_text(prompt))
+        if fixed_code is not None:
+            logger.info(f"[{self.name}] ✂️ Fix toegepast als {mode}.")
+        return fixed_code
+
+    async def _patch_fix(self, broken_code, error_log):
+        """Vraagt SEARCH/REPLACE blokken over het hele bestand."""
+        prompt = (
+            "Repareer de volgende error met zo klein mogelijke wijzigingen.\n"
+            f"ERROR:\n{error_log}\nCODE:\n{broken_code}\n{PATCH_FORMAT_INSTRUCTIONS}"
+        )
+        fixed_code, _ = resolve_edit(broken_code, await self.ai.generate_text(prompt))
+        return fixed_code
 
     async def fix_broken_code(self, filepath, error_log):
         logger.info(f"[{self.name}] 🚑 Start spoedoperatie op: {filepath}")
         try:
             with open(filepath, "r") as f:
                 broken_code = f.read()
-            prompt = f"Herschrijf deze Python code zodat de volgende error wordt opgelost. Geef ALLEEN de code:\nERROR:\n{error_log}\nCODE:\n{broken_code}"
-            fixed_code = await self.ai.generate_text(prompt)
+            fixed_code = None
+            # Terugval: gerichte fix -> patches -> volledige herschrijving
+            if len(broken_code) > self.targeted_context_threshold:
+                fixed_code = await self._targeted_fix(filepath, broken_code, error_log)
+            if fixed_code is None and len(broken_code) > self.patch_threshold:
+                fixed_code = await self._patch_fix(broken_code, error_log)
+            if fixed_code is None:
+                prompt = f"Herschrijf deze Python code zodat de volgende error wordt opgelost. Geef ALLEEN de code:\nERROR:\n{error_log}\nCODE:\n{broken_code}"
+                fixed_code = await self.ai.generate_text(prompt)
             with open(filepath, "w") as f:
                 f.write(fixed_code)
             logger.success(f"✅ [{self.name}] Bestand gerepareerd.")
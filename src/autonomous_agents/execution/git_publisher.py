@@ -1,70 +1,246 @@
-import subprocess
+import os
+import time
+import asyncio
+from datetime import datetime
 from loguru import logger
 
+GIT_TIMEOUT = 60  # Seconden voor lokale git commando's
+PUSH_TIMEOUT = 180  # Push gaat over het (mobiele) netwerk
+PUSH_DEBOUNCE = 30  # Wacht zo lang op rust voordat er gepusht wordt
+PUSH_MAX_DELAY = 300  # ...maar stel een push nooit langer uit dan dit
+
+
+class _RepoState:
+    """Gedeelde state per repository (alle GitPublisher instanties samen)."""
 
-class GitPublisher:
     def __init__(self):
+        # Squads mogen niet tegelijk aan dezelfde index zitten
+        self.lock = asyncio.Lock()
+        self.push_task = None
+        self.push_reasons = []
+        self.push_first_request = None
+        self.push_deadline = 0.0
+        self.push_wakeup = None
+
+
+_repo_states = {}
+
+
+def _get_repo_state(repo_path):
+    key = os.path.realpath(repo_path)
+    if key not in _repo_states:
+        _repo_states[key] = _RepoState()
+    return _repo_states[key]
+
+
+class GitCommandError(Exception):
+    def __init__(self, args, returncode, output):
+        self.args_list = list(args)
+        self.returncode = returncode
+        self.output = output
+        super().__init__(
+            f"git {' '.join(self.args_list)} failed ({returncode}): {output}"
+        )
+
+
+class GitPublisher:
+    def __init__(
+        self,
+        repo_path=None,
+        timeout=GIT_TIMEOUT,
+        push_timeout=PUSH_TIMEOUT,
+        push_debounce=PUSH_DEBOUNCE,
+        push_max_delay=PUSH_MAX_DELAY,
+    ):
         self.name = "GitPublisher"
+        self.repo_path = repo_path or os.getcwd()
+        self.timeout = timeout
+        self.push_timeout = push_timeout
+        self.push_debounce = push_debounce
+        self.push_max_delay = push_max_delay
+        self.state = _get_repo_state(self.repo_path)
+        self.lock = self.state.lock
+
+    async def _run_git(self, *args, timeout=None, cwd=None, env=None, input=None, strip=True, raw=False):
+        """
+        Voert een git commando uit zonder de event loop te blokkeren. Met
+        strip=False blijft de output ongemoeid (porcelain-regels beginnen
+        soms met een spatie); raw=True geeft de onbewerkte bytes terug.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            cwd=cwd or self.repo_path,
+            env={**os.environ, **env} if env else None,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input), timeout or self.timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Geen zwevende git processen (en index.lock files) achterlaten
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+            raise
+
+        if proc.returncode != 0:
+            output = (stderr or stdout).decode("utf-8", errors="replace").strip()
+            raise GitCommandError(args, proc.returncode, output)
+        if raw:
+            return stdout
+        output = stdout.decode("utf-8", errors="replace")
+        return output.strip() if strip else output
+
+    async def _status(self):
+        return await self._run_git("status", "--porcelain", "-z", strip=False)
+
+    @staticmethod
+    def _parse_status(status):
+        """Zet `git status --porcelain -z` output om naar een lijst met paden."""
+        files = []
+        entries = iter(status.split("\0"))
+        for entry in entries:
+            if len(entry) > 3:
+                files.append(entry[3:])
+                if entry[0] in "RC":
+                    # Rename/copy: het oude pad volgt als los veld
+                    next(entries, None)
+        return files
 
     async def create_backup_commit(self, message: str):
         """Maakt een lokale backup commit voor veiligheid."""
         try:
-            status = (
-                subprocess.check_output(["git", "status", "--porcelain"])
-                .decode("utf-8")
-                .strip()
-            )
-            if not status:
-                return  # Niets te backuppen
+            async with self.lock:
+                status = await self._status()
+                if not status:
+                    return {"status": "no_changes", "files": []}  # Niets te backuppen
 
-            subprocess.check_call(["git", "add", "."])
-            subprocess.check_call(
-                ["git", "commit", "-m", f"🛡️ SAFETY BACKUP: {message}"]
-            )
-            logger.info(f"[{self.name}] Safety backup commit created.")
+                files = self._parse_status(status)
+                await self._run_git("add", ".")
+                await self._run_git("commit", "-m", f"🛡️ SAFETY BACKUP: {message}")
+                sha = await self._run_git("rev-parse", "HEAD")
+
+            logger.info(f"[{self.name}] Safety backup commit created ({sha[:8]}).")
+            return {"status": "success", "files": files, "commit": sha}
+        except asyncio.TimeoutError:
+            logger.warning(f"[{self.name}] Backup commit timed out.")
+            return {"status": "timeout", "files": []}
         except Exception as e:
             logger.warning(f"[{self.name}] Failed to create backup commit: {e}")
+            return {"status": "error", "files": [], "error": str(e)}
 
-    async def publish_changes(self):
+    async def publish_changes(self, reasons=None):
         """Pusht wijzigingen en logt het harde bewijs"""
+        stage = "status"
+        sha = None
         try:
-            # 1. Check of er überhaupt iets veranderd is
-            status = (
-                subprocess.check_output(["git", "status", "--porcelain"])
-                .decode("utf-8")
-                .strip()
-            )
+            async with self.lock:
+                # 1. Check of er überhaupt iets veranderd is
+                status = await self._status()
+                if not status:
+                    return {"status": "no_changes", "files": []}
 
-            if not status:
-                return {"status": "no_changes"}
+                logger.info(f"[{self.name}] Wijzigingen gedetecteerd. Analyseren...")
+                files = self._parse_status(status)
 
-            logger.info(f"[{self.name}] Wijzigingen gedetecteerd. Analyseren...")
+                # 2. Voeg alles toe
+                stage = "add"
+                await self._run_git("add", ".")
 
-            # 2. Voeg alles toe
-            subprocess.check_call(["git", "add", "."])
+                # 3. Krijg de statistieken VOORDAT we committen (Het bewijs)
+                # Dit laat zien: "file.py | 10 +-"
+                stats = await self._run_git("diff", "--cached", "--stat")
 
-            # 3. Krijg de statistieken VOORDAT we committen (Het bewijs)
-            # Dit laat zien: "file.py | 10 +-"
-            stats = (
-                subprocess.check_output(["git", "diff", "--cached", "--stat"])
-                .decode("utf-8")
-                .strip()
-            )
+                # Log elke gewijzigde file apart voor de HUD
+                for line in stats.split("\n"):
+                    if "|" in line:
+                        # Format: " src/main.py | 5 +--"
+                        logger.success(f"[{self.name}] 📝 FILE: {line.strip()}")
 
-            # Log elke gewijzigde file apart voor de HUD
-            for line in stats.split("\n"):
-                if "|" in line:
-                    # Format: " src/main.py | 5 +--"
-                    logger.success(f"[{self.name}] 📝 FILE: {line.strip()}")
+                # 4. Commit en Push
+                stage = "commit"
+                commit_msg = f"🤖 AI Update: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+                if reasons:
+                    commit_msg += "\n\n" + "\n".join(f"- {r}" for r in reasons)
+                await self._run_git("commit", "-m", commit_msg)
+                sha = await self._run_git("rev-parse", "HEAD")
 
-            # 4. Commit en Push
-            commit_msg = f"🤖 AI Update: {subprocess.check_output(['date', '+%Y-%m-%d %H:%M']).decode('utf-8').strip()}"
-            subprocess.check_call(["git", "commit", "-m", commit_msg])
-            subprocess.check_call(["git", "push"])
+            # Push raakt de index niet: buiten de lock zodat backups niet wachten
+            stage = "push"
+            push_start = time.monotonic()
+            await self._run_git("push", timeout=self.push_timeout)
+            push_duration = time.monotonic() - push_start
 
-            logger.success(f"[{self.name}] 🚀 Bewijs geleverd & Code gepusht!")
-            return {"status": "success"}
+            logger.success(
+                f"[{self.name}] 🚀 Bewijs geleverd & Code gepusht! ({sha[:8]}, push {push_duration:.1f}s)"
+            )
+            return {
+                "status": "success",
+                "files": files,
+                "commit": sha,
+                "push_duration": push_duration,
+            }
 
+        except asyncio.TimeoutError:
+            logger.error(f"[{self.name}] Git timeout during '{stage}'.")
+            return {"status": "timeout", "stage": stage, "commit": sha}
         except Exception as e:
             logger.error(f"[{self.name}] Git Error: {e}")
-            return {"status": "error"}
+            return {"status": "error", "stage": stage, "commit": sha, "error": str(e)}
+
+    def schedule_publish(self, reason=""):
+        """
+        Vraagt een push aan zonder te wachten. Verzoeken worden gedebounced en
+        gebundeld: na `push_debounce` seconden rust volgt één commit + push.
+        """
+        state = self.state
+        now = time.monotonic()
+        if reason:
+            state.push_reasons.append(reason)
+        if state.push_first_request is None:
+            state.push_first_request = now
+        state.push_deadline = min(
+            now + self.push_debounce, state.push_first_request + self.push_max_delay
+        )
+
+        if state.push_task is None or state.push_task.done():
+            state.push_wakeup = asyncio.Event()
+            state.push_task = asyncio.create_task(self._push_worker())
+        return state.push_task
+
+    async def _push_worker(self):
+        state = self.state
+        result = {"status": "no_changes", "files": []}
+        while state.push_first_request is not None:
+            delay = state.push_deadline - time.monotonic()
+            if delay > 0:
+                # Wakker bij flush(), anders na de debounce
+                try:
+                    await asyncio.wait_for(state.push_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                state.push_wakeup.clear()
+                continue
+
+            reasons, state.push_reasons = state.push_reasons, []
+            state.push_first_request = None
+            if reasons:
+                logger.info(f"[{self.name}] 📦 Batched push for {len(reasons)} task(s).")
+            result = await self.publish_changes(reasons)
+        return result
+
+    async def flush(self):
+        """Voert een openstaande push direct uit (bijv. bij afsluiten)."""
+        state = self.state
+        if state.push_task is None or state.push_task.done():
+            return None
+        state.push_deadline = 0.0
+        state.push_wakeup.set()
+        return await state.push_task
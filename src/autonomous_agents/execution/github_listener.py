@@ -1,11 +1,13 @@
 from github import Github
 from loguru import logger
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = "JwP-O7O/ai-content-lab"
+PROCESSED_FILE = "data/github_processed_issues.json"
 
 
 class GitHubListener:
@@ -14,6 +16,9 @@ class GitHubListener:
         self.token = GITHUB_TOKEN
         self.repo_name = REPO_NAME
         self.github_instance = None  # Store the Github instance for reuse
+        self.processed_file = PROCESSED_FILE
+        # Issue nummers die al als taak zijn opgepakt (gedeeld met de webhook receiver)
+        self.processed_issues = self._load_processed()
 
         # Validate configuration during initialization
         self._validate_config()
@@ -29,6 +34,38 @@ class GitHubListener:
                 f"[{self.name}] REPO_NAME is not set.  GitHub functionality will be severely limited."
             )
 
+    def _load_processed(self):
+        """Laadt de set met reeds verwerkte issue nummers."""
+        if not os.path.exists(self.processed_file):
+            return set()
+        try:
+            with open(self.processed_file, "r") as f:
+                return set(json.load(f))
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not read processed issues: {e}")
+            return set()
+
+    def _save_processed(self):
+        try:
+            os.makedirs(os.path.dirname(self.processed_file), exist_ok=True)
+            with open(self.processed_file, "w") as f:
+                json.dump(sorted(self.processed_issues), f)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not save processed issues: {e}")
+
+    def is_processed(self, issue_number):
+        """True als dit issue al eerder als taak is opgepakt."""
+        if issue_number in self.processed_issues:
+            return True
+        # Een andere listener (poller of webhook) kan het intussen opgepakt hebben
+        self.processed_issues |= self._load_processed()
+        return issue_number in self.processed_issues
+
+    def mark_processed(self, issue_number):
+        """Markeert een issue als verwerkt zodat het niet dubbel in de queue komt."""
+        self.processed_issues.add(issue_number)
+        self._save_processed()
+
     def _get_github_instance(self):
         """
         Returns a Github instance, creating it if it doesn't exist.  Handles token errors.
@@ -66,6 +103,9 @@ class GitHubListener:
                 # Skip if already being processed (identified by the robot emoji)
                 if "🤖" in issue.title:
                     continue
+                # Skip if the webhook receiver already queued it
+                if self.is_processed(issue.number):
+                    continue
 
                 logger.info(f"[{self.name}] Order received: {issue.title}")
 
@@ -89,6 +129,7 @@ class GitHubListener:
                         "issue_obj": issue,
                     }
                 )
+                self.mark_processed(issue.number)
 
             if tasks:
                 return {"status": "new_tasks", "tasks": tasks}
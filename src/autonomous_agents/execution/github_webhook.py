@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import hmac
+import hashlib
+import argparse
+import urllib.request
+import urllib.error
+from loguru import logger
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from src.autonomous_agents.execution.task_queue import TaskQueue
+from src.autonomous_agents.execution.github_listener import GitHubListener
+
+load_dotenv()
+WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+WEBHOOK_PATH = "/github/webhook"
+HANDLED_ACTIONS = ("opened", "edited")
+
+
+def sign_payload(secret, body):
+    """Berekent de `X-Hub-Signature-256` header zoals GitHub die meestuurt."""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+class GitHubWebhookReceiver:
+    """
+    Zet GitHub `issues` webhook events direct om in TaskQueue entries.
+    Vervangt het pollen van GitHubListener: orders staan binnen milliseconden in de queue.
+    """
+
+    def __init__(self, secret=None, queue=None, listener=None):
+        self.name = "GitHubWebhook"
+        self.secret = secret if secret is not None else WEBHOOK_SECRET
+        self.queue = queue or TaskQueue()
+        # De listener beheert de set met verwerkte issues (deduplicatie met de poller)
+        self.listener = listener or GitHubListener()
+
+        if not self.secret:
+            logger.warning(
+                f"[{self.name}] GITHUB_WEBHOOK_SECRET is not set. All events will be rejected."
+            )
+
+    def verify_signature(self, body, signature_header):
+        """Controleert de HMAC-SHA256 handtekening van de payload."""
+        if not self.secret or not signature_header:
+            return False
+        if not signature_header.startswith("sha256="):
+            return False
+        expected = sign_payload(self.secret, body)
+        return hmac.compare_digest(expected, signature_header)
+
+    def handle_event(self, event, body, signature_header):
+        """
+        Verwerkt één webhook aanroep. Geeft (http_status, response_dict) terug.
+        """
+        if not self.verify_signature(body, signature_header):
+            logger.warning(f"[{self.name}] ⛔ Invalid signature, event rejected.")
+            return 401, {"status": "error", "error": "Invalid signature"}
+
+        if event == "ping":
+            return 200, {"status": "pong"}
+
+        if event != "issues":
+            return 202, {"status": "ignored", "reason": f"event '{event}'"}
+
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return 400, {"status": "error", "error": f"Invalid JSON: {e}"}
+
+        action = payload.get("action")
+        issue = payload.get("issue") or {}
+        if action not in HANDLED_ACTIONS:
+            return 202, {"status": "ignored", "reason": f"action '{action}'"}
+        if issue.get("state", "open") != "open":
+            return 202, {"status": "ignored", "reason": "issue not open"}
+
+        number = issue.get("number")
+        title = (issue.get("title") or "").strip()
+        if number is None or not title:
+            return 400, {"status": "error", "error": "Issue number or title missing"}
+
+        # Dedup: al opgepakt door de poller, deze receiver, of gemarkeerd als WIP
+        if "🤖" in title or self.listener.is_processed(number):
+            return 200, {"status": "duplicate", "issue": number}
+
+        task_id = self.queue.add_task(
+            title=title,
+            description=issue.get("body") or "",
+            source="github",
+        )
+        if task_id is None:
+            return 500, {"status": "error", "error": "Failed to queue task"}
+
+        self.listener.mark_processed(number)
+        logger.info(f"[{self.name}] 📨 Order #{number} queued as task {task_id}: {title}")
+        return 201, {"status": "queued", "task_id": task_id, "issue": number}
+
+
+def create_app(receiver=None):
+    """Flask app voor gebruik achter een tunnel (cloudflared, ngrok, ...)."""
+    from flask import Flask, request, jsonify
+
+    app = Flask(__name__)
+    app.config["RECEIVER"] = receiver or GitHubWebhookReceiver()
+
+    @app.route(WEBHOOK_PATH, methods=["POST"])
+    def github_webhook():
+        status, response = app.config["RECEIVER"].handle_event(
+            request.headers.get("X-GitHub-Event", ""),
+            request.get_data(),
+            request.headers.get("X-Hub-Signature-256"),
+        )
+        return jsonify(response), status
+
+    return app
+
+
+def replay_event(payload_file, url, secret, event="issues"):
+    """
+    Stuurt een opgeslagen payload (bijv. uit de GitHub 'Recent Deliveries') opnieuw
+    ondertekend naar de receiver. Handig om lokaal te testen zonder tunnel.
+    """
+    with open(payload_file, "rb") as f:
+        body = f.read()
+
+    req = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            "X-Hub-Signature-256": sign_payload(secret, body),
+        },
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, json.loads(resp.read().decode("utf-8") or "{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode("utf-8") or "{}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub issue webhook receiver")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Start de webhook receiver")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=5001)
+
+    replay = sub.add_parser("replay", help="Speel een opgeslagen payload af")
+    replay.add_argument("payload_file")
+    replay.add_argument("--url", default=f"http://127.0.0.1:5001{WEBHOOK_PATH}")
+    replay.add_argument("--event", default="issues")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        logger.info(f"📡 Webhook receiver listening on {args.host}:{args.port}{WEBHOOK_PATH}")
+        create_app().run(host=args.host, port=args.port)
+    else:
+        status, response = replay_event(
+            args.payload_file, args.url, WEBHOOK_SECRET or "", args.event
+        )
+        print(f"{status}: {response}")
+
+
+if __name__ == "__main__":
+    main()
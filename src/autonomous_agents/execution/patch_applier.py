@@ -0,0 +1,207 @@
+import re
+import ast
+import difflib
+from loguru import logger
+
+from src.autonomous_agents.analysis.code_index import splice_symbols
+
+FUZZY_THRESHOLD = 0.85
+REWRITE_RATIO = 0.6  # Antwoord van deze omvang (t.o.v. het origineel) geldt als volledige herschrijving
+
+PATCH_FORMAT_INSTRUCTIONS = """
+OUTPUT FORMAAT (VERPLICHT): geef ALLEEN de wijzigingen als SEARCH/REPLACE blokken:
+<<<<<<< SEARCH
+(exacte, bestaande regels uit de huidige code; genoeg context om uniek te zijn)
+=======
+(de nieuwe regels)
+>>>>>>> REPLACE
+- Meerdere blokken mogen; houd elk blok zo klein mogelijk.
+- Een leeg SEARCH deel voegt code toe aan het einde van het bestand.
+- Herhaal GEEN ongewijzigde code buiten de blokken.
+"""
+
+_SEARCH_REPLACE = re.compile(
+    r"^<{5,} ?SEARCH[^\n]*\n(.*?)^={5,}[^\n]*\n(.*?)^>{5,} ?REPLACE[^\n]*$",
+    re.DOTALL | re.MULTILINE,
+)
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+class PatchError(Exception):
+    """Een hunk kon niet (eenduidig) verankerd worden, of het resultaat is ongeldig."""
+
+
+def _strip_fences(text):
+    return text.replace("```python", "").replace("```diff", "").replace("```", "")
+
+
+def _lines(text):
+    return text.splitlines() if text else []
+
+
+def parse_search_replace(text):
+    """Geeft een lijst (search, replace, hint) uit SEARCH/REPLACE blokken."""
+    hunks = []
+    for search, replace in _SEARCH_REPLACE.findall(_strip_fences(text or "")):
+        hunks.append((_lines(search), _lines(replace), None))
+    return hunks
+
+
+def parse_unified_diff(text):
+    """Zet unified diff hunks om in (search, replace, hint) met de oude startregel als hint."""
+    hunks = []
+    current = None
+    for line in _strip_fences(text or "").splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = ([], [], int(header.group(1)))
+            hunks.append(current)
+            continue
+        if current is None or line.startswith(("---", "+++", "\\")):
+            continue
+        search, replace, _ = current
+        if line.startswith("-"):
+            search.append(line[1:])
+        elif line.startswith("+"):
+            replace.append(line[1:])
+        else:
+            # Contextregel; sommige modellen laten de spatie aan het begin weg
+            context = line[1:] if line.startswith(" ") else line
+            search.append(context)
+            replace.append(context)
+    return hunks
+
+
+def parse_patch(text):
+    """Herkent SEARCH/REPLACE blokken of een unified diff. Lege lijst als geen van beide."""
+    return parse_search_replace(text) or parse_unified_diff(text)
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def _reindent(lines, delta):
+    if delta > 0:
+        return [(" " * delta + line) if line.strip() else line for line in lines]
+    if delta < 0:
+        return [line[-delta:] if line[:-delta].strip() == "" else line.lstrip() for line in lines]
+    return lines
+
+
+def _pick(candidates, hint, what):
+    if not candidates:
+        return None
+    if len(candidates) == 1:
+        return candidates[0]
+    if hint is None:
+        raise PatchError(f"Ambiguous anchor ({what}): {len(candidates)} matches")
+    # Unified diff: de match het dichtst bij de opgegeven regel wint
+    return min(candidates, key=lambda start: abs(start + 1 - hint))
+
+
+def _locate(source_lines, search, hint=None):
+    """
+    Zoekt `search` in `source_lines`. Probeert achtereenvolgens een exacte match,
+    een match zonder trailing whitespace, een match ongeacht inspringing en een
+    fuzzy match. Geeft (start, inspring-verschil) terug.
+    """
+    size = len(search)
+    windows = range(len(source_lines) - size + 1)
+
+    for what, normalize in (
+        ("exact", lambda line: line),
+        ("trailing whitespace", str.rstrip),
+        ("indentation", str.strip),
+    ):
+        needle = [normalize(line) for line in search]
+        matches = [
+            i for i in windows
+            if [normalize(line) for line in source_lines[i : i + size]] == needle
+        ]
+        start = _pick(matches, hint, what)
+        if start is not None:
+            delta = 0
+            if what == "indentation":
+                first = next((j for j, line in enumerate(search) if line.strip()), 0)
+                delta = _indent(source_lines[start + first]) - _indent(search[first])
+            return start, delta
+
+    needle = "\n".join(line.strip() for line in search)
+    scored = []
+    for i in windows:
+        window = "\n".join(line.strip() for line in source_lines[i : i + size])
+        ratio = difflib.SequenceMatcher(None, needle, window).ratio()
+        if ratio >= FUZZY_THRESHOLD:
+            scored.append((ratio, i))
+    if not scored:
+        raise PatchError(f"No anchor found for hunk starting with: {search[0].strip()!r}")
+    best = max(ratio for ratio, _ in scored)
+    start = _pick([i for ratio, i in scored if ratio == best], hint, "fuzzy")
+    first = next((j for j, line in enumerate(search) if line.strip()), 0)
+    return start, _indent(source_lines[start + first]) - _indent(search[first])
+
+
+def apply_hunks(source, hunks, validate_python=True):
+    """
+    Past hunks (search, replace, hint) toe op `source`. Gooit PatchError als een
+    hunk niet verankerd kan worden of als het resultaat geen geldige Python is.
+    """
+    if not hunks:
+        raise PatchError("No hunks to apply")
+
+    lines = source.splitlines()
+    offset = 0  # Verschuiving van diff-regelnummers door eerdere hunks
+    for search, replace, hint in hunks:
+        if not any(line.strip() for line in search):
+            lines.extend([""] + replace if lines and lines[-1].strip() else replace)
+            continue
+        start, delta = _locate(lines, search, hint + offset if hint else None)
+        lines[start : start + len(search)] = _reindent(replace, delta)
+        offset += len(replace) - len(search)
+
+    result = "\n".join(lines) + ("\n" if source.endswith("\n") or not source else "")
+    if validate_python:
+        try:
+            ast.parse(result)
+        except SyntaxError as e:
+            raise PatchError(f"Patched code does not parse: line {e.lineno}: {e.msg}")
+    return result
+
+
+def apply_patch(source, text, validate_python=True):
+    """Parseert en past een patch-antwoord toe. Geeft None terug als dat niet lukt."""
+    try:
+        return apply_hunks(source, parse_patch(text), validate_python)
+    except PatchError as e:
+        logger.warning(f"[PatchApplier] {e}")
+        return None
+
+
+def resolve_edit(source, response):
+    """
+    Verwerkt een LLM-antwoord op een bewerkingsopdracht. Volgorde: patch
+    (SEARCH/REPLACE of diff), daarna splicen van losse definities, en alleen
+    als het antwoord een volledig bestand lijkt een complete herschrijving.
+    Geeft (code, modus) terug, of (None, None) als niets bruikbaar is.
+    """
+    if not response:
+        return None, None
+    hunks = parse_patch(response)
+    if hunks:
+        try:
+            return apply_hunks(source, hunks), "patch"
+        except PatchError as e:
+            logger.warning(f"[PatchApplier] {e}")
+            return None, None
+
+    code = _strip_fences(response).strip()
+    if len(code) < REWRITE_RATIO * len(source):
+        # Te kort voor een volledig bestand: alleen als losse definities bruikbaar
+        spliced = splice_symbols(source, code)
+        return (spliced, "splice") if spliced is not None else (None, None)
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return None, None
+    return code, "rewrite"
@@ -1,11 +1,47 @@
+import os
+import re
+import asyncio
+import unicodedata
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
+from src.autonomous_agents.execution.database_manager import DatabaseManager
+from src.autonomous_agents.analysis.knowledge_index import get_knowledge_index
+
+# Hoe lang een rapport hergebruikt mag worden (seconden); 0 schakelt de cache uit
+RESEARCH_CACHE_TTL = int(os.getenv("PHOENIX_RESEARCH_TTL", str(7 * 24 * 3600)))
+# Map-reduce modus: aantal deelvragen (1 = klassiek serieel), gelijktijdige
+# LLM-calls en het tijdsbudget (seconden) waarna de synthese doorgaat
+RESEARCH_FAN_OUT = int(os.getenv("PHOENIX_RESEARCH_FAN_OUT", "1"))
+RESEARCH_CONCURRENCY = int(os.getenv("PHOENIX_RESEARCH_CONCURRENCY", "3"))
+RESEARCH_BUDGET = float(os.getenv("PHOENIX_RESEARCH_BUDGET", "60"))
+TOPIC_STOPWORDS = {
+    "a", "an", "the", "for", "of", "in", "on", "to", "and", "with", "about", "how",
+    "de", "het", "een", "voor", "van", "in", "op", "met", "en", "over", "hoe",
+    "research", "onderzoek", "library",
+}
+
+
+def normalize_topic(topic):
+    """
+    Cachesleutel voor een onderwerp: kleine letters, zonder accenten,
+    leestekens en stopwoorden, woorden gesorteerd en ontdubbeld.
+    'Python best practices for X' en 'best practices Python X' vallen samen.
+    """
+    text = unicodedata.normalize("NFKD", topic).encode("ascii", "ignore").decode("ascii")
+    words = re.split(r"[^a-z0-9]+", text.lower())
+    return " ".join(sorted({w for w in words if w and w not in TOPIC_STOPWORDS}))
 
 
 class ResearchAgent:
     def __init__(self):
         self.name = "IntelligenceDirectorate"  # Nieuwe naam voor de logs
         self.ai = AIService()
+        self.db = DatabaseManager()
+        self.cache_ttl = RESEARCH_CACHE_TTL
+        self.fan_out = RESEARCH_FAN_OUT
+        self.research_concurrency = max(1, RESEARCH_CONCURRENCY)
+        self.research_budget = RESEARCH_BUDGET
+        self._inflight = {}  # topic_key -> Future: gelijktijdige identieke vragen delen één run
 
         # ACADEMISCH SYSTEEM PROMPT
         # Dit dwingt de agent om methodisch te denken, niet chaotisch.
@@ -29,7 +65,46 @@ class ResearchAgent:
         """
 
     async def conduct_research(self, topic):
+        topic_key = normalize_topic(topic)
+        if self.cache_ttl > 0:
+            cached = self.db.get_cached_research(topic_key, self.cache_ttl)
+            if cached:
+                logger.info(f"[{self.name}] ♻️ Rapport uit cache voor: {topic}")
+                return {"status": "success", "report": cached, "cached": True}
+
+        # Loopt hetzelfde onderzoek al (bijv. StaffingAgent en SystemOptimizer tegelijk)?
+        if topic_key in self._inflight:
+            return await asyncio.shield(self._inflight[topic_key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[topic_key] = future
+        try:
+            result = await self._research(topic)
+            if result.get("report") and self.cache_ttl > 0:
+                self.db.insert_research_result(self.name, topic, result["report"], topic_key)
+                self._index_reports()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Voorkomt 'exception was never retrieved' zonder wachters
+            raise
+        finally:
+            del self._inflight[topic_key]
+
+    def _index_reports(self):
+        try:
+            get_knowledge_index().sync_research(self.db)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Knowledge index update failed: {e}")
+
+    async def _research(self, topic):
         logger.info(f"[{self.name}] 🧐 Start academische analyse van: {topic}")
+        if self.fan_out > 1:
+            return await self._research_fan_out(topic)
 
         # STAP 1: VERZAMELEN (De 'Junior' taak)
         # We vragen de AI eerst om breed te zoeken (simulatie van Google resultaten via LLM kennis)
@@ -43,6 +118,13 @@ class ResearchAgent:
         raw_data = await self.ai.generate_text(search_prompt)
 
         # STAP 2: SYNTHESE & ADVIES (De 'Senior' taak)
+        final_report = await self._synthesize(raw_data)
+
+        # Log het resultaat voor de gebruiker
+        logger.success(f"[{self.name}] 📚 Rapport afgerond.")
+        return {"status": "success", "report": final_report}
+
+    async def _synthesize(self, raw_data):
         # Nu moet hij de data verwerken tot een besluit
         synthesis_prompt = f"""
         {self.system_prompt}
@@ -54,9 +136,82 @@ class ResearchAgent:
         Filter de ruwe data. We willen GEEN 'hello world' oplossingen. We willen robuuste, enterprise-grade oplossingen.
         Schrijf nu het definitieve rapport voor de FeatureArchitect.
         """
+        return await self.ai.generate_text(synthesis_prompt)
 
-        final_report = await self.ai.generate_text(synthesis_prompt)
+    async def _plan_sub_questions(self, topic):
+        """Splitst het onderwerp in maximaal fan_out deelvragen (één LLM-call)."""
+        plan_prompt = f"""
+        Onderzoeksonderwerp: "{topic}"
 
-        # Log het resultaat voor de gebruiker
-        logger.success(f"[{self.name}] 📚 Rapport afgerond.")
-        return {"status": "success", "report": final_report}
+        Splits dit onderwerp in precies {self.fan_out} onafhankelijke, concrete technische deelvragen
+        voor een Python/Linux omgeving (bijv. libraries, performance, architectuur, risico's).
+        Antwoord met ALLEEN de deelvragen, één per regel, zonder nummering of uitleg.
+        """
+        response = await self.ai.generate_text(plan_prompt) or ""
+        questions = []
+        for line in response.splitlines():
+            line = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip()
+            if len(line) > 10 and line not in questions:
+                questions.append(line)
+        # Zonder bruikbaar plan: één brede deelvraag, zoals de seriële modus
+        return questions[: self.fan_out] or [f"Welke technische oplossingen zijn er voor: {topic}?"]
+
+    async def _answer_sub_question(self, topic, question, semaphore):
+        async with semaphore:
+            prompt = f"""
+            {self.system_prompt}
+
+            Onderzoeksonderwerp: "{topic}"
+            Deelvraag: "{question}"
+
+            Beantwoord ALLEEN deze deelvraag, beknopt en concreet: relevante libraries/methodes
+            (2024/2025, Python/Linux) met voor- en nadelen.
+            """
+            return await self.ai.generate_text(prompt)
+
+    async def _research_fan_out(self, topic):
+        """
+        Map-reduce: plan deelvragen, beantwoord ze gelijktijdig (begrensd door
+        research_concurrency) en synthetiseer. Na research_budget seconden gaat
+        de synthese door met wat er binnen is; mislukte deelvragen vallen weg.
+        """
+        questions = await self._plan_sub_questions(topic)
+        semaphore = asyncio.Semaphore(self.research_concurrency)
+        jobs = {
+            asyncio.create_task(self._answer_sub_question(topic, q, semaphore)): q
+            for q in questions
+        }
+        done, pending = await asyncio.wait(jobs, timeout=self.research_budget)
+        for job in pending:
+            job.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        answers = {}
+        for job in done:
+            if job.exception() is not None:
+                logger.warning(f"[{self.name}] Deelvraag mislukt: {jobs[job]} ({job.exception()})")
+            elif job.result():
+                answers[jobs[job]] = job.result()
+
+        logger.info(
+            f"[{self.name}] 🔀 {len(answers)}/{len(questions)} deelvragen beantwoord"
+            f"{f', {len(pending)} over tijdsbudget' if pending else ''}."
+        )
+        if not answers:
+            return {"status": "failed", "report": "", "sub_questions": len(questions), "answered": 0}
+
+        # Volgorde van het plan aanhouden; ontbrekende deelvragen expliciet benoemen
+        sections = [f"### {q}\n{answers[q]}" for q in questions if q in answers]
+        missing = [q for q in questions if q not in answers]
+        if missing:
+            sections.append("### Niet beantwoord (tijdsbudget/fout)\n" + "\n".join(f"- {q}" for q in missing))
+
+        final_report = await self._synthesize("\n\n".join(sections))
+        logger.success(f"[{self.name}] 📚 Rapport afgerond ({len(answers)} deelvragen).")
+        return {
+            "status": "success",
+            "report": final_report,
+            "sub_questions": len(questions),
+            "answered": len(answers),
+        }
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from loguru import logger
+
+SNAPSHOT_DIR = "data/snapshots"
+MAX_SNAPSHOTS = 50
+MIN_AGE = 3600  # Jongere snapshots blijven altijd bewaard: de taak die ze maakte kan nog terugdraaien
+
+_root_locks = {}
+_root_locks_guard = threading.Lock()
+
+
+def _lock_for(root):
+    """Eén lock per snapshotmap, gedeeld door alle instanties die daar schrijven."""
+    with _root_locks_guard:
+        return _root_locks.setdefault(os.path.abspath(root), threading.RLock())
+
+
+class SnapshotStore:
+    """
+    Content-addressed snapshots van losse bestanden, als lichtgewicht vangnet.
+    Een agent slaat alleen de bestanden op die hij gaat wijzigen; een restore
+    zet precies die bestanden terug (O(aangeraakte bestanden), geen git nodig).
+
+    Meerdere instanties op dezelfde map zijn veilig: de index wordt vóór elke
+    save en gc onder een lock met index.json samengevoegd, zodat gc nooit
+    objecten weggooit die een andere instantie nog gebruikt. Gebruik bij
+    voorkeur `get_snapshot_store()`.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR, max_snapshots=MAX_SNAPSHOTS, min_age=MIN_AGE):
+        self.name = "SnapshotStore"
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_file = os.path.join(root, "index.json")
+        self.max_snapshots = max_snapshots
+        self.min_age = min_age
+        self._lock = _lock_for(root)
+        self._unsaved = []  # Eigen snapshots die nog niet in index.json staan
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return []
+        try:
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Snapshot index unreadable, starting fresh: {e}")
+            return []
+
+    def _merge_index(self):
+        """Index.json (van alle instanties) plus onze nog niet opgeslagen snapshots."""
+        index = self._load_index()
+        known = {entry["id"] for entry in index}
+        index.extend(entry for entry in self._unsaved if entry["id"] not in known)
+        index.sort(key=lambda entry: entry["created"])
+        self.index = index
+        self._unsaved = []
+
+    def _save_index(self):
+        self._merge_index()
+        self._write_index()
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _store_object(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_file = path + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, path)
+        return digest
+
+    def snapshot(self, paths, label=""):
+        """
+        Slaat de huidige inhoud van `paths` op. Bestanden die (nog) niet bestaan
+        worden als `None` vastgelegd, zodat een restore ze weer verwijdert.
+        Geeft het snapshot id terug.
+        """
+        with self._lock:
+            files = {}
+            for path in paths:
+                abs_path = os.path.abspath(path)
+                if os.path.isfile(abs_path):
+                    with open(abs_path, "rb") as f:
+                        files[abs_path] = self._store_object(f.read())
+                else:
+                    files[abs_path] = None
+
+            snapshot_id = f"{int(time.time() * 1000)}-{os.urandom(3).hex()}"
+            self._unsaved.append(
+                {"id": snapshot_id, "label": label, "created": time.time(), "files": files}
+            )
+            self._save_index()
+            if len(self.index) > self.max_snapshots:
+                self.gc()
+
+        logger.debug(f"[{self.name}] Snapshot {snapshot_id} ({len(files)} files): {label}")
+        return snapshot_id
+
+    def get(self, snapshot_id):
+        for entry in self.index:
+            if entry["id"] == snapshot_id:
+                return entry
+        # Misschien door een andere instantie aangemaakt
+        with self._lock:
+            self._merge_index()
+        for entry in self.index:
+            if entry["id"] == snapshot_id:
+                return entry
+        return None
+
+    def restore(self, snapshot_id, paths=None):
+        """
+        Zet de bestanden uit een snapshot terug. Met `paths` alleen die subset.
+        Geeft de lijst met herstelde paden terug.
+        """
+        # Onder de lock: een gelijktijdige gc mag geen objecten onder ons weghalen
+        with self._lock:
+            return self._restore(snapshot_id, paths)
+
+    def _restore(self, snapshot_id, paths):
+        entry = self.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Unknown snapshot: {snapshot_id}")
+
+        wanted = {os.path.abspath(p) for p in paths} if paths else None
+        restored = []
+        for path, digest in entry["files"].items():
+            if wanted is not None and path not in wanted:
+                continue
+            if digest is None:
+                # Bestond niet vóór de snapshot: verwijderen
+                if os.path.exists(path):
+                    os.remove(path)
+                    restored.append(path)
+                continue
+
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_file = path + ".restore"
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, path)
+            restored.append(path)
+
+        logger.info(f"[{self.name}] ↩️ Snapshot {snapshot_id} restored ({len(restored)} files).")
+        return restored
+
+    def gc(self):
+        """
+        Houdt maximaal `max_snapshots` snapshots (plus alles jonger dan
+        `min_age`) en ruimt losse objecten op.
+        """
+        with self._lock:
+            return self._gc()
+
+    def _gc(self):
+        self._merge_index()
+        cutoff = time.time() - self.min_age
+        keep_from = len(self.index) - self.max_snapshots
+        self.index = [
+            entry for i, entry in enumerate(self.index) if i >= keep_from or entry["created"] >= cutoff
+        ]
+        self._write_index()
+
+        referenced = {
+            digest for entry in self.index for digest in entry["files"].values() if digest
+        }
+        removed = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for rest in os.listdir(prefix_dir):
+                    if prefix + rest not in referenced:
+                        os.remove(os.path.join(prefix_dir, rest))
+                        removed += 1
+                if not os.listdir(prefix_dir):
+                    os.rmdir(prefix_dir)
+        if removed:
+            logger.debug(f"[{self.name}] GC removed {removed} unreferenced objects.")
+        return removed
+
+
+_stores = {}
+
+
+def get_snapshot_store(root=SNAPSHOT_DIR):
+    """Gedeelde store per map: alle agents zien dezelfde index."""
+    key = os.path.abspath(root)
+    if key not in _stores:
+        _stores[key] = SnapshotStore(root)
+    return _stores[key]
@@ -0,0 +1,225 @@
+import os
+import re
+import sys
+import gzip
+import json
+import hashlib
+from loguru import logger
+
+# Brotli is optioneel: zonder de module bouwen we alleen .gz varianten
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+SOURCE_DIR = "apps"
+OUTPUT_DIR = "data/static"
+MANIFEST_NAME = "manifest.json"
+
+_PROTECTED = re.compile(
+    r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL
+)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+def minify_css(css):
+    css = _CSS_COMMENT.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Spaties rond ':' alleen in declaraties (binnenste blokken); in selectors
+    # verandert 'div :hover' anders van betekenis
+    css = re.sub(r"\{([^{}]*)\}", lambda m: "{" + re.sub(r"\s*:\s*", ":", m.group(1)) + "}", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    """
+    Bewust conservatief (zonder tokenizer): regels blijven behouden zodat
+    automatische puntkomma's niet breken; alleen inspringing, lege regels en
+    regels met uitsluitend een // commentaar verdwijnen.
+    """
+    lines = []
+    for line in js.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+def minify_html(html):
+    """Minificeert HTML met inline CSS/JS; <pre> en <textarea> blijven onaangeroerd."""
+    blocks = []
+
+    def protect(match):
+        open_tag, tag, body, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == "style":
+            body = minify_css(body)
+        elif tag == "script" and "src=" not in open_tag.lower():
+            body = minify_js(body)
+        blocks.append(open_tag + body + close_tag)
+        return f"\x00{len(blocks) - 1}\x00"
+
+    html = _PROTECTED.sub(protect, html)
+    html = _HTML_COMMENT.sub("", html)
+    html = re.sub(r"\s+", " ", html)
+    html = re.sub(r">\s+<", "> <", html)
+    # Rond block-tags is whitespace betekenisloos
+    html = re.sub(
+        r"\s*(</?(?:html|head|body|meta|link|title|div|section|header|footer|nav|main|ul|ol|li|"
+        r"table|thead|tbody|tr|td|th|br|hr|p|h[1-6]|canvas|svg|form|!doctype)\b[^>]*>)\s*",
+        r"\1",
+        html,
+        flags=re.IGNORECASE,
+    )
+    html = re.sub(r"\x00(\d+)\x00", lambda m: blocks[int(m.group(1))], html)
+    return html.strip()
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class StaticSiteBuilder:
+    """
+    Bouwt `apps/*.html` naar `data/static/`: geminificeerd, met content hash
+    en voorgecomprimeerde .gz (en .br als brotli beschikbaar is) varianten,
+    plus een manifest. Incrementeel: alleen gewijzigde apps worden opnieuw
+    gebouwd, verwijderde apps worden opgeruimd.
+    """
+
+    def __init__(self, source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR):
+        self.name = "StaticSiteBuilder"
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.apps_output = os.path.join(output_dir, os.path.basename(os.path.normpath(source_dir)))
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_file = self.manifest_path + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.manifest_path)
+
+    @staticmethod
+    def _write(path, data):
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+
+    def _outputs_exist(self, entry):
+        paths = [entry["path"], entry["gz"]] + ([entry["br"]] if entry.get("br") else [])
+        return all(os.path.exists(p) for p in paths)
+
+    def build_file(self, path, force=False, save=True):
+        """Bouwt één app. Geeft de manifest-entry terug (of None als de bron ontbreekt)."""
+        filename = os.path.basename(path)
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                source = f.read()
+        except OSError:
+            return None
+
+        source_hash = _sha256(source)
+        entry = self.manifest.get(filename)
+        if (
+            not force
+            and entry
+            and entry["source_hash"] == source_hash
+            and entry.get("br_built", False) == BROTLI_AVAILABLE
+            and self._outputs_exist(entry)
+        ):
+            return entry
+
+        minified = minify_html(source.decode("utf-8", errors="replace")).encode("utf-8")
+        os.makedirs(self.apps_output, exist_ok=True)
+        out_path = os.path.join(self.apps_output, filename)
+        self._write(out_path, minified)
+        gz_data = gzip.compress(minified, compresslevel=9, mtime=0)
+        self._write(out_path + ".gz", gz_data)
+
+        entry = {
+            "source": path,
+            "source_hash": source_hash,
+            "source_size": stat.st_size,
+            "hash": _sha256(minified)[:16],
+            "path": out_path,
+            "size": len(minified),
+            "gz": out_path + ".gz",
+            "gz_size": len(gz_data),
+            "br": None,
+            "br_size": None,
+            "br_built": BROTLI_AVAILABLE,
+        }
+        if BROTLI_AVAILABLE:
+            br_data = brotli.compress(minified, quality=11)
+            self._write(out_path + ".br", br_data)
+            entry["br"] = out_path + ".br"
+            entry["br_size"] = len(br_data)
+
+        self.manifest[filename] = entry
+        if save:
+            self._save_manifest()
+        logger.info(
+            f"[{self.name}] 📦 {filename}: {stat.st_size} -> {entry['size']} B"
+            f" (gz {entry['gz_size']} B{', br ' + str(entry['br_size']) + ' B' if entry['br'] else ''})"
+        )
+        return entry
+
+    def _remove_outputs(self, filename):
+        entry = self.manifest.pop(filename, None)
+        if not entry:
+            return
+        for key in ("path", "gz", "br"):
+            if entry.get(key) and os.path.exists(entry[key]):
+                os.remove(entry[key])
+
+    def build(self, force=False):
+        """Incrementele build van alle apps. Geeft een samenvatting terug."""
+        if not os.path.isdir(self.source_dir):
+            return {"built": [], "unchanged": [], "removed": []}
+
+        sources = sorted(f for f in os.listdir(self.source_dir) if f.endswith(".html"))
+        built, unchanged = [], []
+        for filename in sources:
+            previous = self.manifest.get(filename)
+            entry = self.build_file(os.path.join(self.source_dir, filename), force=force, save=False)
+            if entry is None:
+                continue
+            # build_file geeft bij een ongewijzigde bron exact de oude entry terug
+            (unchanged if entry is previous else built).append(filename)
+
+        removed = [f for f in list(self.manifest) if f not in sources]
+        for filename in removed:
+            self._remove_outputs(filename)
+        if built or removed:
+            self._save_manifest()
+
+        original = sum(e["source_size"] for e in self.manifest.values())
+        compressed = sum(e["br_size"] or e["gz_size"] for e in self.manifest.values())
+        logger.info(
+            f"[{self.name}] {len(built)} built, {len(unchanged)} unchanged, {len(removed)} removed"
+            f" ({original} -> {compressed} B over the wire)."
+        )
+        return {"built": built, "unchanged": unchanged, "removed": removed}
+
+
+if __name__ == "__main__":
+    StaticSiteBuilder().build(force="--force" in sys.argv)
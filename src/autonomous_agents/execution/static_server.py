@@ -0,0 +1,421 @@
+import os
+import sys
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import mimetypes
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+from loguru import logger
+
+sys.path.append(os.getcwd())
+
+from src.autonomous_agents.execution.static_builder import OUTPUT_DIR, MANIFEST_NAME
+
+# URL-prefix -> map op schijf
+MOUNTS = {
+    "/apps/": "apps",
+    "/output/": "data/output",
+    "/images/": "data/images",
+}
+CACHE_BYTES = 32 * 1024 * 1024
+CACHE_ITEM_BYTES = 1024 * 1024  # Grotere bestanden worden gestreamd, niet gecachet
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+KEEP_ALIVE_TIMEOUT = 15
+MAX_HEADER_BYTES = 16 * 1024
+MAX_DRAIN_BYTES = 1024 * 1024  # Grotere request bodies: verbinding sluiten i.p.v. uitlezen
+CHUNK_SIZE = 64 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+}
+
+mimetypes.add_type("text/markdown", ".md")
+
+
+def parse_accept_encoding(header):
+    """'gzip, br;q=0.5, deflate;q=0' -> {'gzip': 1.0, 'br': 0.5, 'deflate': 0.0}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    Eén byte-range ('bytes=0-99', 'bytes=100-', 'bytes=-50') -> (start, end)
+    inclusief, of None als de header onbruikbaar is (dan volgt een gewone 200).
+    Gooit ValueError bij een range buiten het bestand (416).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[len("bytes="):].strip().partition("-")
+    if not sep:
+        return None
+    if not start:
+        if not end.isdigit():
+            return None
+        length = int(end)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    if not start.isdigit() or (end and not end.isdigit()):
+        return None
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class HotCache:
+    """LRU cache van response-bodies, begrensd op het totaal aantal bytes."""
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key, version):
+        item = self._items.get(key)
+        if not item or item[0] != version:
+            return None
+        self._items.move_to_end(key)
+        return item[1]
+
+    def put(self, key, version, value):
+        length = len(value["body"])
+        if length > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old:
+            self.size -= len(old[1]["body"])
+        self._items[key] = (version, value)
+        self.size += length
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.size -= len(evicted["body"])
+
+
+class StaticServer:
+    """
+    Kleine asyncio HTTP/1.1 server voor `apps/`, `data/output` en `data/images`.
+
+    - Apps komen uit de StaticSiteBuilder output (geminificeerd, .br/.gz
+      voorgecomprimeerd) met de content hash als ETag; zonder build-entry
+      wordt het bronbestand geserveerd.
+    - If-None-Match -> 304, keuze uit br/gzip op basis van Accept-Encoding.
+    - Kleine bestanden zitten in een LRU hot cache (begrensd op bytes), grote
+      bestanden worden gestreamd, met ondersteuning voor Range requests.
+    """
+
+    def __init__(self, root=".", mounts=None, static_dir=OUTPUT_DIR, cache_bytes=CACHE_BYTES):
+        self.name = "StaticServer"
+        self.root = os.path.realpath(root)
+        self.mounts = mounts or MOUNTS
+        self.manifest_path = os.path.join(self.root, static_dir, MANIFEST_NAME)
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._fresh = {}
+        self.cache = HotCache(cache_bytes)
+        self.server = None
+
+    # --- Resolutie ---------------------------------------------------------
+
+    def _manifest_entry(self, filename):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return None
+        if mtime != self._manifest_mtime:
+            try:
+                with open(self.manifest_path, "r") as f:
+                    self._manifest = json.load(f)
+                self._manifest_mtime = mtime
+            except (OSError, ValueError):
+                return None
+        return self._manifest.get(filename)
+
+    def resolve(self, url_path):
+        """URL-pad -> (mount, absoluut bestandspad) of None (ook bij path traversal)."""
+        for prefix, directory in self.mounts.items():
+            if not url_path.startswith(prefix):
+                continue
+            relative = unquote(url_path[len(prefix):])
+            base = os.path.realpath(os.path.join(self.root, directory))
+            path = os.path.realpath(os.path.join(base, relative))
+            if path != base and not path.startswith(base + os.sep):
+                return None
+            if os.path.isfile(path):
+                return prefix, path
+            return None
+        return None
+
+    def _build_is_fresh(self, path, entry):
+        """Klopt de build nog met de bron? Hasht alleen opnieuw als de bron veranderde."""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size, entry["source_hash"])
+        cached = self._fresh.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        with open(path, "rb") as f:
+            fresh = hashlib.sha256(f.read()).hexdigest() == entry["source_hash"]
+        self._fresh[path] = (version, fresh)
+        return fresh
+
+    async def _variants(self, prefix, path):
+        """Beschikbare (encoding, pad, etag-basis) varianten, beste compressie eerst."""
+        if prefix == "/apps/":
+            entry = self._manifest_entry(os.path.basename(path))
+            if entry and os.path.exists(os.path.join(self.root, entry["path"])):
+                if await asyncio.to_thread(self._build_is_fresh, path, entry):
+                    variants = []
+                    if entry.get("br"):
+                        variants.append(("br", os.path.join(self.root, entry["br"]), entry["hash"]))
+                    variants.append(("gzip", os.path.join(self.root, entry["gz"]), entry["hash"]))
+                    variants.append((None, os.path.join(self.root, entry["path"]), entry["hash"]))
+                    return variants
+        return [(None, path, None)]
+
+    # --- Responses ---------------------------------------------------------
+
+    def _load(self, path, encoding, content_type, etag_base):
+        """Leest (en comprimeert zo nodig) een klein bestand; resultaat is cachebaar."""
+        with open(path, "rb") as f:
+            body = f.read()
+        if encoding == "gzip" and not path.endswith(".gz"):
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        tag = etag_base or hashlib.sha1(body).hexdigest()[:16]
+        suffix = f"-{encoding}" if encoding else ""
+        return {"body": body, "etag": f'"{tag}{suffix}"', "content_type": content_type}
+
+    async def handle_request(self, method, target, headers):
+        """
+        Bouwt de response voor één request. Geeft (status, headers, body) terug;
+        body is bytes of een (pad, offset, lengte) tuple om te streamen.
+        """
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+
+        url_path = urlsplit(target).path
+        resolved = self.resolve(url_path)
+        if not resolved:
+            return 404, {"Content-Type": "text/plain; charset=utf-8"}, b"Not Found"
+        prefix, source_path = resolved
+
+        content_type = mimetypes.guess_type(source_path)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        accepted = parse_accept_encoding(headers.get("accept-encoding"))
+        variants = await self._variants(prefix, source_path)
+        compressible = content_type.startswith(COMPRESSIBLE)
+
+        encoding, path, etag_base = variants[-1]
+        for candidate in variants:
+            if candidate[0] is None or accepted.get(candidate[0], 0) > 0:
+                encoding, path, etag_base = candidate
+                break
+        if encoding is None and compressible and accepted.get("gzip", 0) > 0:
+            encoding = "gzip"  # On-the-fly gzip (gecachet) voor niet-gebouwde tekstbestanden
+
+        stat = os.stat(path)
+        response_headers = {
+            "Content-Type": content_type,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Cache-Control": "public, max-age=86400" if prefix == "/images/" else "no-cache",
+        }
+        if compressible:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if stat.st_size <= CACHE_ITEM_BYTES:
+            key = (path, encoding)
+            version = (stat.st_mtime_ns, stat.st_size)
+            item = self.cache.get(key, version)
+            if item is None:
+                item = await asyncio.to_thread(self._load, path, encoding, content_type, etag_base)
+                self.cache.put(key, version, item)
+            body = item["body"]
+            size = len(body)
+            etag = item["etag"]
+        else:
+            # Groot bestand: niet in het geheugen, ETag uit grootte en mtime
+            body = None
+            size = stat.st_size
+            if not path.endswith((".gz", ".br")):
+                encoding = None  # Geen on-the-fly compressie van grote bestanden
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+        response_headers["ETag"] = etag
+        response_headers["Accept-Ranges"] = "bytes" if not encoding else "none"
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            return 304, {k: v for k, v in response_headers.items() if k != "Content-Type"}, b""
+
+        status, offset, length = 200, 0, size
+        range_header = headers.get("range")
+        if_range = headers.get("if-range")
+        if range_header and not encoding and (not if_range or if_range == etag):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return 416, {"Content-Range": f"bytes */{size}"}, b""
+            if byte_range:
+                start, end = byte_range
+                status, offset, length = 206, start, end - start + 1
+                response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        response_headers["Content-Length"] = str(length)
+        if method == "HEAD":
+            return status, response_headers, b""
+        if body is not None:
+            return status, response_headers, body[offset : offset + length]
+        return status, response_headers, (path, offset, length)
+
+    # --- HTTP/1.1 transport -------------------------------------------------
+
+    async def _read_request(self, reader):
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+        if len(head) > MAX_HEADER_BYTES:
+            raise ValueError("headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    async def _drain_body(self, reader, headers):
+        """
+        Leest een eventuele request body weg, zodat de volgende request op
+        dezelfde keep-alive verbinding bij het begin begint. Geeft False als
+        de verbinding daarna niet herbruikbaar is.
+        """
+        if "transfer-encoding" in headers:
+            return False  # Chunked bodies lezen we niet: na de response sluiten
+        length = headers.get("content-length", "0").strip() or "0"
+        if not length.isdigit():
+            raise ValueError("invalid content-length")
+        length = int(length)
+        if length > MAX_DRAIN_BYTES:
+            return False
+        if length:
+            await asyncio.wait_for(reader.readexactly(length), KEEP_ALIVE_TIMEOUT)
+        return True
+
+    async def _send(self, writer, status, headers, body, keep_alive):
+        headers = dict(headers)
+        headers["Date"] = formatdate(time.time(), usegmt=True)
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        if "Content-Length" not in headers and status != 304:
+            # Een 304 heeft geen body en dus geen Content-Length (RFC 9110 8.6)
+            headers["Content-Length"] = str(len(body)) if isinstance(body, bytes) else "0"
+        head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1"))
+
+        if isinstance(body, tuple):
+            path, offset, length = body
+            await writer.drain()
+            with open(path, "rb") as f:
+                try:
+                    await asyncio.get_running_loop().sendfile(writer.transport, f, offset, length)
+                except (NotImplementedError, RuntimeError):
+                    f.seek(offset)
+                    remaining = length
+                    while remaining > 0:
+                        chunk = f.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        writer.write(chunk)
+                        remaining -= len(chunk)
+                        await writer.drain()
+        elif body:
+            writer.write(body)
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    method, target, version, headers = await self._read_request(reader)
+                    reusable = await self._drain_body(reader, headers)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._send(writer, 400, {"Content-Length": "0"}, b"", False)
+                    break
+
+                keep_alive = (
+                    reusable
+                    and version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    status, response_headers, body = await self.handle_request(method, target, headers)
+                except Exception as e:
+                    logger.error(f"[{self.name}] {method} {target} failed: {e}")
+                    status, response_headers, body = 500, {"Content-Length": "0"}, b""
+                await self._send(writer, status, response_headers, body, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host="0.0.0.0", port=8081):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        sockets = ", ".join(str(s.getsockname()) for s in self.server.sockets)
+        logger.info(f"[{self.name}] 🌍 Serving {', '.join(self.mounts)} on {sockets}")
+        return self.server
+
+    async def serve_forever(self, host="0.0.0.0", port=8081):
+        await self.start(host, port)
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static server voor apps/, data/output en data/images")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--root", default=".")
+    args = parser.parse_args()
+    try:
+        asyncio.run(StaticServer(root=args.root).serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
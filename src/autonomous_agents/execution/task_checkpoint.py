@@ -0,0 +1,74 @@
+import json
+from loguru import logger
+from src.database.connection import get_db
+from src.database.schema import TASK_CHECKPOINTS_TABLE
+
+
+class TaskCheckpointStore:
+    """
+    Tussenstanden van langlopende squad-taken (stage, poging, code, testbestand,
+    laatste testoutput) in de database. Na een crash of herstart door
+    keep_alive.sh hervat een opnieuw geclaimde taak vanaf de laatst afgeronde
+    stage in plaats van alle LLM-calls te herhalen.
+
+    Zonder task_id (bijv. handmatige aanroep) is alles een no-op.
+    """
+
+    def __init__(self):
+        self.name = "TaskCheckpointStore"
+        self._ready = False
+
+    def _ensure_table(self, cursor):
+        if not self._ready:
+            cursor.execute(TASK_CHECKPOINTS_TABLE)
+            self._ready = True
+
+    def save(self, task_id, agent, stage, state):
+        if task_id is None:
+            return
+        try:
+            with get_db() as cursor:
+                self._ensure_table(cursor)
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO task_checkpoints (task_id, agent, stage, state, updated_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """,
+                    (task_id, agent, stage, json.dumps(state)),
+                )
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not save checkpoint for task {task_id}: {e}")
+
+    def load(self, task_id, agent):
+        """Geeft de state dict met 'stage' terug, of None."""
+        if task_id is None:
+            return None
+        try:
+            with get_db() as cursor:
+                self._ensure_table(cursor)
+                cursor.execute(
+                    "SELECT stage, state FROM task_checkpoints WHERE task_id = ? AND agent = ?",
+                    (task_id, agent),
+                )
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not load checkpoint for task {task_id}: {e}")
+            return None
+        if not row:
+            return None
+        state = json.loads(row["state"] or "{}")
+        state["stage"] = row["stage"]
+        return state
+
+    def clear(self, task_id, agent):
+        if task_id is None:
+            return
+        try:
+            with get_db() as cursor:
+                self._ensure_table(cursor)
+                cursor.execute(
+                    "DELETE FROM task_checkpoints WHERE task_id = ? AND agent = ?",
+                    (task_id, agent),
+                )
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not clear checkpoint for task {task_id}: {e}")
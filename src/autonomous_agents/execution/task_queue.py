@@ -50,6 +50,26 @@ class TaskQueue:
             logger.error(f"Failed to get next task: {e}")
             return None
 
+    def requeue_stale_tasks(self):
+        """
+        Zet taken die bij een crash op 'processing' bleven staan terug op
+        'pending'. Bedoeld voor bij het opstarten, vóórdat er geclaimd wordt.
+        """
+        query = """
+            UPDATE tasks 
+            SET status = 'pending', updated_at = CURRENT_TIMESTAMP 
+            WHERE status = 'processing'
+        """
+        try:
+            with get_db() as cursor:
+                cursor.execute(query)
+                if cursor.rowcount:
+                    logger.info(f"Requeued {cursor.rowcount} interrupted task(s).")
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Failed to requeue stale tasks: {e}")
+            return 0
+
     def complete_task(self, task_id, result=""):
         """Markeert een taak als voltooid."""
         query = """
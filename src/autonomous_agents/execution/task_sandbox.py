@@ -0,0 +1,131 @@
+import os
+import re
+import shutil
+import tempfile
+from loguru import logger
+from src.autonomous_agents.execution.git_publisher import GitPublisher
+
+SANDBOX_ROOT = os.path.join(tempfile.gettempdir(), "phoenix_sandboxes")
+
+
+class TaskSandbox:
+    """
+    Geïsoleerde git worktree per taak, zodat SYSTEM en WEB taken parallel
+    kunnen draaien zonder elkaars bestanden, tests of commits te raken.
+
+    Gebruik:
+        async with TaskSandbox(task_id) as sandbox:
+            result = await squad.build_feature(title, workdir=sandbox.path)
+            merge = await sandbox.merge_back()
+    """
+
+    def __init__(self, task_id, repo_path=None, sandbox_root=SANDBOX_ROOT):
+        self.name = "TaskSandbox"
+        self.task_id = task_id
+        self.repo_path = os.path.realpath(repo_path or os.getcwd())
+        self.sandbox_root = sandbox_root
+        self.git = GitPublisher(repo_path=self.repo_path)
+        self.path = None
+        self.base_commit = None
+
+    async def __aenter__(self):
+        await self.create()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cleanup()
+        return False
+
+    async def _snapshot_working_tree(self):
+        """
+        Maakt een commit-object van de huidige werkmap (inclusief niet-gecommitte
+        en nieuwe bestanden) via een tijdelijke index. De echte index en HEAD
+        blijven onaangeroerd.
+        """
+        fd, tmp_index = tempfile.mkstemp(prefix="phoenix_index_")
+        os.close(fd)
+        os.remove(tmp_index)
+        env = {"GIT_INDEX_FILE": tmp_index}
+        try:
+            async with self.git.lock:
+                await self.git._run_git("read-tree", "HEAD", env=env)
+                await self.git._run_git("add", "-A", env=env)
+                tree = await self.git._run_git("write-tree", env=env)
+            return await self.git._run_git(
+                "commit-tree", tree, "-p", "HEAD", "-m", f"sandbox base for task {self.task_id}"
+            )
+        finally:
+            if os.path.exists(tmp_index):
+                os.remove(tmp_index)
+
+    async def create(self):
+        os.makedirs(self.sandbox_root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=f"task_{self.task_id}_", dir=self.sandbox_root)
+        # `worktree add` wil een niet-bestaande (of lege) map
+        os.rmdir(self.path)
+
+        await self.git._run_git("worktree", "prune")
+        self.base_commit = await self._snapshot_working_tree()
+        await self.git._run_git("worktree", "add", "--detach", self.path, self.base_commit)
+        logger.info(f"[{self.name}] 📦 Sandbox for task {self.task_id}: {self.path}")
+        return self.path
+
+    def to_repo_path(self, path):
+        """Vertaalt een pad in de sandbox naar hetzelfde pad in de hoofd-repository."""
+        if not path or not self.path:
+            return path
+        abs_path = os.path.realpath(path)
+        sandbox = os.path.realpath(self.path)
+        if abs_path == sandbox or abs_path.startswith(sandbox + os.sep):
+            return os.path.join(self.repo_path, os.path.relpath(abs_path, sandbox))
+        return path
+
+    async def merge_back(self):
+        """
+        Past de wijzigingen uit de sandbox toe op de hoofd-werkmap.
+        Faalt de patch omdat dezelfde regels intussen elders gewijzigd zijn,
+        dan wordt er niets toegepast en volgt status 'conflict'.
+        """
+        await self.git._run_git("add", "-A", cwd=self.path)
+        files = await self.git._run_git(
+            "diff", "--cached", "--name-only", self.base_commit, cwd=self.path
+        )
+        if not files:
+            return {"status": "no_changes", "files": []}
+
+        files = files.splitlines()
+        # Onbewerkte bytes: strippen kapt een afsluitende lege contextregel (" ")
+        # af en decoderen beschadigt niet-UTF-8 bestanden
+        patch_input = await self.git._run_git(
+            "diff", "--cached", "--binary", self.base_commit, cwd=self.path, raw=True
+        )
+
+        async with self.git.lock:
+            try:
+                await self.git._run_git("apply", "--check", input=patch_input)
+            except Exception as e:
+                conflicts = sorted(set(re.findall(r"patch failed: ([^:]+):", str(e))))
+                logger.error(
+                    f"[{self.name}] ⚔️ Merge conflict for task {self.task_id}: {conflicts or e}"
+                )
+                return {
+                    "status": "conflict",
+                    "files": files,
+                    "conflicts": conflicts,
+                    "error": str(e),
+                }
+            await self.git._run_git("apply", input=patch_input)
+
+        logger.success(f"[{self.name}] 🔀 Task {self.task_id} merged back ({len(files)} files).")
+        return {"status": "merged", "files": files}
+
+    async def cleanup(self):
+        if not self.path:
+            return
+        try:
+            await self.git._run_git("worktree", "remove", "--force", self.path)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Worktree remove failed, deleting directory: {e}")
+            shutil.rmtree(self.path, ignore_errors=True)
+            await self.git._run_git("worktree", "prune")
+        self.path = None
@@ -1,15 +1,26 @@
 import os
+import asyncio
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
-from src.autonomous_agents.execution.git_publisher import GitPublisher
+from src.autonomous_agents.execution.snapshot_store import get_snapshot_store
+from src.autonomous_agents.execution.task_checkpoint import TaskCheckpointStore
+from src.autonomous_agents.analysis.app_index import AppIndex
+from src.autonomous_agents.execution.static_builder import StaticSiteBuilder
+from src.autonomous_agents.validation.html_validator import HTMLValidator
+from src.autonomous_agents.learning.brain import GlobalBrain
 
 
 class WebArchitect:
     def __init__(self):
         self.name = "FrontendSquad"  # Nieuwe Squad Naam
         self.ai = AIService()
-        self.publisher = GitPublisher()
+        self.snapshots = get_snapshot_store()
+        self.checkpoints = TaskCheckpointStore()
         self.apps_dir = "apps"
+        self.app_index = AppIndex(self.apps_dir)
+        self.static_builder = StaticSiteBuilder(self.apps_dir)
+        self.max_html_attempts = 2
+        self._brain = None  # Pas bij de eerste build: GlobalBrain maakt data/memory.json aan
 
         # ACADEMISCH SYSTEEM PROMPT VOOR FRONTEND
         self.system_prompt = """
@@ -30,51 +41,168 @@ class WebArchitect:
         - Schrijf schone, gecommentarieerde code.
         """
 
-    async def build_website(self, instruction):
+    async def _resolve_filename(self, instruction, workdir="."):
+        """
+        Kiest lokaal tussen een bestaande app (update) en een nieuw bestand op
+        basis van de app-index. Alleen bij twijfel tussen kandidaten mag de LLM
+        kiezen, en dan uit een vaste lijst.
+        """
+        index = self.app_index if workdir == "." else AppIndex(os.path.join(workdir, self.apps_dir))
+        decision = index.resolve(instruction)
+        if decision["action"] != "ambiguous":
+            logger.info(f"[{self.name}] 📁 {decision['action']}: {decision['file']} (zonder LLM)")
+            return decision["file"]
+
+        options = [c["file"] for c in decision["candidates"]]
+        choice_prompt = (
+            f"Opdracht: {instruction}\n"
+            f"Bestaande apps: {', '.join(options)}\n"
+            "Werkt deze opdracht een van deze apps bij? Antwoord met ALLEEN de bestandsnaam, of NEW."
+        )
+        answer = (await self.ai.generate_text(choice_prompt) or "").strip().strip("`'\"").lower()
+        filename = answer if answer in options else decision["new_file"]
+        logger.info(f"[{self.name}] 📁 Twijfelgeval {options} -> {filename}")
+        return filename
+
+    @staticmethod
+    def _strip_fences(response):
+        """Verwijdert alleen het omhullende ```html ... ``` blok; fences binnenin blijven (en falen)."""
+        lines = response.strip().splitlines()
+        if lines and lines[0].strip().startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        return "\n".join(lines).strip()
+
+    async def _generate_html(self, prompt):
+        """
+        Streamt de generatie door de HTMLValidator. Bij de eerste structurele
+        fout wordt de stream afgebroken (geen tokens verspillen aan een kapot
+        document). Geeft (code, fouten) terug; fouten is leeg als alles klopt.
+        """
+        validator = HTMLValidator(allow_wrapper=True)
+        chunks = []
+        failure = None
+        stream = self.ai.generate_text_stream(prompt)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                issues = validator.feed(chunk)
+                if issues:
+                    logger.warning(f"[{self.name}] ⛔ Generatie afgebroken: {issues[0]}")
+                    return None, issues
+        except Exception as e:
+            failure = f"Stream failed ({e})"
+        finally:
+            await stream.aclose()
+        if failure is None and not chunks:
+            # Offline of geen streaming-ondersteuning: de stream levert niets op
+            failure = "Stream produced no output"
+
+        if failure:
+            # Terugvallen op een gewone call (met backoff)
+            logger.warning(f"[{self.name}] {failure}, falling back to full generation.")
+            validator = HTMLValidator(allow_wrapper=True)
+            chunks = [await self.ai.generate_text(prompt) or ""]
+            validator.feed(chunks[0])
+
+        issues = validator.close()
+        if issues:
+            return None, issues
+        return self._strip_fences("".join(chunks)), []
+
+    def _lesson_context(self, instruction):
+        """Lessen voor de prompt; draait in een thread (de vectorindex kan bijbouwen)."""
+        if self._brain is None:
+            self._brain = GlobalBrain()
+        else:
+            # Andere processen voegen ook lessen toe
+            self._brain.reload_if_changed()
+        return self._brain.get_context(instruction)
+
+    async def build_website(self, instruction, workdir=".", task_id=None):
         logger.info(f"[{self.name}] 🏗️ Frontend ontwerp starten voor: {instruction}...")
 
+        # Na een crash: bestandsnaam en gegenereerde code uit het checkpoint halen
+        checkpoint = self.checkpoints.load(task_id, self.name) or {}
+        if checkpoint:
+            logger.info(f"[{self.name}] ⏯️ Hervat taak {task_id} bij stage '{checkpoint['stage']}'.")
+
         # 1. Bestandsnaam Bepalen
-        name_prompt = f"Geef een korte, logische bestandsnaam (eindigend op .html) voor deze app: {instruction}. Geef ALLEEN de bestandsnaam."
-        filename = await self.ai.generate_text(name_prompt)
-        filename = filename.strip().lower().replace(" ", "_").replace("`", "")
-        if not filename.endswith(".html"):
-            filename += ".html"
-
-        target_file = os.path.join(self.apps_dir, filename)
-
-        # 2. Check of bestand al bestaat (voor updates)
-        existing_code = ""
-        if os.path.exists(target_file):
-            with open(target_file, "r") as f:
-                existing_code = f.read()
-            logger.info(f"[{self.name}] ♻️ Bestaande app updaten: {filename}")
-
-        # 3. De Bouw Prompt
-        build_prompt = f"""
-        {self.system_prompt}
-        
-        OPDRACHT: {instruction}
-        
-        BESTAANDE CODE (indien leeg, begin nieuw):
-        {existing_code[:30000]}
-        
-        Output formaat: Geef ALLEEN de volledige HTML code terug (begin met <!DOCTYPE html>).
-        """
+        filename = checkpoint.get("filename")
+        if not filename:
+            filename = await self._resolve_filename(instruction, workdir)
+            self.checkpoints.save(task_id, self.name, "named", {"filename": filename})
 
-        response = await self.ai.generate_text(build_prompt)
+        apps_dir = os.path.join(workdir, self.apps_dir)
+        target_file = os.path.join(apps_dir, filename)
 
-        # 4. Schoonmaak & Opslag
-        code = response.replace("```html", "").replace("```", "").strip()
+        code = checkpoint.get("code")
+        if code is None:
+            # 2. Check of bestand al bestaat (voor updates)
+            existing_code = ""
+            if os.path.exists(target_file):
+                with open(target_file, "r") as f:
+                    existing_code = f.read()
+                logger.info(f"[{self.name}] ♻️ Bestaande app updaten: {filename}")
 
-        os.makedirs(self.apps_dir, exist_ok=True)
+            # 3. De Bouw Prompt, met de lessen die het meest op deze opdracht lijken
+            lessons = await asyncio.to_thread(self._lesson_context, instruction)
+            build_prompt = f"""
+            {self.system_prompt}
+            
+            OPDRACHT: {instruction}
 
-        # SAFETY NET: Eerst backuppen
-        await self.publisher.create_backup_commit(
-            f"Pre-modification of {os.path.basename(target_file)}"
+            {lessons}
+            
+            BESTAANDE CODE (indien leeg, begin nieuw):
+            {existing_code[:30000]}
+            
+            Output formaat: Geef ALLEEN de volledige HTML code terug (begin met <!DOCTYPE html>).
+            """
+
+            # 4. Genereren + structurele validatie, vóór er iets geschreven of gecommit wordt
+            prompt = build_prompt
+            for attempt in range(1, self.max_html_attempts + 1):
+                code, issues = await self._generate_html(prompt)
+                if code is not None:
+                    break
+                errors = "\n".join(str(i) for i in issues[:20])
+                logger.warning(
+                    f"[{self.name}] Ongeldige HTML (poging {attempt}/{self.max_html_attempts}):\n{errors}"
+                )
+                prompt = (
+                    f"{build_prompt}\n"
+                    f"Je vorige poging was structureel ongeldig:\n{errors}\n"
+                    "Lever een volledig, correct afgesloten document zonder markdown fences of uitleg."
+                )
+            else:
+                self.checkpoints.clear(task_id, self.name)
+                logger.error(f"[{self.name}] ❌ Geen geldige HTML voor {filename}; niets geschreven.")
+                return {"status": "failed", "file": target_file, "errors": [str(i) for i in issues]}
+
+            self.checkpoints.save(
+                task_id, self.name, "generated", {"filename": filename, "code": code}
+            )
+
+        # 5. Opslag
+        os.makedirs(apps_dir, exist_ok=True)
+
+        # SAFETY NET: Eerst snapshot van het bestand dat we overschrijven
+        snapshot_id = self.snapshots.snapshot(
+            [target_file], label=f"Pre-modification of {os.path.basename(target_file)}"
         )
 
         with open(target_file, "w") as f:
             f.write(code)
 
+        # Geminificeerde + voorgecomprimeerde variant; in een sandbox gebeurt dit na de merge
+        if workdir == ".":
+            try:
+                await asyncio.to_thread(self.static_builder.build_file, target_file)
+            except Exception as e:
+                logger.warning(f"[{self.name}] Static build failed for {filename}: {e}")
+
+        self.checkpoints.clear(task_id, self.name)
         logger.success(f"[{self.name}] 🌐 App opgeleverd: {filename}")
-        return {"status": "success", "file": target_file}
+        return {"status": "success", "file": target_file, "snapshot": snapshot_id}
@@ -1,8 +1,13 @@
 import json
 import os
 from loguru import logger
+from src.autonomous_agents.learning.simhash import SimHashIndex, simhash
+from src.autonomous_agents.learning.lessons_journal import LESSON_KINDS, get_lessons_journal
+from src.autonomous_agents.learning.lesson_vectors import NUMPY_AVAILABLE, get_lesson_index
 
 MEMORY_FILE = "data/memory.json"
+CONTEXT_LESSONS = 5
+LABELS = {"avoid_errors": "VERMIJD", "failed_patterns": "VERMIJD", "successful_patterns": "GEBRUIK"}
 
 
 class GlobalBrain:
@@ -24,26 +29,94 @@ class GlobalBrain:
                     self.memory = json.load(f)
             except:
                 self.memory = {"lessons_learned": []}
+        self._memory_stamp = self._current_stamp()
+        self._build_dedup()
+
+    def _current_stamp(self):
+        try:
+            st = os.stat(self.memory_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload_if_changed(self):
+        """Laadt memory.json opnieuw als een ander proces het intussen wijzigde."""
+        if self._current_stamp() != self._memory_stamp:
+            self._load_memory()
+
+    def _build_dedup(self):
+        """LSH-index per categorie; bestaande bijna-duplicaten vallen samen."""
+        self._dedup = {}
+        for category, items in list(self.memory.items()):
+            if not isinstance(items, list):
+                continue
+            self.memory[category] = []
+            for item in items:
+                if isinstance(item, dict) and "content" in item:
+                    self._merge_or_append(category, item)
 
     def _save_memory(self):
         # Zorg dat de map bestaat
         os.makedirs(os.path.dirname(self.memory_file), exist_ok=True)
         with open(self.memory_file, "w") as f:
             json.dump(self.memory, f, indent=4)
+        self._memory_stamp = self._current_stamp()
 
     def add_lesson(self, category, content):
         """Voegt een nieuwe les toe (bijv: 'Gebruik geen alert() in games')"""
         entry = {"timestamp": str(os.times()), "content": content}
-        if category not in self.memory:
-            self.memory[category] = []
-
-        self.memory[category].append(entry)
+        if self._merge_or_append(category, entry):
+            logger.info(f"🧠 [Brain] Nieuwe les opgeslagen in '{category}'")
+        else:
+            logger.info(f"🧠 [Brain] Bekende les in '{category}' (count verhoogd)")
         self._save_memory()
-        logger.info(f"🧠 [Brain] Nieuwe les opgeslagen in '{category}'")
 
-    def get_context(self):
-        """Geeft een samenvatting van wat we geleerd hebben voor de AI prompt"""
+    def _merge_or_append(self, category, entry):
+        """Geeft True bij een nieuwe les; een bijna-duplicaat verhoogt alleen 'count'."""
+        items = self.memory.setdefault(category, [])
+        index = self._dedup.setdefault(category, SimHashIndex())
+        fp = simhash(str(entry["content"]))
+        match = index.find(fp)
+        if match is not None:
+            items[match]["count"] = items[match].get("count", 1) + entry.get("count", 1)
+            items[match]["timestamp"] = entry.get("timestamp")
+            return False
+        index.add(len(items), fp)
+        items.append(dict(entry, count=entry.get("count", 1)))
+        return True
+
+    def _lesson_sources(self):
+        """Alle lessen: de eigen categorieën plus de patronen/fouten uit het lessons journal."""
+        sources = {f"brain:{c}": items for c, items in self.memory.items() if isinstance(items, list)}
+        journal = get_lessons_journal()
+        for kind in LESSON_KINDS:
+            sources[f"journal:{kind}"] = journal.get(kind, [])
+        return sources
+
+    def relevant_lessons(self, instruction, k=CONTEXT_LESSONS):
+        """De k lessen die het meest op de instructie lijken (lokale vectorindex); [] zonder NumPy."""
+        if not NUMPY_AVAILABLE or not instruction:
+            return []
+        try:
+            index = get_lesson_index()
+            index.sync(self._lesson_sources())
+            return index.search(instruction, k)
+        except Exception as e:
+            logger.warning(f"🧠 [Brain] Vectorindex niet beschikbaar: {e}")
+            return []
+
+    def get_context(self, instruction=None, k=CONTEXT_LESSONS):
+        """
+        Geeft een samenvatting van wat we geleerd hebben voor de AI prompt.
+        Met een instructie: de k meest relevante lessen; anders (of zonder
+        NumPy) de laatste 5 fouten en successen.
+        """
         summary = "GELEERDE LESSEN (Hou hier rekening mee):\n"
+        hits = self.relevant_lessons(instruction, k)
+        if hits:
+            for hit in hits:
+                summary += f"- {LABELS.get(hit['category'], 'LES')}: {hit['text']}\n"
+            return summary
         for item in self.memory.get("avoid_errors", [])[-5:]:  # Laatste 5 fouten
             summary += f"- VERMIJD: {item['content']}\n"
         for item in self.memory.get("successful_patterns", [])[
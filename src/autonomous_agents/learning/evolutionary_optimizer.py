@@ -4,6 +4,8 @@ import random
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
 from src.autonomous_agents.execution.task_queue import TaskQueue
+from src.autonomous_agents.analysis.file_catalog import get_catalog
+from src.autonomous_agents.learning.lessons_journal import get_lessons_journal
 
 class EvolutionaryOptimizer:
     def __init__(self):
@@ -11,6 +13,8 @@ class EvolutionaryOptimizer:
         self.queue = TaskQueue()
         self.lessons_file = "data/improvement_plans/lessons_learned.json"
         self.prompts_file = "data/improvement_plans/adaptive_prompts.json"
+        # Zelfde in-memory view als MemorySystem: geen JSON herlezen per cyclus
+        self.lessons = get_lessons_journal(self.lessons_file)
         
         self._ensure_prompts_file()
 
@@ -50,12 +54,7 @@ class EvolutionaryOptimizer:
         return None
 
     def _read_metrics(self):
-        try:
-            with open(self.lessons_file, 'r') as f:
-                data = json.load(f)
-                return data.get("metrics", {})
-        except Exception:
-            return {}
+        return self.lessons.metrics()
 
     async def _optimize_prompt_strategy(self):
         """
@@ -64,12 +63,7 @@ class EvolutionaryOptimizer:
         logger.info("🧠 Optimizing System Prompts via RLHF simulation...")
         
         # Lees lessen
-        try:
-            with open(self.lessons_file, 'r') as f:
-                data = json.load(f)
-                failures = data.get("failed_patterns", [])[-5:] # Laatste 5 fouten
-        except:
-            failures = []
+        failures = self.lessons.get("failed_patterns", [])[-5:] # Laatste 5 fouten
 
         failures_text = "\n".join([f"- {f.get('lesson', 'Unknown error')}" for f in failures])
         
@@ -87,17 +81,10 @@ class EvolutionaryOptimizer:
         """
         Code Quality: Zoekt naar 'messy' code en stelt refactor voor.
         """
-        # Scan src dir (simpel: zoek grootste bestand)
-        target_file = None
-        max_size = 0
-        for root, _, files in os.walk("src"):
-            for file in files:
-                if file.endswith(".py"):
-                    path = os.path.join(root, file)
-                    size = os.path.getsize(path)
-                    if size > max_size:
-                        max_size = size
-                        target_file = path
+        # Zoek grootste bestand via de gedeelde catalogus (geen volledige walk per cyclus)
+        largest = get_catalog("src").largest()
+        target_file = largest["path"] if largest else None
+        max_size = largest["size"] if largest else 0
         
         if target_file and max_size > 2000: # Alleen als bestand groot genoeg is
             instruction = f"SYSTEM: REFACTOR. Het bestand `{target_file}` is groot. Analyseer het en pas 'Extract Method' toe om de leesbaarheid te verbeteren. Zorg dat alle functionaliteit behouden blijft en tests blijven slagen."
@@ -110,12 +97,11 @@ class EvolutionaryOptimizer:
         """
         Quality Assurance: Zoekt naar bestanden zonder tests.
         """
-        for root, _, files in os.walk("src"):
-            for file in files:
-                if file.endswith(".py") and "__init__" not in file:
-                    test_file = os.path.join("tests", f"test_{file}")
-                    if not os.path.exists(test_file):
-                        instruction = f"SYSTEM: TEST COVERAGE. Maak een unit test bestand voor `{os.path.join(root, file)}`. Gebruik pytest."
-                        self.queue.add_task(title=instruction, description="Missing Test Coverage", source="evolutionary_optimizer")
-                        return f"Test Task Queued for {file}"
+        tests = get_catalog("tests")
+        for path in get_catalog("src").all_files():
+            file = os.path.basename(path)
+            if "__init__" not in file and not tests.has_name(f"test_{file}"):
+                instruction = f"SYSTEM: TEST COVERAGE. Maak een unit test bestand voor `{path}`. Gebruik pytest."
+                self.queue.add_task(title=instruction, description="Missing Test Coverage", source="evolutionary_optimizer")
+                return f"Test Task Queued for {file}"
         return None
@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import time
+import asyncio
+from collections import deque
+from loguru import logger
+
+BATCH_SIZE = int(os.getenv("PHOENIX_LESSON_BATCH", "5"))
+BATCH_MAX_DELAY = 120  # Seconden dat de oudste taak maximaal op een volle batch wacht
+BUSY_MAX_DEFER = 600  # Zo lang wijkt extractie maximaal voor lopende taken
+HOURLY_QUOTA = int(os.getenv("PHOENIX_LESSON_QUOTA", "12"))  # LLM-calls per uur
+MAX_BACKLOG = 100  # Daarboven vallen de oudste taken af
+RESULT_CHARS = 1500  # Per taak in de prompt
+POLL_INTERVAL = 1.0
+
+
+class LessonExtractor:
+    """
+    Haalt lessen uit afgeronde taken buiten het kritieke pad. `submit()` zet
+    een taak in de wachtrij en keert direct terug; een achtergrondtaak bundelt
+    tot batch_size taken in één samenvattingsprompt.
+
+    Lage prioriteit: zolang `is_busy()` waar is (er lopen taken) wacht de
+    extractie, maximaal busy_max_defer seconden. Eigen quotum: hooguit
+    hourly_quota LLM-calls per uur; daarboven blijven taken in de wachtrij.
+    """
+
+    def __init__(
+        self,
+        journal,
+        ai,
+        batch_size=BATCH_SIZE,
+        max_delay=BATCH_MAX_DELAY,
+        hourly_quota=HOURLY_QUOTA,
+        busy_max_defer=BUSY_MAX_DEFER,
+        max_backlog=MAX_BACKLOG,
+        is_busy=None,
+        poll_interval=POLL_INTERVAL,
+    ):
+        self.name = "LessonExtractor"
+        self.journal = journal
+        self.ai = ai
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.hourly_quota = hourly_quota
+        self.busy_max_defer = busy_max_defer
+        self.is_busy = is_busy or (lambda: False)
+        self.poll_interval = poll_interval
+        self.pending = deque(maxlen=max_backlog)
+        self.calls = deque()  # Tijdstippen van LLM-calls in het afgelopen uur
+        self._worker = None
+        self._wakeup = None
+
+    # --- Publieke API ---
+
+    def submit(self, title, result, status):
+        if len(self.pending) == self.pending.maxlen:
+            dropped = self.pending[0]
+            logger.warning(f"[{self.name}] Backlog vol, les voor '{dropped['title']}' vervalt.")
+        self.pending.append(
+            {
+                "title": title,
+                "result": str(result)[:RESULT_CHARS],
+                "status": status,
+                "queued_at": time.monotonic(),
+                "attempts": 0,
+            }
+        )
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+        elif len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Verwerkt alles wat in de wachtrij staat direct (bij afsluiten), zonder te wachten op rust of quotum."""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        while self.pending:
+            batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+            await self._extract(batch, retry=False)
+
+    # --- Achtergrond ---
+
+    def _oldest_age(self):
+        return time.monotonic() - self.pending[0]["queued_at"] if self.pending else 0.0
+
+    def _quota_wait(self):
+        """Seconden tot er weer een call binnen het quotum past (0 = nu)."""
+        now = time.monotonic()
+        while self.calls and now - self.calls[0] >= 3600:
+            self.calls.popleft()
+        if self.hourly_quota <= 0 or len(self.calls) < self.hourly_quota:
+            return 0.0
+        return 3600 - (now - self.calls[0])
+
+    def _ready(self):
+        if len(self.pending) < self.batch_size and self._oldest_age() < self.max_delay:
+            return False
+        if self.is_busy() and self._oldest_age() < self.max_delay + self.busy_max_defer:
+            return False
+        return self._quota_wait() == 0
+
+    async def _run(self):
+        while self.pending:
+            if not self._ready():
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+            await self._extract(batch)
+
+    def _build_prompt(self, batch):
+        tasks = "\n\n".join(
+            f"{i}. [{'SUCCES' if item['status'] == 'completed' else 'FOUT'}] Taak: {item['title']}\n"
+            f"   Resultaat: {item['result']}"
+            for i, item in enumerate(batch, 1)
+        )
+        return f"""
+        ANALYSEER DEZE {len(batch)} AFGERONDE TAKEN:
+
+        {tasks}
+
+        Geef per taak precies één zin:
+        - bij SUCCES: wat is het 'herbruikbare patroon'?
+        - bij FOUT: wat moeten we NOOIT meer doen?
+
+        Antwoord met ALLEEN een JSON lijst van {len(batch)} strings, in dezelfde volgorde.
+        """
+
+    @staticmethod
+    def _parse(response, expected):
+        """JSON-lijst, of anders genummerde regels. Geeft een lijst van `expected` items (None = ontbreekt)."""
+        response = response or ""
+        start, end = response.find("["), response.rfind("]")
+        if start != -1 and end > start:
+            try:
+                items = json.loads(response[start : end + 1])
+                if isinstance(items, list) and len(items) == expected:
+                    return [str(i).strip() if i else None for i in items]
+            except json.JSONDecodeError:
+                pass
+        numbered = {}
+        for match in re.finditer(r"^\s*(\d+)[.)]\s*(.+)$", response, re.MULTILINE):
+            numbered.setdefault(int(match.group(1)), match.group(2).strip())
+        return [numbered.get(i) for i in range(1, expected + 1)]
+
+    async def _extract(self, batch, retry=True):
+        self.calls.append(time.monotonic())
+        try:
+            response = await self.ai.generate_text(self._build_prompt(batch))
+            if not response or not response.strip():
+                # AIService geeft "" terug als hij offline is: net zo goed een mislukte call
+                raise RuntimeError("leeg antwoord")
+        except Exception as e:
+            logger.warning(f"[{self.name}] Extractie mislukt ({e}).")
+            if retry:
+                # Eén nieuwe kans in een latere batch
+                for item in reversed(batch):
+                    item["attempts"] += 1
+                    if item["attempts"] < 2:
+                        self.pending.appendleft(item)
+            return 0
+
+        stored = 0
+        for item, lesson in zip(batch, self._parse(response, len(batch))):
+            if not lesson:
+                continue
+            if item["status"] == "completed":
+                self.journal.add_success(item["title"], lesson)
+            else:
+                self.journal.add_failure(item["title"], lesson)
+            stored += 1
+        logger.info(f"[{self.name}] 🧠 {stored}/{len(batch)} lessen opgeslagen (1 LLM-call).")
+        return stored
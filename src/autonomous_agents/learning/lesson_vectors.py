@@ -0,0 +1,368 @@
+import os
+import json
+import math
+import hashlib
+import threading
+from functools import lru_cache
+from loguru import logger
+from src.autonomous_agents.learning.simhash import features
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+INDEX_DIR = "data/cache/lesson_vectors"
+DIM = 1024  # Gehashte feature-ruimte; float16 → 2 KB per les, 100k lessen = 200 MB memmap
+IVF_MIN_ROWS = 200000  # Daaronder is een exacte scan snel genoeg (~10-30 ms bij 100k lessen)
+NPROBE = 8  # Minimaal aantal IVF-clusters per query (en minstens 1/8 van alle clusters)
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 64  # Trainingsrijen per cluster
+SCAN_CHUNK = 16384  # Rijen per matrixvermenigvuldiging bij een volledige scan
+TEXT_FIELDS = ("content", "pattern", "lesson")
+
+
+@lru_cache(maxsize=262144)
+def _bucket(term, dim):
+    """Feature hashing: vaste bucket plus teken, zodat botsingen elkaar gemiddeld opheffen."""
+    h = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+    return h % dim, 1.0 if h >> 63 else -1.0
+
+
+def terms(text):
+    """Genormaliseerde woorden (zie simhash.features) plus woordparen voor een beetje volgorde."""
+    words = features(text)
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def vectorize(text, dim=DIM):
+    """Sublineaire TF-vector in de gehashte ruimte, L2-genormaliseerd."""
+    counts = {}
+    for term in terms(text):
+        counts[term] = counts.get(term, 0) + 1
+    # Eerst in een dict optellen: losse numpy-elementtoewijzingen zijn traag
+    weights = {}
+    for term, tf in counts.items():
+        bucket, sign = _bucket(term, dim)
+        weights[bucket] = weights.get(bucket, 0.0) + sign * (1.0 + math.log(tf))
+    vec = np.zeros(dim, dtype=np.float32)
+    if weights:
+        vec[list(weights)] = list(weights.values())
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _entry_text(entry):
+    """Tekst voor de prompt en tekst om op te zoeken (bij journal-lessen telt de taak mee)."""
+    if not isinstance(entry, dict):
+        return str(entry), str(entry)
+    shown = next((str(entry[f]) for f in TEXT_FIELDS if entry.get(f)), "")
+    return shown, f"{entry.get('task', '')} {shown}".strip()
+
+
+def _fingerprint(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class LessonVectorIndex:
+    """
+    Lokale vectorindex over alle lessen (GlobalBrain + lessons journal),
+    zonder netwerk of embedding-model: gehashte TF-vectoren, cosine top-k.
+
+    Opslag in `directory`:
+    - vectors.f16   memmap (capacity x dim), groeit door verdubbeling
+    - lists.i32     memmap met het IVF-cluster per rij (-1 = nog niet getraind)
+    - centroids.npy IVF-centroïden
+    - meta.jsonl    per rij de bron en de tekst voor de prompt
+    - df.npy        documentfrequentie per bucket
+    - state.json    aantallen en per bron hoeveel entries al geïndexeerd zijn
+
+    IDF wordt pas bij de query toegepast (idf² op de query ≈ idf aan beide
+    kanten), zodat opgeslagen vectoren nooit herberekend hoeven te worden als
+    de collectie groeit. Vanaf IVF_MIN_ROWS rijen wordt met k-means
+    gepartitioneerd en doorzoekt een query alleen de nprobe dichtstbijzijnde
+    clusters; bij elke verdubbeling wordt opnieuw getraind.
+    """
+
+    def __init__(self, directory=INDEX_DIR, dim=DIM, ivf_min_rows=IVF_MIN_ROWS, nprobe=NPROBE):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is niet geïnstalleerd")
+        self.name = "LessonVectorIndex"
+        self.directory = directory
+        self.dim = dim
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self.vectors_file = os.path.join(directory, "vectors.f16")
+        self.lists_file = os.path.join(directory, "lists.i32")
+        self.centroids_file = os.path.join(directory, "centroids.npy")
+        self.meta_file = os.path.join(directory, "meta.jsonl")
+        self.df_file = os.path.join(directory, "df.npy")
+        self.state_file = os.path.join(directory, "state.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # --- Laden en opslaan ---
+
+    def _reset_state(self):
+        self.count = 0
+        self.capacity = 0
+        self.trained_at = 0
+        self.synced = {}
+        self.meta = []
+        self.df = np.zeros(self.dim, dtype=np.float64)
+        self.centroids = None
+        self._vectors = None
+        self._lists = None
+
+    def _load(self):
+        self._reset_state()
+        self._state_mtime = None
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+            if state.get("dim") != self.dim:
+                raise ValueError(f"dimensie {state.get('dim')} != {self.dim}")
+            count = state["count"]
+            with open(self.meta_file, "r") as f:
+                meta = [json.loads(line) for _, line in zip(range(count), f)]
+                torn = bool(f.read(1))
+            if len(meta) < count:
+                raise ValueError("meta.jsonl is korter dan de index")
+            self.count, self.capacity = count, state["capacity"]
+            self.trained_at, self.synced, self.meta = state.get("trained_at", 0), state.get("synced", {}), meta
+            self.df = np.load(self.df_file)
+            if os.path.exists(self.centroids_file):
+                self.centroids = np.load(self.centroids_file)
+            self._open_arrays()
+            self._state_mtime = os.path.getmtime(self.state_file)
+        except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+            logger.warning(f"[{self.name}] Index onbruikbaar ({e}); wordt opnieuw opgebouwd.")
+            self.reset()
+            return
+        if torn:
+            # Regels na 'count' zijn van een afgebroken sync: weg, anders verschuiven de rijen
+            self._rewrite_meta()
+
+    def _open_arrays(self):
+        if self.capacity:
+            self._vectors = np.memmap(self.vectors_file, dtype=np.float16, mode="r+", shape=(self.capacity, self.dim))
+            self._lists = np.memmap(self.lists_file, dtype=np.int32, mode="r+", shape=(self.capacity,))
+
+    def _grow(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = max(1024, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+        self._close_arrays()
+        for path, width in ((self.vectors_file, self.dim * 2), (self.lists_file, 4)):
+            with open(path, "ab") as f:
+                f.truncate(capacity * width)
+        self.capacity = capacity
+        self._open_arrays()
+        self._lists[self.count :] = -1
+
+    def _close_arrays(self):
+        for array in (self._vectors, self._lists):
+            if array is not None:
+                array.flush()
+        self._vectors = self._lists = None
+
+    def _rewrite_meta(self):
+        tmp_file = self.meta_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in self.meta)
+        os.replace(tmp_file, self.meta_file)
+
+    def _save(self):
+        """Arrays eerst naar schijf, dan atomisch de state: die bepaalt hoeveel rijen geldig zijn."""
+        for array in (self._vectors, self._lists):
+            if array is not None:
+                array.flush()
+        np.save(self.df_file, self.df)
+        state = {
+            "dim": self.dim,
+            "count": self.count,
+            "capacity": self.capacity,
+            "trained_at": self.trained_at,
+            "synced": self.synced,
+        }
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+        self._state_mtime = os.path.getmtime(self.state_file)
+
+    def _reload_if_changed(self):
+        """Een ander proces (chat bridge, orchestrator) kan de index bijgewerkt hebben."""
+        try:
+            mtime = os.path.getmtime(self.state_file)
+        except OSError:
+            return
+        if mtime != self._state_mtime:
+            self._close_arrays()
+            self._load()
+
+    def reset(self):
+        self._close_arrays()
+        for path in (self.vectors_file, self.lists_file, self.centroids_file, self.meta_file, self.df_file, self.state_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self._reset_state()
+        self._state_mtime = None
+
+    def __len__(self):
+        return self.count
+
+    # --- Schrijven ---
+
+    def sync(self, sources):
+        """
+        Indexeert wat er sinds de vorige sync bij is gekomen. `sources` is
+        {naam: lijst met lessen}; de lijsten groeien alleen aan het eind
+        (bijna-duplicaten verhogen een count, de tekst blijft), dus per bron
+        volstaat de nieuwe staart. Een gekrompen of vervangen lijst leidt tot
+        een volledige herbouw. Geeft het aantal nieuwe rijen.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            for name, items in sources.items():
+                seen = self.synced.get(name)
+                if seen and (len(items) < seen["count"] or _fingerprint(_entry_text(items[seen["count"] - 1])[1]) != seen["last"]):
+                    logger.info(f"[{self.name}] Bron '{name}' is veranderd; index wordt herbouwd.")
+                    self.reset()
+                    break
+
+            new = []
+            for name, items in sources.items():
+                start = self.synced.get(name, {}).get("count", 0)
+                new.extend((name, entry) for entry in items[start:])
+            if not new:
+                return 0
+
+            self._grow(self.count + len(new))
+            start_row = self.count
+            for s in range(0, len(new), SCAN_CHUNK):
+                block = np.zeros((min(SCAN_CHUNK, len(new) - s), self.dim), dtype=np.float32)
+                for i, (name, entry) in enumerate(new[s : s + SCAN_CHUNK]):
+                    shown, text = _entry_text(entry)
+                    block[i] = vectorize(text, self.dim)
+                    self.meta.append({"source": name, "text": shown})
+                self._vectors[start_row + s : start_row + s + len(block)] = block
+                self.df += np.count_nonzero(block, axis=0)
+            with open(self.meta_file, "a") as f:
+                f.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in self.meta[start_row:])
+            self.count += len(new)
+
+            for name, items in sources.items():
+                if items:
+                    self.synced[name] = {"count": len(items), "last": _fingerprint(_entry_text(items[-1])[1])}
+
+            if self.count >= self.ivf_min_rows and self.count >= 2 * self.trained_at:
+                self._train()
+            elif self.centroids is not None:
+                self._assign(start_row, self.count)
+            self._save()
+            logger.debug(f"[{self.name}] {len(new)} lessen geïndexeerd ({self.count} totaal).")
+            return len(new)
+
+    # --- IVF ---
+
+    def _rows(self, start, end):
+        return np.asarray(self._vectors[start:end], dtype=np.float32)
+
+    def _assign(self, start, end):
+        for s in range(start, end, SCAN_CHUNK):
+            e = min(end, s + SCAN_CHUNK)
+            self._lists[s:e] = np.argmax(self._rows(s, e) @ self.centroids.T, axis=1)
+
+    def _train(self):
+        """Sferische k-means op een steekproef; daarna krijgt elke rij een cluster."""
+        nlist = max(1, int(math.sqrt(self.count)))
+        rng = np.random.default_rng(self.count)
+        sample_size = min(self.count, nlist * KMEANS_SAMPLE)
+        sample = np.asarray(self._vectors[np.sort(rng.choice(self.count, sample_size, replace=False))], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            present, starts = np.unique(labels[order], return_index=True)
+            sums = np.zeros_like(centroids)
+            sums[present] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Lege clusters krijgen een willekeurige rij als nieuw startpunt
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        np.save(self.centroids_file, self.centroids)
+        self._assign(0, self.count)
+        self.trained_at = self.count
+        logger.info(f"[{self.name}] IVF getraind: {nlist} clusters over {self.count} lessen.")
+
+    # --- Zoeken ---
+
+    def _query_vector(self, query):
+        idf = np.log((1.0 + self.count) / (1.0 + self.df)) + 1.0
+        q = vectorize(query, self.dim) * (idf**2).astype(np.float32)
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def search(self, query, k=5, nprobe=None):
+        """De k meest relevante lessen: [{'source', 'category', 'text', 'score'}], beste eerst."""
+        with self._lock:
+            self._reload_if_changed()
+            if not self.count or k <= 0:
+                return []
+            q = self._query_vector(query)
+            if not q.any():
+                return []
+
+            # Alleen de kolommen waarin de query iets heeft: een korte instructie raakt een paar
+            # buckets, dus per rij een handvol vermenigvuldigingen in plaats van dim
+            columns = np.flatnonzero(q)
+            q = q[columns]
+            if self.centroids is not None:
+                nprobe = nprobe or max(self.nprobe, len(self.centroids) // 8)
+                probes = np.argsort(-(self.centroids[:, columns] @ q))[:nprobe]
+                rows = np.flatnonzero(np.isin(self._lists[: self.count], probes))
+                scores = np.asarray(self._vectors[np.ix_(rows, columns)], dtype=np.float32) @ q
+            else:
+                rows = None
+                scores = np.concatenate(
+                    [
+                        np.asarray(self._vectors[s : min(self.count, s + SCAN_CHUNK)][:, columns], dtype=np.float32) @ q
+                        for s in range(0, self.count, SCAN_CHUNK)
+                    ]
+                )
+
+            k = min(k, len(scores))
+            if not k:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for i in top:
+                if scores[i] <= 0:
+                    break
+                row = int(rows[i]) if rows is not None else int(i)
+                meta = self.meta[row]
+                source, _, category = meta["source"].partition(":")
+                results.append({"source": source, "category": category, "text": meta["text"], "score": float(scores[i])})
+            return results
+
+
+_index = None
+
+
+def get_lesson_index():
+    """Eén index per proces (memmaps en meta blijven geladen)."""
+    global _index
+    if _index is None:
+        _index = LessonVectorIndex()
+    return _index
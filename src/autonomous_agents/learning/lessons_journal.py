@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import shutil
+import threading
+from loguru import logger
+from src.autonomous_agents.learning.simhash import SimHashIndex, simhash, features
+
+LESSONS_FILE = "data/improvement_plans/lessons_learned.json"
+COMPACT_EVERY = 50  # Events in het journal voordat er gecompacteerd wordt
+COMPACT_INTERVAL = 300  # ... of na zoveel seconden (zodat andere lezers de snapshot bijhouden)
+SEQ_KEY = "journal_seq"
+
+
+def journal_path(snapshot_file):
+    return os.path.splitext(snapshot_file)[0] + ".journal.jsonl"
+
+
+def empty_lessons():
+    return {"successful_patterns": [], "failed_patterns": [], "metrics": {}}
+
+
+LESSON_KINDS = {"successful_patterns": "pattern", "failed_patterns": "lesson"}
+
+
+def task_group(task):
+    """Groepssleutel voor bijna-duplicaten: dezelfde taak, ongeacht woordvolgorde of accenten."""
+    return " ".join(sorted(set(features(task))))
+
+
+def add_lesson(data, kind, entry, dedup=None):
+    """
+    Voegt een les toe, of verhoogt de 'count' van een bijna-duplicaat
+    (SimHash/LSH). Geeft True als er een nieuwe entry bijkwam.
+    """
+    entries = data.setdefault(kind, [])
+    if dedup is not None:
+        index = dedup.setdefault(kind, SimHashIndex())
+        fp = simhash(entry.get(LESSON_KINDS[kind], ""))
+        group = task_group(entry.get("task", ""))
+        match = index.find(fp, group)
+        if match is not None:
+            entries[match]["count"] = entries[match].get("count", 1) + entry.get("count", 1)
+            return False
+        index.add(len(entries), fp, group)
+    entries.append(dict(entry, count=entry.get("count", 1)))
+    return True
+
+
+def dedupe_lessons(data):
+    """Voegt bestaande bijna-duplicaten samen en geeft de opgebouwde LSH-indexen terug."""
+    dedup = {}
+    for kind in LESSON_KINDS:
+        old = data.get(kind, [])
+        data[kind] = []
+        for entry in old:
+            if isinstance(entry, dict):
+                add_lesson(data, kind, entry, dedup)
+    return dedup
+
+
+def apply_event(data, event, dedup=None):
+    """Past één journal-event toe op de view (zelfde structuur als lessons_learned.json)."""
+    op = event.get("op")
+    if op == "metric":
+        m = data.setdefault("metrics", {})
+        m.setdefault("total_tasks", 0)
+        m.setdefault("success_count", 0)
+        m.setdefault("avg_duration", 0.0)
+        m["total_tasks"] += 1
+        if event.get("status") == "completed":
+            m["success_count"] += 1
+        # Lopend gemiddelde; de eerste taak zet het gemiddelde direct
+        duration = event.get("duration", 0.0)
+        if m["total_tasks"] > 1:
+            m["avg_duration"] = (m["avg_duration"] * (m["total_tasks"] - 1) + duration) / m["total_tasks"]
+        else:
+            m["avg_duration"] = duration
+    elif op == "success":
+        add_lesson(
+            data,
+            "successful_patterns",
+            {"task": event.get("task", ""), "pattern": event.get("pattern", "")},
+            dedup,
+        )
+    elif op == "failure":
+        add_lesson(
+            data,
+            "failed_patterns",
+            {"task": event.get("task", ""), "lesson": event.get("lesson", "")},
+            dedup,
+        )
+
+
+class LessonsJournal:
+    """
+    Append-only opslag voor lessen en metrics. Elke update is één JSON-regel
+    in `<naam>.journal.jsonl` (O(1), een afgebroken schrijfactie kost hooguit
+    die ene regel). In het geheugen staat een gematerialiseerde view; op de
+    achtergrond wordt die periodiek gecompacteerd naar de snapshot
+    (lessons_learned.json, atomisch vervangen) en begint het journal opnieuw.
+
+    Nieuwe lessen die een bijna-duplicaat zijn van een bestaande les (SimHash,
+    zie simhash.py) verhogen alleen diens 'count'; het geheugen groeit met
+    unieke kennis, niet met het aantal taken.
+
+    Events dragen een volgnummer; de snapshot onthoudt het laatste verwerkte
+    nummer, zodat een crash tijdens compactie nooit events dubbel toepast.
+    """
+
+    def __init__(self, snapshot_file=LESSONS_FILE, compact_every=COMPACT_EVERY, compact_interval=COMPACT_INTERVAL):
+        self.name = "LessonsJournal"
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_path(snapshot_file)
+        self.compacting_file = self.journal_file + ".compacting"
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()  # Eén compactie tegelijk, snapshots in volgorde
+        self._compactor = None
+        self._seq = 0
+        self._pending = 0
+        self._last_compact = time.monotonic()
+        if os.path.dirname(snapshot_file):
+            os.makedirs(os.path.dirname(snapshot_file), exist_ok=True)
+        self.view = self._load()
+
+    # --- Laden ---
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_file):
+            return empty_lessons()
+        try:
+            with open(self.snapshot_file, "r") as f:
+                content = f.read()
+            data = json.loads(content) if content.strip() else empty_lessons()
+            if not isinstance(data, dict):
+                raise ValueError("snapshot is geen object")
+            return data
+        except (json.JSONDecodeError, ValueError):
+            logger.warning(f"⚠️ Corrupt JSON found in {self.snapshot_file}. Backing up and resetting.")
+            shutil.copy(self.snapshot_file, self.snapshot_file + ".bak")
+            return empty_lessons()
+
+    def _replay(self, path, data, after_seq):
+        if not os.path.exists(path):
+            return 0
+        applied = 0
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Afgebroken regel (crash midden in een append)
+                seq = event.get("seq", 0)
+                if seq <= after_seq:
+                    continue
+                apply_event(data, event, self._dedup)
+                self._seq = max(self._seq, seq)
+                applied += 1
+        return applied
+
+    def _repair_tail(self):
+        """Een afgebroken laatste regel afsluiten, anders plakt de volgende append eraan vast."""
+        if not os.path.exists(self.journal_file) or os.path.getsize(self.journal_file) == 0:
+            return
+        with open(self.journal_file, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def _load(self):
+        data = self._load_snapshot()
+        self._seq = data.pop(SEQ_KEY, 0)
+        # Oudere snapshots bevatten nog duplicaten; die vallen hier samen
+        self._dedup = dedupe_lessons(data)
+        snapshot_seq = self._seq
+        self._repair_tail()
+        leftover = self._replay(self.compacting_file, data, snapshot_seq)
+        self._pending = leftover + self._replay(self.journal_file, data, snapshot_seq)
+        if os.path.exists(self.compacting_file):
+            # Vorige compactie is halverwege gestopt: nu afmaken
+            self._write_snapshot(self._serialize(data, self._seq))
+            os.remove(self.compacting_file)
+        return data
+
+    # --- Schrijven ---
+
+    def append(self, event):
+        """Voegt een event toe aan journal en view. Start zo nodig een compactie op de achtergrond."""
+        with self._lock:
+            self._seq += 1
+            event = dict(event, seq=self._seq, ts=round(time.time(), 3))
+            line = json.dumps(event, ensure_ascii=False) + "\n"
+            fd = os.open(self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+            apply_event(self.view, event, self._dedup)
+            self._pending += 1
+        if self._should_compact():
+            self.compact_in_background()
+
+    def record_metric(self, status, duration):
+        self.append({"op": "metric", "status": status, "duration": duration})
+
+    def add_success(self, task, pattern):
+        self.append({"op": "success", "task": task, "pattern": pattern})
+
+    def add_failure(self, task, lesson):
+        self.append({"op": "failure", "task": task, "lesson": lesson})
+
+    # --- Lezen ---
+
+    def get(self, key, default=None):
+        return self.view.get(key, default)
+
+    def metrics(self):
+        return dict(self.view.get("metrics", {}))
+
+    # --- Compactie ---
+
+    def _should_compact(self):
+        if self._pending == 0:
+            return False
+        return self._pending >= self.compact_every or (
+            time.monotonic() - self._last_compact >= self.compact_interval
+        )
+
+    @staticmethod
+    def _serialize(data, seq):
+        return json.dumps(dict(data, **{SEQ_KEY: seq}), indent=2)
+
+    def _write_snapshot(self, text):
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def compact(self):
+        """Schrijft de view naar de snapshot en leegt het journal. Geeft het aantal verwerkte events."""
+        with self._compact_lock:
+            return self._compact()
+
+    def _compact(self):
+        with self._lock:
+            if self._pending == 0 and not os.path.exists(self.journal_file):
+                return 0
+            text = self._serialize(self.view, self._seq)
+            folded = self._pending
+            # Nieuwe appends gaan naar een vers journal; het oude blijft tot de snapshot staat
+            if os.path.exists(self.journal_file):
+                if os.path.exists(self.compacting_file):
+                    with open(self.journal_file, "r") as src, open(self.compacting_file, "a") as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_file)
+                else:
+                    os.replace(self.journal_file, self.compacting_file)
+            self._pending = 0
+            self._last_compact = time.monotonic()
+
+        self._write_snapshot(text)
+        if os.path.exists(self.compacting_file):
+            os.remove(self.compacting_file)
+        logger.debug(f"[{self.name}] {folded} events gecompacteerd naar {self.snapshot_file}.")
+        return folded
+
+    def compact_in_background(self):
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._safe_compact, name="lessons-compactor", daemon=True)
+        self._compactor.start()
+
+    def _safe_compact(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"[{self.name}] Compaction failed: {e}")
+
+    def wait(self):
+        """Wacht op een lopende achtergrondcompactie (voor afsluiten en tests)."""
+        if self._compactor:
+            self._compactor.join()
+
+
+_journals = {}
+
+
+def get_lessons_journal(snapshot_file=LESSONS_FILE):
+    """Eén journal per bestand per proces: MemorySystem en EvolutionaryOptimizer delen de view."""
+    key = os.path.abspath(snapshot_file)
+    if key not in _journals:
+        _journals[key] = LessonsJournal(snapshot_file)
+    return _journals[key]
@@ -1,9 +1,10 @@
 import os
-import json
 import time
-import shutil
 from loguru import logger
 from src.autonomous_agents.ai_service import AIService
+from src.autonomous_agents.analysis.knowledge_index import get_knowledge_index
+from src.autonomous_agents.learning.lessons_journal import get_lessons_journal
+from src.autonomous_agents.learning.lesson_extractor import LessonExtractor
 
 
 class MemorySystem:
@@ -11,9 +12,10 @@ class MemorySystem:
         self.memory_file = "PROJECT_MEMORY.md"
         self.lessons_file = "data/improvement_plans/lessons_learned.json"
         self.ai = AIService()
-
-        # Zorg dat de mappen bestaan
-        os.makedirs(os.path.dirname(self.lessons_file), exist_ok=True)
+        # Lessen en metrics: append-only journal met view, gecompacteerd naar lessons_file
+        self.journal = get_lessons_journal(self.lessons_file)
+        # Structurele 'Pattern' opslag (Reinforcement Learning light), gebundeld op de achtergrond
+        self.extractor = LessonExtractor(self.journal, self.ai)
         self._ensure_files()
 
     def _ensure_files(self):
@@ -23,34 +25,11 @@ class MemorySystem:
                     "# PROJECT PHOENIX MEMORY & CONTEXT\n\n## 🏗️ Architecture Status\n\n## 🧠 Lessons Learned\n"
                 )
 
-        # Check if lessons file exists and is valid JSON
-        if os.path.exists(self.lessons_file):
-            try:
-                with open(self.lessons_file, "r") as f:
-                    # Probeer te parsen. Als het faalt, triggert dit de except.
-                    content = f.read()
-                    if content.strip():
-                        json.loads(content)
-                    else:
-                        self._create_empty_lessons_file()
-            except json.JSONDecodeError:
-                logger.warning(
-                    f"⚠️ Corrupt JSON found in {self.lessons_file}. Backing up and resetting."
-                )
-                shutil.move(self.lessons_file, self.lessons_file + ".bak")
-                self._create_empty_lessons_file()
-        else:
-            self._create_empty_lessons_file()
-
-    def _create_empty_lessons_file(self):
-        with open(self.lessons_file, "w") as f:
-            json.dump(
-                {"successful_patterns": [], "failed_patterns": [], "metrics": {}}, f
-            )
-
     async def update_context_after_task(self, task_id, title, result, status, duration):
         """
         Leert van de uitgevoerde taak. Dit is de 'Feedback Loop'.
+        Alleen de goedkope stappen gebeuren hier; de LLM-analyse gaat via de
+        LessonExtractor gebundeld op de achtergrond.
         """
         logger.info("🧠 Analyseren van taakresultaat voor optimalisatie...")
 
@@ -59,47 +38,30 @@ class MemorySystem:
 
         # 2. Update Kennisbank (Context)
         if status == "completed":
-            await self._add_success_to_memory(title, result)
+            self._add_success_to_memory(title)
         else:
-            await self._analyze_failure(title, result)
+            logger.warning(f"📉 Foutanalyse ingepland voor: {title}")
+
+        # 3. Patroon/les extractie buiten het kritieke pad
+        self.extractor.submit(title, result, status)
+
+        # 4. Nieuwe kennis direct doorzoekbaar maken
+        try:
+            get_knowledge_index().refresh_file(self.memory_file)
+        except Exception as e:
+            logger.warning(f"Knowledge index update failed: {e}")
+
+    async def flush(self):
+        """Verwerkt openstaande lesextracties (bij afsluiten)."""
+        await self.extractor.flush()
 
     def _update_metrics(self, status, duration):
         try:
-            data = {"successful_patterns": [], "failed_patterns": [], "metrics": {}} # Default data structure
-            with open(self.lessons_file, "r") as f:
-                try:
-                    content = f.read()
-                    if content.strip():
-                        data = json.loads(content)
-                except json.JSONDecodeError:
-                    logger.warning(f"⚠️ Corrupt JSON found in {self.lessons_file} during metrics update. Resetting.")
-                    self._create_empty_lessons_file()
-            
-            # Garandeer dat de metrics structuur bestaat en correct is
-            data.setdefault("metrics", {})
-            m = data["metrics"]
-            
-            m.setdefault("total_tasks", 0)
-            m.setdefault("success_count", 0)
-            m.setdefault("avg_duration", 0.0) # Ensure float for average
-            
-            m["total_tasks"] += 1
-            if status == "completed":
-                m["success_count"] += 1
-            
-            # Update moving average duration
-            # Voorkom delen door nul als total_tasks net 1 is
-            if m["total_tasks"] > 1:
-                m["avg_duration"] = (m["avg_duration"] * (m["total_tasks"] - 1) + duration) / m["total_tasks"]
-            else:
-                m["avg_duration"] = duration # Eerste taak
-            
-            with open(self.lessons_file, "w") as f:
-                json.dump(data, f, indent=2)
+            self.journal.record_metric(status, duration)
         except Exception as e:
             logger.error(f"Failed to update metrics: {e}")
 
-    async def _add_success_to_memory(self, title, result):
+    def _add_success_to_memory(self, title):
         """Voegt succesvolle implementatie toe aan de context."""
         timestamp = time.strftime("%Y-%m-%d %H:%M")
         entry = f"\n- **[{timestamp}] {title}:** Succesvol afgerond. \n"
@@ -107,41 +69,3 @@ class MemorySystem:
         # Append aan MD file
         with open(self.memory_file, "a") as f:
             f.write(entry)
-
-        # Structurele 'Pattern' opslag (Reinforcement Learning light)
-        # We vragen de AI om te extraheren WAT er goed ging
-        analysis_prompt = f"""
-        ANALYSEER DIT SUCCES:
-        Taak: {title}
-        Resultaat: {result}
-        
-        Wat is het 'herbruikbare patroon' hieruit? (Max 1 zin).
-        """
-        pattern = await self.ai.generate_text(analysis_prompt)
-
-        with open(self.lessons_file, "r+") as f:
-            data = json.load(f)
-            data["successful_patterns"].append(
-                {"task": title, "pattern": pattern.strip()}
-            )
-            f.seek(0)
-            json.dump(data, f, indent=2)
-
-    async def _analyze_failure(self, title, error_msg):
-        """Analyseert een fout om herhaling te voorkomen (Bias Mitigation / Robustness)."""
-        logger.warning(f"📉 Foutanalyse gestart voor: {title}")
-
-        analysis_prompt = f"""
-        ANALYSEER DEZE FOUT:
-        Taak: {title}
-        Error: {error_msg}
-        
-        Wat moeten we NOOIT meer doen? (Max 1 zin).
-        """
-        lesson = await self.ai.generate_text(analysis_prompt)
-
-        with open(self.lessons_file, "r+") as f:
-            data = json.load(f)
-            data["failed_patterns"].append({"task": title, "lesson": lesson.strip()})
-            f.seek(0)
-            json.dump(data, f, indent=2)
\ No newline at end of file
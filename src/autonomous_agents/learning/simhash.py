@@ -0,0 +1,91 @@
+import re
+import hashlib
+import unicodedata
+
+BITS = 64
+BANDS = 4  # 4 banden van 16 bits
+MAX_DISTANCE = 3  # Met 4 banden vindt de LSH gegarandeerd alles tot afstand 3
+# Binnen dezelfde groep (bijv. dezelfde taak) mag een parafrase verder afwijken
+GROUP_DISTANCE = 16
+STOPWORDS = {
+    "de", "het", "een", "en", "van", "in", "op", "met", "voor", "is", "te", "om", "dat",
+    "die", "dit", "hier", "uit", "aan", "bij", "als", "zijn", "wordt", "door", "naar",
+    "the", "a", "an", "and", "of", "to", "in", "for", "with", "is", "that", "this",
+    "herbruikbare", "patroon", "reusable", "pattern",
+}
+
+
+def features(text):
+    """Genormaliseerde woorden: zonder accenten en stopwoorden, ruw gestemd."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    tokens = re.findall(r"[a-z0-9]+", text)
+    # Zeer korte teksten ('patroon a') niet leegfilteren: dan zou alles op elkaar lijken
+    words = [w for w in tokens if w not in STOPWORDS and len(w) > 1] or tokens
+    # Ruwe stemming: 'animaties' ~ 'animatie', 'functies' ~ 'functie'
+    words = [w[:-2] if len(w) > 5 and w.endswith(("en", "es")) else w for w in words]
+    return [w[:-1] if len(w) > 4 and w.endswith("s") else w for w in words]
+
+
+def _hash64(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text):
+    """64-bit SimHash: teksten met veel gedeelde features krijgen vingerafdrukken met weinig verschillende bits."""
+    counts = [0] * BITS
+    for feature in features(text):
+        h = _hash64(feature)
+        for bit in range(BITS):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(BITS) if counts[bit] > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    LSH-index over SimHash vingerafdrukken: elke vingerafdruk staat in
+    BANDS buckets (één per 16-bit band). Twee afdrukken met hooguit
+    MAX_DISTANCE verschillende bits delen minstens één band (duivenhokprincipe),
+    dus alleen de kandidaten uit die buckets hoeven vergeleken te worden.
+
+    Optioneel hoort een afdruk bij een groep (bijv. de genormaliseerde taak);
+    binnen de groep geldt de ruimere group_distance, zodat parafrases van
+    dezelfde les ook samenvallen.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, group_distance=GROUP_DISTANCE):
+        self.max_distance = max_distance
+        self.group_distance = group_distance
+        self.width = BITS // BANDS
+        self.mask = (1 << self.width) - 1
+        self.buckets = [{} for _ in range(BANDS)]
+        self.fingerprints = {}
+        self.groups = {}
+
+    def _bands(self, fp):
+        return [(fp >> (i * self.width)) & self.mask for i in range(BANDS)]
+
+    def add(self, key, fp, group=None):
+        self.fingerprints[key] = fp
+        if group:
+            self.groups.setdefault(group, []).append(key)
+        for bucket, band in zip(self.buckets, self._bands(fp)):
+            bucket.setdefault(band, []).append(key)
+
+    def find(self, fp, group=None):
+        """Dichtstbijzijnde bijna-duplicaat (key), of None."""
+        best, best_distance = None, None
+        candidates = [(k, self.max_distance) for b, band in zip(self.buckets, self._bands(fp)) for k in b.get(band, ())]
+        if group:
+            candidates += [(k, self.group_distance) for k in self.groups.get(group, ())]
+        for key, limit in candidates:
+            distance = hamming(fp, self.fingerprints[key])
+            if distance <= limit and (best_distance is None or distance < best_distance):
+                best, best_distance = key, distance
+        return best
+
+    def __len__(self):
+        return len(self.fingerprints)
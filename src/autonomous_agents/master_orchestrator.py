@@ -2,6 +2,7 @@ import asyncio
 import os
 import sys
 import time
+from collections import deque
 from loguru import logger
 
 sys.path.append(os.getcwd())
@@ -13,6 +14,7 @@ try:
     from src.autonomous_agents.execution.web_architect import WebArchitect
     from src.autonomous_agents.execution.research_agent import ResearchAgent
     from src.autonomous_agents.execution.git_publisher import GitPublisher
+    from src.autonomous_agents.execution.task_sandbox import TaskSandbox
     from src.autonomous_agents.learning.memory_system import MemorySystem
     from src.autonomous_agents.learning.evolutionary_optimizer import EvolutionaryOptimizer
 except ImportError:
@@ -37,83 +39,43 @@ class TermuxMasterOrchestrator:
         self.memory = MemorySystem()  # 🧠 The Brain
         self.optimizer = EvolutionaryOptimizer() # 🧬 The Evolution
 
+        # ISOLATION MODE: SYSTEM/WEB taken parallel, elk in een eigen git worktree
+        self.isolation_mode = os.getenv("PHOENIX_ISOLATION", "0") == "1"
+        self.max_parallel_tasks = int(os.getenv("PHOENIX_MAX_PARALLEL", "2"))
+        self.active_tasks = set()
+        self.claimed_tasks = deque()  # Al geclaimd, wachtend op een vrij slot
+        self.running_tasks = 0
+        # Lesextractie heeft lage prioriteit: wacht zolang er taken lopen
+        self.memory.extractor.is_busy = lambda: self.running_tasks > 0
+
     async def start(self):
         """Main loop of the autonomous system."""
         logger.info("🧠 TermuxMasterOrchestrator started. Entering autonomous loop...")
+        # Taken die bij een crash halverwege bleven hangen opnieuw oppakken (ze hervatten vanaf hun checkpoint)
+        self.listener.queue.requeue_stale_tasks()
         while True:
             try:
                 await self.run_cycle()
                 await asyncio.sleep(2)
             except KeyboardInterrupt:
                 logger.info("🛑 Stopping orchestrator...")
+                await self.memory.flush()
+                await self.publisher.flush()
                 break
             except Exception as e:
                 logger.error(f"Critical System Error: {e}")
                 await asyncio.sleep(5)
 
     async def run_cycle(self):
+        if self.isolation_mode:
+            return await self._run_parallel_cycle()
+
         # 1. Check Commando's
         orders = await self.listener.check_for_orders()
 
         if orders.get("status") == "new_tasks":
             for task in orders["tasks"]:
-                # ... (bestaande logica voor taakuitvoering) ...
-                title = task["title"]
-                task_id = task.get("id")
-                start_time = time.time()
-
-                logger.info(f"🚀 Starting Task {task_id}: {title}")
-
-                try:
-                    result = None
-                    # ROUTING NAAR SQUADS
-                    if "RESEARCH:" in title.upper():
-                        topic = title.split(":", 1)[1].strip()
-                        result = await self.intelligence.conduct_research(topic)
-
-                    elif "WEB:" in title.upper():
-                        result = await self.frontend_squad.build_website(title)
-                        await self.publisher.publish_changes()
-                        logger.debug(f"DEBUG: Frontend Squad Result: {result}")
-
-                    elif "SYSTEM:" in title.upper():
-                        result = await self.backend_squad.build_feature(title)
-                        
-                        # STRICT GIT POLICY: Alleen pushen als tests slagen
-                        if result.get("tests_passed", False):
-                            await self.publisher.publish_changes()
-                        else:
-                            logger.warning("🛑 Tests failed. Skipping git push to protect codebase.")
-
-                        logger.debug(f"DEBUG: Backend Squad Result: {result}")
-
-                    # Bereken duur
-                    duration = time.time() - start_time
-
-                    # Markeer als voltooid in DB
-                    if task_id:
-                        self.listener.queue.complete_task(
-                            task_id, result=str(result) # Store string representation of result in DB
-                        )
-
-                    # 🧠 LEER VAN DEZE SESSIE
-                    await self.memory.update_context_after_task(
-                        task_id, title, result, "completed", duration
-                    )
-                    return result # Return the complete result dictionary from the squad
-
-                except Exception as e:
-                    duration = time.time() - start_time
-                    logger.error(f"Task {task_id} Failed: {e}")
-
-                    if task_id:
-                        self.listener.queue.fail_task(task_id, error_message=str(e))
-
-                    # 🧠 LEER VAN DEZE FOUT
-                    await self.memory.update_context_after_task(
-                        task_id, title, str(e), "failed", duration
-                    )
-                    return {"status": "failed", "error": str(e)} # Return a failed status dictionary
+                return await self._execute_task(task)
         
         else:
             # 🧬 IDLE MODE: EVOLUTIONARY OPTIMIZATION
@@ -122,5 +84,126 @@ class TermuxMasterOrchestrator:
             
         return None # No tasks processed
 
+    async def _run_parallel_cycle(self):
+        """
+        ISOLATION MODE: claimt taken zolang er slots vrij zijn en draait ze
+        parallel, elk in een eigen TaskSandbox (git worktree).
+        """
+        claimed = 0
+        while len(self.active_tasks) < self.max_parallel_tasks:
+            if not self.claimed_tasks:
+                orders = await self.listener.check_for_orders()
+                if orders.get("status") != "new_tasks":
+                    break
+                # Eén poll kan meerdere taken opleveren: nooit meer starten dan er slots zijn
+                self.claimed_tasks.extend(orders["tasks"])
+            task = self.claimed_tasks.popleft()
+            job = asyncio.create_task(self._execute_task(task, isolated=True))
+            self.active_tasks.add(job)
+            job.add_done_callback(self.active_tasks.discard)
+            claimed += 1
+
+        if not claimed and not self.active_tasks:
+            await self.optimizer.suggest_improvement()
+        return None
+
+    async def _run_squad(self, build, title, task_id, isolated):
+        """Draait een bestand-schrijvende squad, optioneel in een eigen worktree."""
+        if not isolated:
+            return await build(title, task_id=task_id)
+
+        async with TaskSandbox(task_id) as sandbox:
+            result = await build(title, workdir=sandbox.path, task_id=task_id)
+            merge = await sandbox.merge_back()
+            # Vertalen zolang de sandbox nog bestaat: na cleanup is sandbox.path None
+            if isinstance(result, dict) and "file" in result:
+                result["file"] = sandbox.to_repo_path(result["file"])
+
+        if isinstance(result, dict):
+            result["merge"] = merge
+        if merge["status"] == "conflict":
+            raise RuntimeError(f"Merge conflict in {merge['conflicts'] or merge['files']}")
+        return result
+
+    async def _execute_task(self, task, isolated=False):
+        self.running_tasks += 1
+        try:
+            return await self._run_task(task, isolated)
+        finally:
+            self.running_tasks -= 1
+
+    async def _run_task(self, task, isolated=False):
+        title = task["title"]
+        task_id = task.get("id")
+        start_time = time.time()
+
+        logger.info(f"🚀 Starting Task {task_id}: {title}")
+
+        try:
+            result = None
+            # ROUTING NAAR SQUADS
+            if "RESEARCH:" in title.upper():
+                topic = title.split(":", 1)[1].strip()
+                result = await self.intelligence.conduct_research(topic)
+
+            elif "WEB:" in title.upper():
+                result = await self._run_squad(
+                    self.frontend_squad.build_website, title, task_id, isolated
+                )
+                if isolated:
+                    # De app is nu terug in apps/: incrementeel de statische build bijwerken
+                    try:
+                        await asyncio.to_thread(self.frontend_squad.static_builder.build)
+                    except Exception as e:
+                        logger.warning(f"Static build failed: {e}")
+                # Gedebouncede push op de achtergrond (gebundeld met andere taken),
+                # alleen als de HTML door de structurele validatie kwam
+                if result.get("status") == "success":
+                    self.publisher.schedule_publish(title)
+                else:
+                    logger.warning("🛑 Invalid HTML. Skipping git push to protect codebase.")
+                logger.debug(f"DEBUG: Frontend Squad Result: {result}")
+
+            elif "SYSTEM:" in title.upper():
+                result = await self._run_squad(
+                    self.backend_squad.build_feature, title, task_id, isolated
+                )
+                
+                # STRICT GIT POLICY: Alleen pushen als tests slagen
+                if result.get("tests_passed", False):
+                    self.publisher.schedule_publish(title)
+                else:
+                    logger.warning("🛑 Tests failed. Skipping git push to protect codebase.")
+
+                logger.debug(f"DEBUG: Backend Squad Result: {result}")
+
+            # Bereken duur
+            duration = time.time() - start_time
+
+            # Markeer als voltooid in DB
+            if task_id:
+                self.listener.queue.complete_task(
+                    task_id, result=str(result) # Store string representation of result in DB
+                )
+
+            # 🧠 LEER VAN DEZE SESSIE
+            await self.memory.update_context_after_task(
+                task_id, title, result, "completed", duration
+            )
+            return result # Return the complete result dictionary from the squad
+
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"Task {task_id} Failed: {e}")
+
+            if task_id:
+                self.listener.queue.fail_task(task_id, error_message=str(e))
+
+            # 🧠 LEER VAN DEZE FOUT
+            await self.memory.update_context_after_task(
+                task_id, title, str(e), "failed", duration
+            )
+            return {"status": "failed", "error": str(e)} # Return a failed status dictionary
+
 if __name__ == "__main__":
     asyncio.run(TermuxMasterOrchestrator().start())
@@ -29,7 +29,7 @@ class StaffingAgent:
         prompt = f"""
         WIJ ZIJN: Een autonoom AI systeem op een telefoon.
         HUIDIG TEAM: {existing_agents}
-        ONDERZOEK: {research.get("summary", "")}
+        ONDERZOEK: {research.get("report", "")}
 
         OPDRACHT:
         Het laatste onderzoek geeft aan dat specifieke agents effectiever zijn.  Kies een rol die zeer specifiek is voor een taak binnen softwareontwikkeling.
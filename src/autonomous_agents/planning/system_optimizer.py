@@ -6,6 +6,8 @@ from dotenv import load_dotenv
 from src.autonomous_agents.ai_service import AIService
 from src.autonomous_agents.learning.brain import GlobalBrain
 from src.autonomous_agents.execution.research_agent import ResearchAgent
+from src.autonomous_agents.analysis.file_catalog import get_catalog
+from src.autonomous_agents.analysis.code_index import get_code_index
 
 load_dotenv()
 
@@ -25,11 +27,7 @@ class SystemOptimizer:
 
     def _get_random_source_file(self):
         """Selecteert willekeurig een .py bestand uit de source directory."""
-        py_files = []
-        for root, _, files in os.walk(self.source_dir):
-            for file in files:
-                if file.endswith(".py"):
-                    py_files.append(os.path.join(root, file))
+        py_files = get_catalog(self.source_dir).all_files()
         return random.choice(py_files) if py_files else None
 
     async def optimize_system(self):
@@ -48,7 +46,7 @@ class SystemOptimizer:
         search_q = f"Python best practices optimization for {filename} library"
         logger.info(f"[{self.name}] 🌍 Best practices opzoeken voor {filename}...")
         research_results = await self.researcher.conduct_research(search_q)
-        research_summary = research_results.get("summary", "Geen specifieke data")
+        research_summary = research_results.get("report") or "Geen specifieke data"
 
         # 2. OPTIMALISEREN
         try:
@@ -61,14 +59,23 @@ class SystemOptimizer:
             logger.error(f"[{self.name}] ❗ Fout bij het lezen van {target_file}: {e}")
             return
 
+        # Alleen de symbolen die bij de research passen, niet de eerste N tekens
+        code_context = get_code_index(self.source_dir).context_for(
+            f"{search_q} {research_summary}",
+            target_file,
+            max_chars=self.max_code_snippet_length,
+        ) or code[: self.max_code_snippet_length]
+
         prompt = f"""
         Optimaliseer dit bestand: '{filename}'.
 
         GEBRUIK DEZE KENNIS VAN HET WEB:
         {research_summary}
 
+        {self.brain.get_context(f"{filename} {search_q}")}
+
         HUIDIGE CODE:
-        {code[: self.max_code_snippet_length]}
+        {code_context}
 
         OPDRACHT:
         Vind 1 concrete verbetering op basis van de research. Geef een duidelijke uitleg en suggestie voor de code aanpassing.
@@ -0,0 +1,156 @@
+import os
+import re
+import ast
+import sys
+import asyncio
+import importlib.util
+from loguru import logger
+
+SMOKE_TIMEOUT = 15
+# Geheimen horen niet in het proces dat onbekende gegenereerde code uitvoert
+SECRET_ENV_PATTERN = re.compile(r"KEY|TOKEN|SECRET|PASSWORD", re.IGNORECASE)
+
+# Leest de module van stdin en voert hem uit als module, zonder hem op schijf te zetten
+SMOKE_SCRIPT = """
+import sys, types
+path, workdir = sys.argv[1], sys.argv[2]
+sys.path[:0] = [workdir, __import__("os").path.dirname(path)]
+source = sys.stdin.read()
+module = types.ModuleType("__phoenix_smoke__")
+module.__file__ = path
+sys.modules[module.__name__] = module
+exec(compile(source, path, "exec"), module.__dict__)
+"""
+
+
+def _is_optional(handlers):
+    names = set()
+    for handler in handlers:
+        if handler.type is None:
+            return True
+        types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        names.update(getattr(t, "id", "") for t in types)
+    return bool(names & {"ImportError", "ModuleNotFoundError", "Exception"})
+
+
+def _imported_roots(tree):
+    """Top-level modulenamen van alle niet-optionele, absolute imports (naam, regel)."""
+    found = []
+
+    def visit(node, optional=False):
+        if isinstance(node, ast.Import):
+            if not optional:
+                found.extend((alias.name.split(".")[0], node.lineno) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if not optional and node.level == 0 and node.module:
+                found.append((node.module.split(".")[0], node.lineno))
+        elif isinstance(node, ast.Try):
+            guarded = optional or _is_optional(node.handlers)
+            for child in node.body:
+                visit(child, guarded)
+            for child in node.handlers + node.orelse + node.finalbody:
+                visit(child, optional)
+            return
+        for child in ast.iter_child_nodes(node):
+            visit(child, optional)
+
+    visit(tree)
+    return found
+
+
+class CodeValidator:
+    """
+    Snelle validatie van gegenereerde code vóórdat er geformatteerd, geschreven
+    of getest wordt: compileren, statische checks (verboden bestanden,
+    onbekende imports) en een import smoke test in een apart proces.
+    Alle checks geven (ok, foutmelding) terug met een precieze locatie.
+    """
+
+    def __init__(self, smoke_timeout=SMOKE_TIMEOUT):
+        self.name = "CodeValidator"
+        self.smoke_timeout = smoke_timeout
+
+    def check_syntax(self, code, target_file="<generated>"):
+        try:
+            compile(code, target_file, "exec")
+            return True, ""
+        except SyntaxError as e:
+            line = (e.text or "").rstrip()
+            pointer = " " * max((e.offset or 1) - 1, 0) + "^"
+            return False, f"SyntaxError in {target_file}, line {e.lineno}: {e.msg}\n    {line}\n    {pointer}"
+        except ValueError as e:
+            return False, f"Invalid source for {target_file}: {e}"
+
+    def _module_exists(self, name, target_file, workdir):
+        if name in sys.builtin_module_names or name in getattr(sys, "stdlib_module_names", ()):
+            return True
+        for base in (workdir, os.path.dirname(target_file)):
+            if os.path.exists(os.path.join(base, name)) or os.path.exists(os.path.join(base, name + ".py")):
+                return True
+        try:
+            return importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def check_static(self, code, target_file, workdir="."):
+        if os.path.basename(target_file) == "__init__.py":
+            return False, f"Forbidden: generated code may not modify {target_file}"
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return self.check_syntax(code, target_file)
+
+        unknown = [
+            f"line {line}: import '{name}' is not installed or not part of the project"
+            for name, line in _imported_roots(tree)
+            if not self._module_exists(name, target_file, workdir)
+        ]
+        if unknown:
+            return False, f"Unknown imports in {target_file}:\n" + "\n".join(unknown)
+        return True, ""
+
+    @staticmethod
+    def _sandbox_env():
+        return {k: v for k, v in os.environ.items() if not SECRET_ENV_PATTERN.search(k)}
+
+    async def smoke_import(self, code, target_file, workdir="."):
+        """Voert de module één keer uit in een subprocess (zonder geheimen, met timeout)."""
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            SMOKE_SCRIPT,
+            os.path.abspath(target_file),
+            os.path.abspath(workdir),
+            cwd=workdir,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            env=self._sandbox_env(),
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(
+                proc.communicate(code.encode("utf-8")), self.smoke_timeout
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.communicate()
+            return False, f"Import of {target_file} did not finish within {self.smoke_timeout}s (blocking code at module level?)"
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+
+        if proc.returncode == 0:
+            return True, ""
+        output = stdout.decode("utf-8", errors="replace").strip()
+        return False, f"Import smoke test of {target_file} failed:\n{output[-3000:]}"
+
+    async def validate(self, code, target_file, workdir="."):
+        """Draait alle checks, goedkoopste eerst. Stopt bij de eerste fout."""
+        ok, error = self.check_syntax(code, target_file)
+        if ok:
+            ok, error = self.check_static(code, target_file, workdir)
+        if ok:
+            ok, error = await self.smoke_import(code, target_file, workdir)
+        if not ok:
+            logger.warning(f"[{self.name}] ⛔ {error.splitlines()[0]}")
+        return ok, error
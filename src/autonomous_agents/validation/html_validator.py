@@ -0,0 +1,235 @@
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+# Eindtags die HTML zelf mag afleiden (<li>, <td>, ...): nooit als fout melden
+OPTIONAL_CLOSE = {
+    "p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th", "thead", "tbody",
+    "tfoot", "colgroup", "caption", "rt", "rp",
+}
+MAX_REPORTED = 20
+
+_FENCE = re.compile(r"^[ \t]*```", re.MULTILINE)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+class HTMLIssue(namedtuple("HTMLIssue", "line col message")):
+    __slots__ = ()
+
+    def __str__(self):
+        return f"line {self.line}, col {self.col}: {self.message}"
+
+
+class HTMLValidator(HTMLParser):
+    """
+    Structurele HTML-check in één doorgang, ook streaming: `feed()` mag met
+    losse chunks van een LLM-stream worden aangeroepen en geeft direct de
+    nieuw gevonden fouten terug, zodat een kapotte generatie vroeg afgebroken
+    kan worden. `close()` rondt af en geeft alle fouten terug.
+
+    Controleert: <!DOCTYPE> aanwezig, tag-balans, <script>/<style> blokken,
+    dubbele id's, losse ``` markdown fences en tekst na </html>.
+    Locaties zijn 1-based (regel, kolom).
+
+    Met allow_wrapper=True mag de output in één ```html ... ``` blok staan
+    (zoals LLM's vaak doen); fences midden in het document blijven fout.
+    """
+
+    def __init__(self, allow_wrapper=False):
+        super().__init__(convert_charrefs=True)
+        self.allow_wrapper = allow_wrapper
+        self.issues = []
+        self._new = []
+        self._stack = []  # (tag, line, col)
+        self._ids = {}
+        self._doctype = False
+        self._started = False  # Eerste tag of doctype gezien
+        self._text_before = False
+        self._html_closed = False
+        self._after_html_reported = False
+        self._closed = False
+        self._style = []  # Inhoud van het open <style> blok
+        self._pending = ""  # Onvolledige laatste regel van de vorige chunk
+
+    # --- Rapportage ---
+
+    def _report(self, message, line=None, col=None):
+        if line is None:
+            line, offset = self.getpos()
+            col = offset + 1
+        issue = HTMLIssue(line, col, message)
+        self.issues.append(issue)
+        self._new.append(issue)
+
+    def _here(self):
+        line, offset = self.getpos()
+        return line, offset + 1
+
+    # --- Streaming API ---
+
+    def feed(self, data):
+        """Verwerkt een chunk en geeft de fouten terug die deze chunk opleverde."""
+        # Alleen hele regels doorgeven: HTMLParser levert tekst per chunk af,
+        # en een fence of tekstregel mag niet over twee chunks verdeeld raken
+        self._pending += data
+        cut = self._pending.rfind("\n") + 1
+        if cut:
+            complete, self._pending = self._pending[:cut], self._pending[cut:]
+            super().feed(complete)
+        new, self._new = self._new, []
+        return new
+
+    def close(self):
+        """Rondt het document af en geeft alle fouten terug."""
+        if self._closed:
+            return self.issues
+        self._closed = True
+        if self._pending:
+            super().feed(self._pending)
+            self._pending = ""
+        leftover = self.rawdata.lstrip()
+        if leftover.startswith("<") and not self.cdata_elem:
+            self._report(f"Truncated tag '{leftover[:30]}' at end of document")
+        super().close()
+
+        if not self._started:
+            self._report("Empty document: no <!DOCTYPE html> or tags found", 1, 1)
+        for tag, line, col in reversed(self._stack):
+            if tag in OPTIONAL_CLOSE:
+                continue
+            hint = " (document truncated?)" if tag in ("script", "style", "html", "body") else ""
+            self._report(f"Unclosed <{tag}>{hint}", line, col)
+        self._stack = []
+        self._new = []
+        return self.issues
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    # --- Parser callbacks ---
+
+    def handle_decl(self, decl):
+        if decl.lower().startswith("doctype"):
+            if self._started:
+                self._report("<!DOCTYPE> must be the first thing in the document")
+            self._doctype = True
+        self._started = True
+
+    def _open(self, tag, attrs):
+        if self._html_closed:
+            self._content_after_html()
+        if not self._started:
+            self._started = True
+            if not self._doctype:
+                self._report("Missing <!DOCTYPE html> before first tag")
+        for name, value in attrs:
+            if name == "id" and value:
+                if value in self._ids:
+                    first_line, first_col = self._ids[value]
+                    self._report(f"Duplicate id '{value}' (first used at line {first_line}, col {first_col})")
+                else:
+                    self._ids[value] = self._here()
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            line, col = self._here()
+            self._stack.append((tag, line, col))
+
+    def handle_startendtag(self, tag, attrs):
+        # <path />, <br/>: opent en sluit in één keer
+        self._open(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        open_tags = [t for t, _, _ in self._stack]
+        if tag not in open_tags:
+            self._report(f"Unexpected closing tag </{tag}> (no open <{tag}>)")
+            return
+        while self._stack:
+            open_tag, line, col = self._stack.pop()
+            if open_tag == tag:
+                if tag == "style":
+                    self._check_style("".join(self._style), line, col)
+                    self._style = []
+                break
+            if open_tag not in OPTIONAL_CLOSE:
+                self._report(f"Unclosed <{open_tag}> (opened at line {line}, col {col}) before </{tag}>")
+        if tag == "html":
+            self._html_closed = True
+
+    def _content_after_html(self):
+        if not self._after_html_reported:
+            self._after_html_reported = True
+            self._report("Content after </html>")
+
+    def handle_data(self, data):
+        line, offset = self.getpos()
+        self._check_fences(data, line, offset)
+
+        current = self._stack[-1][0] if self._stack else None
+        if current == "script":
+            self._check_script(data)
+        elif current == "style":
+            self._style.append(data)
+        elif data.strip() and not self._only_fences(data):
+            if self._html_closed:
+                self._content_after_html()
+            elif not self._started and not self._text_before:
+                self._text_before = True
+                self._report("Text before <!DOCTYPE html>")
+
+    @staticmethod
+    def _only_fences(data):
+        """Alleen fence-regels en whitespace; die zijn al door _check_fences beoordeeld."""
+        return all(not l.strip() or l.strip().startswith("```") for l in data.splitlines())
+
+    def _check_fences(self, data, line, offset):
+        for match in _FENCE.finditer(data):
+            before = data[: match.start()]
+            newlines = before.count("\n")
+            if newlines == 0 and offset > 0:
+                continue  # Niet aan het begin van een regel
+            fence_line = line + newlines
+            col = len(match.group(0)) - 3 + 1 + (offset if newlines == 0 else 0)
+            outside = not self._started or self._html_closed
+            if self.allow_wrapper and outside and not self._stack:
+                continue
+            self._report("Stray markdown fence ``` in document", fence_line, col)
+
+    def _check_script(self, data):
+        match = re.search(r"<script\b", data, re.IGNORECASE)
+        if match:
+            line, offset = self.getpos()
+            before = data[: match.start()]
+            newlines = before.count("\n")
+            col = (offset if newlines == 0 else 0) + len(before.rsplit("\n", 1)[-1]) + 1
+            self._report("Nested <script> inside script block (missing </script>?)", line + newlines, col)
+
+    def _check_style(self, css, line, col):
+        css = _CSS_COMMENT.sub("", css)
+        if css.count("{") != css.count("}"):
+            self._report(
+                f"Unbalanced braces in <style> block ({css.count('{')} '{{' vs {css.count('}')} '}}')",
+                line,
+                col,
+            )
+
+
+def validate_html(html, allow_wrapper=False):
+    """Valideert een volledig document. Geeft (ok, foutmelding) terug, zoals CodeValidator."""
+    validator = HTMLValidator(allow_wrapper=allow_wrapper)
+    validator.feed(html)
+    issues = validator.close()
+    if not issues:
+        return True, ""
+    lines = [str(issue) for issue in issues[:MAX_REPORTED]]
+    if len(issues) > MAX_REPORTED:
+        lines.append(f"... and {len(issues) - MAX_REPORTED} more")
+    return False, f"{len(issues)} HTML structure error(s):\n" + "\n".join(lines)
@@ -0,0 +1,140 @@
+"""
+Pytest zygote: een langlevend proces met pytest en veelgebruikte imports al
+geladen. Per test-aanvraag wordt er een child geforkt die de test draait; een
+timeout killt alleen die child. Protocol: één JSON object per regel op stdin,
+één JSON antwoord per regel op stdout.
+
+Wordt gestart door TestWorkerPool, niet direct.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import importlib
+
+PRELOAD_MODULES = [
+    "pytest",
+    "_pytest.config",
+    "_pytest.main",
+    "_pytest.python",
+    "_pytest.assertion.rewrite",
+    "_pytest.capture",
+    "_pytest.fixtures",
+    "unittest.mock",
+    "asyncio",
+    "json",
+    "sqlite3",
+    "subprocess",
+    "loguru",
+    "dotenv",
+]
+
+
+def preload():
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass  # Optionele imports; de child importeert ze zelf alsnog
+
+
+def run_child(request, output_path):
+    """Draait in de geforkte child. Keert nooit terug."""
+    code = 3
+    try:
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        os.close(fd)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        cwd = request["cwd"]
+        os.chdir(cwd)
+        sys.path.insert(0, cwd)
+
+        import pytest
+
+        code = int(pytest.main([request["test_path"], "-p", "no:cacheprovider"]))
+    except BaseException as e:
+        print(f"Zygote child error: {e!r}")
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def handle(request):
+    fd, output_path = tempfile.mkstemp(prefix="phoenix_pytest_", suffix=".log")
+    os.close(fd)
+    timeout = float(request.get("timeout", 30))
+    start = time.monotonic()
+    timed_out = False
+
+    pid = os.fork()
+    if pid == 0:
+        run_child(request, output_path)
+
+    status = None
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() - start > timeout:
+            timed_out = True
+            os.kill(pid, signal.SIGKILL)
+            _, status = os.waitpid(pid, 0)
+            break
+        time.sleep(0.01)
+
+    try:
+        with open(output_path, "r", errors="replace") as f:
+            output = f.read()
+    finally:
+        os.remove(output_path)
+
+    returncode = os.waitstatus_to_exitcode(status)
+    if timed_out:
+        output += f"\nTIMEOUT: test run killed after {timeout:.0f}s"
+    return {
+        "id": request.get("id"),
+        "passed": returncode == 0 and not timed_out,
+        "returncode": returncode,
+        "output": output,
+        "timed_out": timed_out,
+        "duration": time.monotonic() - start,
+    }
+
+
+def main():
+    preload()
+    # Ctrl+C van de orchestrator hoort de zygote niet te laten crashen midden in een antwoord
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    print(json.dumps({"ready": True}), flush=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = {}
+        try:
+            request = json.loads(line)
+            response = handle(request)
+        except Exception as e:
+            response = {
+                "id": request.get("id"),
+                "passed": False,
+                "returncode": -1,
+                "output": f"Zygote error: {e!r}",
+                "timed_out": False,
+                "duration": 0.0,
+            }
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 import ast
 from loguru import logger
+from src.autonomous_agents.validation.html_validator import validate_html
 
 
 class QualityAssuranceAgent:
@@ -38,6 +39,20 @@ class QualityAssuranceAgent:
             return {"status": "failed", "msg": str(e)}
 
     def audit_web(self, filepath):
-        """Simpele check voor HTML"""
-        # Hier zou je later een HTML validator kunnen inbouwen
-        return {"status": "passed", "msg": "HTML structuur OK"}
+        """Structurele check voor HTML (tag-balans, doctype, script/style, id's, fences)"""
+        if not filepath.endswith((".html", ".htm")):
+            return {"status": "passed", "msg": "Geen HTML bestand"}
+
+        logger.info(f"[{self.name}] 🔍 Inspecteren van {os.path.basename(filepath)}...")
+
+        try:
+            with open(filepath, "r", errors="replace") as f:
+                ok, error = validate_html(f.read())
+        except Exception as e:
+            return {"status": "failed", "msg": str(e)}
+
+        if ok:
+            return {"status": "passed", "msg": "HTML structuur OK"}
+        error_msg = f"❌ {os.path.basename(filepath)}: {error}"
+        logger.error(f"[{self.name}] {error_msg}")
+        return {"status": "failed", "msg": error_msg}
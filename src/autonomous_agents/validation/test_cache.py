@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import hashlib
+from loguru import logger
+from src.autonomous_agents.analysis.code_index import interface_signature
+
+TEST_CACHE_FILE = "data/cache/generated_tests.json"
+MAX_ENTRIES = 200
+# Zo vaak mag een nooit-geslaagde gecachte test falen voordat we hem opnieuw laten genereren
+MAX_UNVERIFIED_FAILURES = 2
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class GeneratedTestCache:
+    """
+    Cache van door de LLM gegenereerde testbestanden, gesleuteld op de module
+    (pad t.o.v. de workdir), de AST-afgeleide publieke interface en de
+    opdracht. Zolang die gelijk blijven, hergebruiken we de test en kost een
+    nieuwe poging één LLM-call in plaats van twee. Een nieuwe opdracht met
+    dezelfde interface (bijv. 'divide geeft None i.p.v. een exception') krijgt
+    nieuwe tests: de oude zouden het gewenste gedrag terugdraaien.
+
+    Een test die nog nooit geslaagd is en herhaaldelijk faalt wordt weggegooid:
+    dan is de kans groot dat de test zelf fout is.
+    """
+
+    __test__ = False  # Geen pytest test class, ondanks de naam
+
+    def __init__(self, cache_file=TEST_CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.name = "GeneratedTestCache"
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.entries = self._load()
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        if len(self.entries) > self.max_entries:
+            oldest = sorted(self.entries, key=lambda k: self.entries[k]["used"])
+            for key in oldest[: len(self.entries) - self.max_entries]:
+                del self.entries[key]
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"[{self.name}] Could not persist test cache: {e}")
+
+    @staticmethod
+    def key(module_path, code, instruction=""):
+        """None als de interface niet te bepalen is (ongeldige code): dan niet cachen."""
+        signature = interface_signature(code)
+        if signature is None:
+            return None
+        return _sha1(f"{os.path.normpath(module_path)}\n{signature}\n{instruction}")
+
+    def get(self, module_path, code, instruction=""):
+        key = self.key(module_path, code, instruction)
+        entry = self.entries.get(key) if key else None
+        if not entry:
+            return None
+        entry["used"] = time.time()
+        return entry["test_code"]
+
+    def put(self, module_path, code, test_code, instruction=""):
+        key = self.key(module_path, code, instruction)
+        if not key:
+            return
+        self.entries[key] = {
+            "module": module_path,
+            "impl_hash": _sha1(code),
+            "test_code": test_code,
+            "verified": False,
+            "failures": 0,
+            "used": time.time(),
+        }
+        self._save()
+
+    def record_result(self, module_path, code, passed, instruction=""):
+        key = self.key(module_path, code, instruction)
+        entry = self.entries.get(key) if key else None
+        if not entry:
+            return
+        entry["impl_hash"] = _sha1(code)
+        if passed:
+            entry["verified"] = True
+            entry["failures"] = 0
+        else:
+            entry["failures"] += 1
+            if not entry["verified"] and entry["failures"] >= MAX_UNVERIFIED_FAILURES:
+                logger.info(f"[{self.name}] Dropping unverified tests for {module_path}.")
+                del self.entries[key]
+        self._save()
+
+
+_cache = None
+
+
+def get_test_cache():
+    """Gedeelde cache voor het hele proces (ook voor tournament-kandidaten)."""
+    global _cache
+    if _cache is None:
+        _cache = GeneratedTestCache()
+    return _cache
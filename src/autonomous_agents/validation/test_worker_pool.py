@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import itertools
+from loguru import logger
+
+ZYGOTE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pytest_zygote.py")
+POOL_SIZE = 2
+TEST_TIMEOUT = 30
+ZYGOTE_GRACE = 10  # Extra tijd voor de zygote zelf bovenop de test timeout
+
+
+class TestWorkerPool:
+    """
+    Pool van voorverwarmde pytest zygotes (zie pytest_zygote.py).
+    Scheelt per testrun de opstart van de interpreter, pytest en plugins;
+    een timeout killt alleen de geforkte child, de zygote blijft warm.
+    Zonder os.fork (bijv. Windows) valt de pool terug op een gewone subprocess.
+    """
+
+    __test__ = False  # Geen pytest test class, ondanks de naam
+
+    def __init__(self, size=POOL_SIZE, timeout=TEST_TIMEOUT):
+        self.name = "TestWorkerPool"
+        self.size = size
+        self.timeout = timeout
+        self.enabled = hasattr(os, "fork")
+        self._idle = None
+        self._start_lock = None
+        self._ids = itertools.count(1)
+
+    async def _spawn(self):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            ZYGOTE_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        ready = await asyncio.wait_for(proc.stdout.readline(), ZYGOTE_GRACE * 3)
+        if not ready:
+            raise RuntimeError("pytest zygote exited during start-up")
+        return proc
+
+    async def start(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None or not self.enabled:
+                return
+            try:
+                workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+            except Exception as e:
+                logger.warning(f"[{self.name}] Zygotes unavailable, using plain pytest: {e}")
+                self.enabled = False
+                return
+            self._idle = asyncio.Queue()
+            for proc in workers:
+                self._idle.put_nowait(proc)
+            logger.info(f"[{self.name}] 🔥 {self.size} warm pytest workers ready.")
+
+    @staticmethod
+    def _kill(proc):
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+    async def run(self, test_path, cwd=".", timeout=None):
+        """
+        Draait één testbestand. Geeft een dict terug met
+        passed, returncode, output, timed_out en duration.
+        """
+        timeout = timeout or self.timeout
+        request = {
+            "id": next(self._ids),
+            "test_path": os.path.abspath(test_path),
+            "cwd": os.path.abspath(cwd),
+            "timeout": timeout,
+        }
+
+        await self.start()
+        if not self.enabled:
+            return await self._run_subprocess(request)
+
+        proc = await self._idle.get()
+        healthy = False
+        try:
+            if proc is None or proc.returncode is not None:
+                proc = await self._spawn()
+            proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            await proc.stdin.drain()
+
+            deadline = time.monotonic() + timeout + ZYGOTE_GRACE
+            while True:
+                remaining = deadline - time.monotonic()
+                line = await asyncio.wait_for(proc.stdout.readline(), max(remaining, 0.1))
+                if not line:
+                    raise RuntimeError("pytest zygote died")
+                response = json.loads(line)
+                if response.get("id") == request["id"]:
+                    healthy = True
+                    return response
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[{self.name}] Worker failed ({e}), falling back to plain pytest.")
+            return await self._run_subprocess(request)
+        finally:
+            if not healthy and proc is not None:
+                # Een zygote met een openstaand antwoord is niet meer betrouwbaar;
+                # de volgende aanvraag start een verse
+                self._kill(proc)
+                proc = None
+            self._idle.put_nowait(proc)
+
+    async def _run_subprocess(self, request):
+        start = time.monotonic()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "pytest",
+            request["test_path"],
+            cwd=request["cwd"],
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        timed_out = False
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), request["timeout"])
+        except asyncio.TimeoutError:
+            timed_out = True
+            self._kill(proc)
+            stdout, _ = await proc.communicate()
+        except asyncio.CancelledError:
+            self._kill(proc)
+            raise
+
+        output = stdout.decode("utf-8", errors="replace")
+        if timed_out:
+            output += f"\nTIMEOUT: test run killed after {request['timeout']:.0f}s"
+        return {
+            "id": request["id"],
+            "passed": proc.returncode == 0 and not timed_out,
+            "returncode": proc.returncode,
+            "output": output,
+            "timed_out": timed_out,
+            "duration": time.monotonic() - start,
+        }
+
+    async def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            proc = self._idle.get_nowait()
+            if proc is None:
+                continue
+            if proc.stdin:
+                proc.stdin.close()
+            self._kill(proc)
+            await proc.wait()
+        self._idle = None
+
+
+_pool = None
+
+
+def get_worker_pool():
+    """Gedeelde pool voor het hele proces."""
+    global _pool
+    if _pool is None:
+        _pool = TestWorkerPool()
+    return _pool
@@ -2,6 +2,19 @@ import sqlite3
 import os
 from loguru import logger
 
+# Checkpoints van langlopende squad-taken; TaskCheckpointStore maakt de tabel
+# ook zelf aan voor databases die nog niet via init_db() zijn gemaakt
+TASK_CHECKPOINTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS task_checkpoints (
+        task_id INTEGER NOT NULL,
+        agent TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        state TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (task_id, agent)
+    )
+"""
+
 
 def init_db():
     """Initialiseert de database en tabellen."""
@@ -25,6 +38,9 @@ def init_db():
             )
         """)
 
+        # Checkpoints van langlopende squad-taken (zie TaskCheckpointStore)
+        cursor.execute(TASK_CHECKPOINTS_TABLE)
+
         conn.commit()
         logger.info("Database schema initialized.")
 
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.analysis.app_index import AppIndex, slugify
+
+
+@pytest.fixture
+def apps_dir(tmp_path):
+    apps = tmp_path / "apps"
+    apps.mkdir()
+    pages = {
+        "maan_fase_animatie.html": "Moon Phase Animation",
+        "confetti_kleur_variatie.html": "Confetti Kleur Variatie",
+        "voeg_level_sound.html": "Level Up Sound Effect",
+        "voeg_een_levelup.html": "Level Up!",
+    }
+    for name, title in pages.items():
+        (apps / name).write_text(f"<!DOCTYPE html><html><head><title>{title}</title></head></html>")
+    return apps
+
+
+def test_slugify_drops_prefix_and_filler_words():
+    assert slugify("WEB: Voeg een maanfase-indicator toe") == "maanfase_indicator"
+    assert slugify("WEB: voeg toe") == "app"
+
+
+def test_matching_app_is_updated(apps_dir):
+    decision = AppIndex(str(apps_dir)).resolve("WEB: Verbeter de confetti kleur variatie")
+    assert decision == {
+        "action": "update",
+        "file": "confetti_kleur_variatie.html",
+        "candidates": decision["candidates"],
+    }
+
+
+def test_unrelated_instruction_gets_new_slug_file(apps_dir):
+    decision = AppIndex(str(apps_dir)).resolve("WEB: Een todo lijst")
+    assert decision["action"] == "new"
+    assert decision["file"] == "todo_lijst.html"
+
+
+def test_close_candidates_are_ambiguous(apps_dir):
+    decision = AppIndex(str(apps_dir)).resolve("WEB: Voeg geluid toe aan level up")
+    assert decision["action"] == "ambiguous"
+    assert {c["file"] for c in decision["candidates"][:2]} == {
+        "voeg_level_sound.html",
+        "voeg_een_levelup.html",
+    }
+
+
+def test_explicit_filename_wins(apps_dir):
+    index = AppIndex(str(apps_dir))
+    assert index.resolve("WEB: pas `maan_fase_animatie.html` aan")["action"] == "update"
+    assert index.resolve("WEB: maak nieuw.html")["file"] == "nieuw.html"
+
+
+def test_index_picks_up_new_apps(apps_dir):
+    index = AppIndex(str(apps_dir))
+    assert len(index.apps()) == 4
+    (apps_dir / "todo_lijst.html").write_text("<title>Todo</title>")
+    assert index.resolve("WEB: todo lijst")["action"] == "update"
@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution import code_formatter
+from src.autonomous_agents.execution.code_formatter import CodeFormatter
+
+UPPER = [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"]
+FAILS = [sys.executable, "-c", "import sys; sys.exit(1)"]
+
+
+def _counting_formatter(**kwargs):
+    formatter = CodeFormatter(state_file=None, **kwargs)
+    calls = []
+
+    def fake_format(code):
+        calls.append(code)
+        return code.strip() + "\n"
+
+    formatter._format_uncached = fake_format
+    return formatter, calls
+
+
+def test_cache_hit_skips_formatting_and_output_is_cached_too():
+    formatter, calls = _counting_formatter()
+    formatted = formatter.format_code("x = 1   ")
+    assert formatter.format_code("x = 1   ") == formatted
+    assert formatter.format_code(formatted) == formatted  # Idempotent: output is zelf een hit
+    assert calls == ["x = 1   "]
+    assert (formatter.hits, formatter.misses) == (2, 1)
+
+
+def test_cache_evicts_least_recently_used():
+    formatter, calls = _counting_formatter(cache_size=2)
+    formatter.format_code("a = 1 ")  # Slaat input én output op: cache vol
+    formatter.format_code("b = 2 ")  # Verdringt 'a'
+    formatter.format_code("a = 1 ")
+    assert calls == ["a = 1 ", "b = 2 ", "a = 1 "]
+
+
+def test_fallback_tries_next_command_after_a_failure(monkeypatch):
+    monkeypatch.setattr(code_formatter, "BLACK_AVAILABLE", False)
+    monkeypatch.setattr(code_formatter, "FALLBACK_COMMANDS", [["not-an-installed-formatter", "-"], FAILS, UPPER])
+    assert CodeFormatter(state_file=None).format_code("x = 1\n") == "X = 1\n"
+
+
+def test_fallback_returns_code_when_every_command_fails(monkeypatch):
+    monkeypatch.setattr(code_formatter, "BLACK_AVAILABLE", False)
+    monkeypatch.setattr(code_formatter, "FALLBACK_COMMANDS", [FAILS])
+    assert CodeFormatter(state_file=None).format_code("x=1\n") == "x=1\n"
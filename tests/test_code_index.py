@@ -0,0 +1,87 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.analysis.code_index import CodeIndex, parse_source, splice_symbols
+from src.autonomous_agents.analysis.file_catalog import FileCatalog
+
+SOURCE = '''import os
+
+
+def helper(value):
+    return value * 2
+
+
+class Worker:
+    """Verwerkt opdrachten."""
+
+    def run(self, value):
+        return helper(value) + 1
+
+    def stop(self):
+        return None
+'''
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    root = tmp_path / "src"
+    root.mkdir()
+    path = root / "worker.py"
+    path.write_text(SOURCE)
+    return root, path
+
+
+def test_parse_source_collects_symbols_imports_and_calls():
+    parsed = parse_source(SOURCE)
+    names = [s["qualname"] for s in parsed["symbols"]]
+    assert names == ["helper", "Worker", "Worker.run", "Worker.stop"]
+    run = parsed["symbols"][2]
+    assert (run["start"], run["end"]) == (11, 12)
+    assert "helper" in run["calls"]
+    assert parsed["imports"][0]["modules"] == ["os"]
+
+
+def test_relevant_symbols_include_direct_dependencies(source_file):
+    root, path = source_file
+    index = CodeIndex(str(root), catalog=FileCatalog(str(root), cache_file=None), cache_file=None)
+    selected = [s["qualname"] for s in index.relevant_symbols("make run faster", str(path))]
+    assert selected == ["helper", "Worker.run"]
+    assert index.context_for("nothing matches here", str(path)) is None
+
+
+def test_get_file_reparses_edit_within_catalog_refresh_interval(source_file):
+    root, path = source_file
+    index = CodeIndex(str(root), catalog=FileCatalog(str(root), cache_file=None), cache_file=None)
+    assert index.get_file(str(path))["symbols"][0]["start"] == 4
+
+    # De catalogus ververst pas na 30s, de index moet de wijziging toch zien
+    path.write_text("import sys\n" + SOURCE)
+    assert index.get_file(str(path))["symbols"][0]["start"] == 5
+
+
+def test_splice_replaces_method_and_adds_definitions_and_imports():
+    new_code = '''import json
+
+
+class Worker:
+    def run(self, value):
+        return json.dumps(helper(value))
+
+
+def extra():
+    return 1
+'''
+    result = splice_symbols(SOURCE, new_code)
+    assert "import json" in result
+    assert "json.dumps(helper(value))" in result
+    assert "def stop(self):" in result
+    assert result.rstrip().endswith("return 1")
+    compile(result, "worker.py", "exec")
+
+
+def test_splice_rejects_code_without_definitions():
+    assert splice_symbols(SOURCE, "x = 1") is None
+    assert splice_symbols(SOURCE, "def broken(:") is None
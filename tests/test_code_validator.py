@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.validation.code_validator import CodeValidator
+
+
+def _validate(code, target, workdir):
+    return asyncio.run(CodeValidator(smoke_timeout=10).validate(code, str(target), str(workdir)))
+
+
+def test_valid_module_passes(tmp_path):
+    ok, error = _validate("import json\n\nVALUE = json.dumps({})\n", tmp_path / "mod.py", tmp_path)
+    assert ok, error
+
+
+def test_syntax_error_reports_line(tmp_path):
+    ok, error = _validate("x = 1\ndef broken(:\n    pass\n", tmp_path / "mod.py", tmp_path)
+    assert not ok
+    assert "line 2" in error
+
+
+def test_unknown_import_is_rejected_unless_optional(tmp_path):
+    ok, error = _validate("import surely_not_a_real_module\n", tmp_path / "mod.py", tmp_path)
+    assert not ok
+    assert "surely_not_a_real_module" in error
+
+    optional = "try:\n    import surely_not_a_real_module\nexcept ImportError:\n    pass\n"
+    ok, error = _validate(optional, tmp_path / "mod.py", tmp_path)
+    assert ok, error
+
+
+def test_project_modules_count_as_known(tmp_path):
+    (tmp_path / "helpers.py").write_text("def helper():\n    return 1\n")
+    ok, error = _validate("from helpers import helper\n\nX = helper()\n", tmp_path / "mod.py", tmp_path)
+    assert ok, error
+
+
+def test_init_files_are_forbidden(tmp_path):
+    ok, error = _validate("X = 1\n", tmp_path / "__init__.py", tmp_path)
+    assert not ok
+    assert "Forbidden" in error
+
+
+def test_import_time_errors_are_caught(tmp_path):
+    ok, error = _validate("VALUE = 1 / 0\n", tmp_path / "mod.py", tmp_path)
+    assert not ok
+    assert "ZeroDivisionError" in error
@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.deep_debugger import DeepDebugger
+
+PATCH = """<<<<<<< SEARCH
+    return 1 / 0
+=======
+    return 1
+>>>>>>> REPLACE"""
+
+
+class StubAI:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_text(self, prompt):
+        self.prompts.append(prompt)
+        return PATCH
+
+
+def test_large_file_falls_back_from_targeted_fix_to_patch(tmp_path):
+    path = tmp_path / "big.py"
+    filler = "".join(f"VALUE_{i} = {i}\n" for i in range(600))
+    path.write_text(filler + "\n\ndef broken():\n    return 1 / 0\n")
+
+    debugger = DeepDebugger.__new__(DeepDebugger)
+    debugger.name = "DeepDebugger"
+    debugger.ai = StubAI()
+    debugger.targeted_context_threshold = 6000
+    debugger.patch_threshold = 2000
+
+    async def no_targeted_fix(filepath, broken_code, error_log):
+        return None
+
+    debugger._targeted_fix = no_targeted_fix
+    result = asyncio.run(debugger.fix_broken_code(str(path), "ZeroDivisionError"))
+
+    assert result["status"] == "fixed"
+    assert len(debugger.ai.prompts) == 1
+    assert "SEARCH/REPLACE" in debugger.ai.prompts[0]
+    assert path.read_text().endswith("def broken():\n    return 1\n")
+    assert path.read_text().startswith(filler)
@@ -0,0 +1,85 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.analysis.file_catalog import FileCatalog
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    root = tmp_path / "src"
+    (root / "agents").mkdir(parents=True)
+    (root / "agents" / "web_architect.py").write_text("class WebArchitect: pass\n")
+    (root / "agents" / "feature_architect.py").write_text("x = 1\n" * 500)
+    (root / "notes.txt").write_text("not python")
+    return root
+
+
+def _catalog(root, tmp_path, **kwargs):
+    return FileCatalog(
+        root=str(root), cache_file=str(tmp_path / "catalog.json"), refresh_interval=0, **kwargs
+    )
+
+
+def test_indexes_only_matching_extensions(source_tree, tmp_path):
+    catalog = _catalog(source_tree, tmp_path)
+    names = [os.path.basename(p) for p in catalog.all_files()]
+    assert names == ["feature_architect.py", "web_architect.py"]
+
+    entry = catalog.get(os.path.join(str(source_tree), "agents", "web_architect.py"))
+    assert entry["size"] > 0
+    assert len(entry["hash"]) == 40
+    assert entry["module"].endswith("src.agents.web_architect")
+
+
+def test_find_exact_substring_and_fuzzy(source_tree, tmp_path):
+    catalog = _catalog(source_tree, tmp_path)
+    assert catalog.find("`web_architect.py`").endswith("web_architect.py")
+    assert catalog.find("feature_arch").endswith("feature_architect.py")
+    assert catalog.find("web_architekt.py", fuzzy=True).endswith("web_architect.py")
+    assert catalog.find("nothing_like_this.py", fuzzy=True) is None
+
+
+def test_find_without_fuzzy_never_maps_a_new_file_onto_a_similar_one(source_tree, tmp_path):
+    (source_tree / "json_parser.py").write_text("x = 1\n")
+    catalog = _catalog(source_tree, tmp_path)
+    assert catalog.find("csv_parser.py") is None
+    assert catalog.find("web_architekt.py") is None
+    assert catalog.find("csv_parser.py", fuzzy=True).endswith("json_parser.py")
+
+
+def test_largest_file(source_tree, tmp_path):
+    catalog = _catalog(source_tree, tmp_path)
+    assert catalog.largest()["path"].endswith("feature_architect.py")
+
+
+def test_refresh_picks_up_new_changed_and_removed_files(source_tree, tmp_path):
+    catalog = _catalog(source_tree, tmp_path)
+    web = source_tree / "agents" / "web_architect.py"
+    old_hash = catalog.get(str(web))["hash"]
+
+    (source_tree / "agents" / "brain.py").write_text("pass\n")
+    web.write_text("class WebArchitect:\n    changed = True\n")
+    (source_tree / "agents" / "feature_architect.py").unlink()
+
+    assert catalog.refresh(force=True)
+    names = [os.path.basename(p) for p in catalog.all_files()]
+    assert names == ["brain.py", "web_architect.py"]
+    assert catalog.get(str(web))["hash"] != old_hash
+
+
+def test_refresh_is_throttled(source_tree, tmp_path):
+    catalog = _catalog(source_tree, tmp_path)
+    catalog.refresh_interval = 3600
+    catalog.refresh(force=True)
+    (source_tree / "late.py").write_text("pass\n")
+    assert catalog.refresh() is False
+    assert not catalog.has_name("late.py")
+
+
+def test_catalog_is_persisted(source_tree, tmp_path):
+    _catalog(source_tree, tmp_path).refresh(force=True)
+    reloaded = FileCatalog(root=str(source_tree), cache_file=str(tmp_path / "catalog.json"))
+    assert len(reloaded.files) == 2
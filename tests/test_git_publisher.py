@@ -0,0 +1,97 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.git_publisher import GitPublisher
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q")
+    _git(path, "config", "user.email", "test@example.com")
+    _git(path, "config", "user.name", "Test")
+    for name in ("alpha.py", "beta.py", "old.py"):
+        (path / name).write_text("x = 1\n")
+    _git(path, "add", ".")
+    _git(path, "commit", "-q", "-m", "init")
+    return path
+
+
+def test_parse_status_keeps_first_character_and_handles_renames():
+    status = " M alpha.py\0 M beta.py\0R  new.py\0old.py\0?? dir/with space.py\0"
+    assert GitPublisher._parse_status(status) == ["alpha.py", "beta.py", "new.py", "dir/with space.py"]
+
+
+def test_status_of_modified_first_file(repo):
+    (repo / "alpha.py").write_text("x = 2\n")
+    (repo / "beta.py").write_text("x = 3\n")
+    _git(repo, "mv", "old.py", "new.py")
+    publisher = GitPublisher(repo_path=str(repo))
+
+    files = GitPublisher._parse_status(asyncio.run(publisher._status()))
+    assert sorted(files) == ["alpha.py", "beta.py", "new.py"]
+
+
+def _recording_publisher(repo, **kwargs):
+    publisher = GitPublisher(repo_path=str(repo), **kwargs)
+    calls = []
+
+    async def fake_publish(reasons=None):
+        calls.append(list(reasons or []))
+        return {"status": "success", "files": [], "reasons": reasons}
+
+    publisher.publish_changes = fake_publish
+    return publisher, calls
+
+
+def test_schedule_publish_debounces_into_one_push(repo):
+    publisher, calls = _recording_publisher(repo, push_debounce=0.05, push_max_delay=5)
+
+    async def scenario():
+        for title in ("WEB: a", "WEB: b", "SYSTEM: c"):
+            task = publisher.schedule_publish(title)
+            await asyncio.sleep(0.01)
+        assert calls == []  # Nog binnen het debounce-venster
+        return await task
+
+    result = asyncio.run(scenario())
+    assert calls == [["WEB: a", "WEB: b", "SYSTEM: c"]]
+    assert result["status"] == "success"
+
+
+def test_schedule_publish_never_waits_longer_than_max_delay(repo):
+    publisher, calls = _recording_publisher(repo, push_debounce=0.05, push_max_delay=0.15)
+
+    async def scenario():
+        # Elke 20 ms een nieuw verzoek: zonder max_delay zou er nooit rust zijn
+        for i in range(15):
+            publisher.schedule_publish(f"taak {i}")
+            await asyncio.sleep(0.02)
+        await publisher.flush()
+
+    asyncio.run(scenario())
+    assert len(calls) >= 2
+    assert [r for batch in calls for r in batch] == [f"taak {i}" for i in range(15)]
+
+
+def test_flush_pushes_pending_requests_immediately(repo):
+    publisher, calls = _recording_publisher(repo, push_debounce=60, push_max_delay=600)
+
+    async def scenario():
+        assert await publisher.flush() is None  # Niets openstaand
+        publisher.schedule_publish("SYSTEM: klaar")
+        return await asyncio.wait_for(publisher.flush(), 1)
+
+    result = asyncio.run(scenario())
+    assert calls == [["SYSTEM: klaar"]]
+    assert result["status"] == "success"
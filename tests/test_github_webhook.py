@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.github_webhook import (
+    GitHubWebhookReceiver,
+    sign_payload,
+)
+
+SECRET = "test-secret"
+
+
+class FakeListener:
+    def __init__(self, processed=None):
+        self.processed_issues = set(processed or [])
+
+    def is_processed(self, number):
+        return number in self.processed_issues
+
+    def mark_processed(self, number):
+        self.processed_issues.add(number)
+
+
+@pytest.fixture
+def queue():
+    q = MagicMock()
+    q.add_task.return_value = 42
+    return q
+
+
+def _payload(action="opened", number=7, title="SYSTEM: Bouw iets", state="open"):
+    body = {
+        "action": action,
+        "issue": {"number": number, "title": title, "body": "details", "state": state},
+    }
+    return json.dumps(body).encode("utf-8")
+
+
+def test_rejects_invalid_signature(queue):
+    receiver = GitHubWebhookReceiver(secret=SECRET, queue=queue, listener=FakeListener())
+    body = _payload()
+    status, response = receiver.handle_event("issues", body, "sha256=deadbeef")
+    assert status == 401
+    queue.add_task.assert_not_called()
+
+
+def test_rejects_when_no_secret_configured(queue):
+    receiver = GitHubWebhookReceiver(secret="", queue=queue, listener=FakeListener())
+    body = _payload()
+    status, _ = receiver.handle_event("issues", body, sign_payload("", body))
+    assert status == 401
+
+
+def test_opened_issue_is_queued_and_marked(queue):
+    listener = FakeListener()
+    receiver = GitHubWebhookReceiver(secret=SECRET, queue=queue, listener=listener)
+    body = _payload()
+    status, response = receiver.handle_event("issues", body, sign_payload(SECRET, body))
+    assert status == 201
+    assert response["task_id"] == 42
+    queue.add_task.assert_called_once_with(
+        title="SYSTEM: Bouw iets", description="details", source="github"
+    )
+    assert 7 in listener.processed_issues
+
+
+def test_duplicate_issue_is_not_queued_twice(queue):
+    receiver = GitHubWebhookReceiver(secret=SECRET, queue=queue, listener=FakeListener([7]))
+    body = _payload(action="edited")
+    status, response = receiver.handle_event("issues", body, sign_payload(SECRET, body))
+    assert status == 200
+    assert response["status"] == "duplicate"
+    queue.add_task.assert_not_called()
+
+
+def test_wip_title_is_skipped(queue):
+    receiver = GitHubWebhookReceiver(secret=SECRET, queue=queue, listener=FakeListener())
+    body = _payload(action="edited", title="🤖 [WIP] SYSTEM: Bouw iets")
+    status, response = receiver.handle_event("issues", body, sign_payload(SECRET, body))
+    assert response["status"] == "duplicate"
+    queue.add_task.assert_not_called()
+
+
+def test_other_actions_and_events_are_ignored(queue):
+    receiver = GitHubWebhookReceiver(secret=SECRET, queue=queue, listener=FakeListener())
+    body = _payload(action="closed")
+    status, _ = receiver.handle_event("issues", body, sign_payload(SECRET, body))
+    assert status == 202
+    status, response = receiver.handle_event("ping", body, sign_payload(SECRET, body))
+    assert response["status"] == "pong"
+    queue.add_task.assert_not_called()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.validation.html_validator import HTMLValidator, validate_html
+from src.autonomous_agents.validation.qa_agent import QualityAssuranceAgent
+from src.autonomous_agents.execution.web_architect import WebArchitect
+
+VALID = """<!DOCTYPE html>
+<html>
+<head><title>Demo</title><style>a { color: red; }</style></head>
+<body>
+<ul><li>een<li>twee</ul>
+<p>tekst<br><img src="x.png"><svg><path d="M0 0"/></svg>
+<script>if (a < b) { el.innerHTML = "</div>"; }</script>
+</body>
+</html>
+"""
+
+
+def test_valid_document_passes():
+    assert validate_html(VALID) == (True, "")
+
+
+def test_wrapper_fence_only_allowed_when_requested():
+    fenced = "```html\n" + VALID + "```\n"
+    assert validate_html(fenced, allow_wrapper=True)[0]
+    ok, error = validate_html(fenced)
+    assert not ok
+    assert "line 1, col 1: Stray markdown fence" in error
+
+
+def test_truncated_document_reports_unclosed_tags():
+    ok, error = validate_html(VALID[: VALID.index("<script>") + 20])
+    assert not ok
+    assert "Unclosed <script>" in error
+    assert "Unclosed <body>" in error
+
+
+def test_precise_locations():
+    html = VALID.replace("<p>tekst", '<div id="a"><div id="a">\n  ```js\n')
+    html = html.replace("color: red; }", "color: red;")
+    ok, error = validate_html(html)
+    assert not ok
+    assert "line 3, col 26: Unbalanced braces in <style>" in error
+    assert "line 6, col 13: Duplicate id 'a' (first used at line 6, col 1)" in error
+    assert "line 7, col 3: Stray markdown fence" in error
+    assert "Unclosed <div> (opened at line 6, col 13) before </body>" in error
+
+
+def test_missing_doctype_and_trailing_text():
+    ok, error = validate_html(VALID.replace("<!DOCTYPE html>\n", "") + "Veel plezier met je app!")
+    assert not ok
+    assert "Missing <!DOCTYPE html>" in error
+    assert "Content after </html>" in error
+
+
+def test_streaming_reports_errors_while_feeding():
+    validator = HTMLValidator()
+    html = "<!DOCTYPE html><html><body><div>\n</span>\n" + "x" * 100
+    found = []
+    for i in range(0, len(html), 5):
+        found.extend(validator.feed(html[i : i + 5]))
+        if found:
+            break
+    # De fout komt bij de chunk met </span>, niet pas aan het einde
+    assert i < len(html) - 50
+    assert found[0].line == 2 and "Unexpected closing tag </span>" in found[0].message
+
+
+def test_audit_web(tmp_path):
+    qa = QualityAssuranceAgent()
+    good = tmp_path / "good.html"
+    good.write_text(VALID)
+    bad = tmp_path / "bad.html"
+    bad.write_text(VALID[:200])
+    assert qa.audit_web(str(good))["status"] == "passed"
+    assert qa.audit_web(str(bad))["status"] == "failed"
+
+
+def test_empty_stream_falls_back_to_generate_text():
+    class OfflineStreamAI:
+        calls = 0
+
+        async def generate_text_stream(self, prompt):
+            return
+            yield
+
+        async def generate_text(self, prompt):
+            self.calls += 1
+            return VALID
+
+    architect = WebArchitect.__new__(WebArchitect)
+    architect.name = "FrontendSquad"
+    architect.ai = OfflineStreamAI()
+    code, issues = asyncio.run(architect._generate_html("bouw een demo"))
+    assert issues == []
+    assert architect.ai.calls == 1
+    assert code == VALID.strip()
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.analysis.knowledge_index import KnowledgeIndex, fts_query
+from src.autonomous_agents.execution.database_manager import DatabaseManager
+
+
+def _index(tmp_path, research_db=None):
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "sqlite_tuning.md").write_text("# SQLite tuning\n\nGebruik WAL mode en een busy_timeout.\n")
+    (output / "asyncio.md").write_text("# Asyncio\n\nGebruik een semaphore voor gelijktijdige calls.\n")
+    (tmp_path / "PROJECT_MEMORY.md").write_text(
+        "# MEMORY\n\n## 🧠 Lessons Learned\n\n- Café app gebouwd met neon thema.\n\n- Calculator met deling door nul.\n"
+    )
+    (tmp_path / "lessons.json").write_text(
+        json.dumps({"successful_patterns": [{"task": "WEB: Matrix rain", "pattern": "Canvas animatie in één bestand."}]})
+    )
+    return KnowledgeIndex(
+        db_path=str(tmp_path / "knowledge.db"),
+        output_dir=str(output),
+        memory_file=str(tmp_path / "PROJECT_MEMORY.md"),
+        lessons_file=str(tmp_path / "lessons.json"),
+        research_db=research_db,
+    )
+
+
+def test_search_ranks_all_sources(tmp_path):
+    index = _index(tmp_path)
+    top = index.search("WAL busy_timeout")[0]
+    assert top["source"] == "output" and top["title"] == "SQLite tuning"
+    assert "[WAL]" in top["snippet"]
+
+    assert index.search("cafe")[0]["source"] == "memory"  # Accenten genegeerd
+    assert index.search("canvas animatie", source="lessons")[0]["title"] == "WEB: Matrix rain"
+
+
+def test_falls_back_to_any_term(tmp_path):
+    index = _index(tmp_path)
+    results = index.search("semaphore onbekendwoord")
+    assert [r["title"] for r in results] == ["Asyncio"]
+
+
+def test_incremental_refresh(tmp_path):
+    index = _index(tmp_path)
+    assert index.refresh() == 4
+    assert index.refresh() == 0
+
+    path = tmp_path / "output" / "asyncio.md"
+    path.write_text("# Asyncio\n\nGebruik taskgroups.\n")
+    os.utime(path, (1, 1))
+    assert index.refresh() == 1
+    assert index.search("semaphore", refresh=False) == []
+    assert index.search("taskgroups", refresh=False)
+
+    path.unlink()
+    assert index.refresh() == 1
+    assert index.search("taskgroups", refresh=False) == []
+
+
+def test_research_reports_are_synced_once(tmp_path):
+    db = DatabaseManager(str(tmp_path / "research.db"))
+    db.insert_research_result("agent", "caching strategieën", "Gebruik een LRU cache met TTL.", "caching")
+    index = _index(tmp_path, research_db=db)
+    assert index.search("LRU")[0]["source"] == "research"
+    assert index.sync_research(db) == 0
+    db.insert_research_result("agent", "queues", "Gebruik een LRU queue.", "queues")
+    assert len(index.search("LRU")) == 2
+
+
+def test_query_syntax_is_escaped(tmp_path):
+    index = _index(tmp_path)
+    assert fts_query('NEAR("x" AND') == '"NEAR" "x" "AND"'
+    assert index.search('"* AND (') == []
+    assert index.search("") == []
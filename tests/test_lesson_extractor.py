@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.learning.lesson_extractor import LessonExtractor
+from src.autonomous_agents.learning.lessons_journal import LessonsJournal
+
+LESSONS = [
+    "Valideer invoer vroeg met duidelijke foutmeldingen.",
+    "Houd functies klein en los testbaar.",
+    "Schrijf bestanden atomisch via een tijdelijk bestand.",
+    "Gebruik nooit blokkerende sleep in async code.",
+]
+
+
+class BatchAI:
+    def __init__(self, fail=False, empty=0):
+        self.prompts = []
+        self.fail = fail
+        self.empty = empty  # Zoveel keer eerst een leeg antwoord (offline)
+
+    async def generate_text(self, prompt):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("429 quota")
+        if len(self.prompts) <= self.empty:
+            return ""
+        count = prompt.count("Taak: ")
+        return "```json\n" + json.dumps(LESSONS[:count]) + "\n```"
+
+
+def _extractor(tmp_path, ai, **kwargs):
+    journal = LessonsJournal(str(tmp_path / "lessons.json"), compact_every=1000)
+    kwargs.setdefault("poll_interval", 0.01)
+    return LessonExtractor(journal, ai, **kwargs), journal
+
+
+def test_submit_returns_immediately_and_batches(tmp_path):
+    ai = BatchAI()
+
+    async def scenario():
+        extractor, journal = _extractor(tmp_path, ai, batch_size=3, max_delay=60)
+        for i in range(3):
+            extractor.submit(f"SYSTEM: taak {i}", {"status": "success"}, "completed")
+        assert ai.prompts == []  # Niets op het kritieke pad
+        extractor.submit("WEB: kapot", "SyntaxError", "failed")
+        await asyncio.sleep(0.1)
+        assert len(ai.prompts) == 1  # Eén call voor de volle batch van 3
+        await extractor.flush()
+        return journal
+
+    journal = asyncio.run(scenario())
+    assert len(ai.prompts) == 2
+    assert [p["task"] for p in journal.get("successful_patterns")] == [f"SYSTEM: taak {i}" for i in range(3)]
+    assert journal.get("failed_patterns")[0]["task"] == "WEB: kapot"
+
+
+def test_partial_batch_waits_for_max_delay_and_idle(tmp_path):
+    ai = BatchAI()
+    busy = {"value": True}
+
+    async def scenario():
+        extractor, journal = _extractor(
+            tmp_path, ai, batch_size=5, max_delay=0.05, busy_max_defer=0.2, is_busy=lambda: busy["value"]
+        )
+        extractor.submit("SYSTEM: taak", "ok", "completed")
+        await asyncio.sleep(0.1)
+        assert ai.prompts == []  # Te laat voor de batch, maar er loopt nog een taak
+        busy["value"] = False
+        await asyncio.sleep(0.1)
+        return journal
+
+    journal = asyncio.run(scenario())
+    assert len(ai.prompts) == 1
+    assert journal.get("successful_patterns")[0]["pattern"] == LESSONS[0]
+
+
+def test_quota_limits_calls(tmp_path):
+    ai = BatchAI()
+
+    async def scenario():
+        extractor, _ = _extractor(tmp_path, ai, batch_size=1, hourly_quota=2)
+        for i in range(4):
+            extractor.submit(f"SYSTEM: taak {i}", "ok", "completed")
+        await asyncio.sleep(0.1)
+        return extractor
+
+    extractor = asyncio.run(scenario())
+    assert len(ai.prompts) == 2
+    assert len(extractor.pending) == 2
+
+
+def test_failed_call_is_retried_once(tmp_path):
+    ai = BatchAI(fail=True)
+
+    async def scenario():
+        extractor, _ = _extractor(tmp_path, ai, batch_size=1)
+        extractor.submit("SYSTEM: taak", "ok", "completed")
+        await asyncio.sleep(0.1)
+        return extractor
+
+    extractor = asyncio.run(scenario())
+    assert len(ai.prompts) == 2
+    assert not extractor.pending
+
+
+def test_empty_response_is_retried_like_a_failed_call(tmp_path):
+    ai = BatchAI(empty=1)
+
+    async def scenario():
+        extractor, journal = _extractor(tmp_path, ai, batch_size=1)
+        extractor.submit("SYSTEM: taak", "ok", "completed")
+        await asyncio.sleep(0.1)
+        return journal
+
+    journal = asyncio.run(scenario())
+    assert len(ai.prompts) == 2
+    assert journal.get("successful_patterns")[0]["pattern"] == LESSONS[0]
+
+
+def test_parse_numbered_fallback():
+    response = "1. Gebruik error handling.\n2) Vermijd globale state.\n"
+    assert LessonExtractor._parse(response, 3) == ["Gebruik error handling.", "Vermijd globale state.", None]
@@ -0,0 +1,102 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.learning import brain, lesson_vectors
+from src.autonomous_agents.learning.lessons_journal import LessonsJournal
+
+pytest.importorskip("numpy")
+
+LESSONS = [
+    {"content": "Gebruik geen alert() in games, toon meldingen in de canvas."},
+    {"content": "Vang deling door nul af in de calculator met een duidelijke foutmelding."},
+    {"content": "Schrijf bestanden atomisch via een tijdelijk bestand en os.replace."},
+    {"content": "Gebruik een busy timeout bij sqlite3 zodat de takenqueue niet blokkeert."},
+]
+
+
+def _index(tmp_path, **kwargs):
+    return lesson_vectors.LessonVectorIndex(str(tmp_path / "vectors"), **kwargs)
+
+
+def test_search_ranks_relevant_lesson_first(tmp_path):
+    index = _index(tmp_path)
+    assert index.sync({"brain:avoid_errors": LESSONS}) == 4
+    hits = index.search("Bouw een calculator die deling door nul netjes afhandelt", k=2)
+    assert hits[0]["text"] == LESSONS[1]["content"]
+    assert hits[0]["category"] == "avoid_errors"
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_sync_only_indexes_new_entries_and_persists(tmp_path):
+    lessons = list(LESSONS[:2])
+    index = _index(tmp_path)
+    index.sync({"brain:avoid_errors": lessons})
+    lessons.extend(LESSONS[2:])
+    assert index.sync({"brain:avoid_errors": lessons}) == 2
+    assert index.sync({"brain:avoid_errors": lessons}) == 0
+
+    reloaded = _index(tmp_path)
+    assert len(reloaded) == 4
+    assert reloaded.search("sqlite3 takenqueue timeout", k=1)[0]["text"] == LESSONS[3]["content"]
+
+
+def test_replaced_source_triggers_rebuild(tmp_path):
+    index = _index(tmp_path)
+    index.sync({"brain:avoid_errors": LESSONS})
+    assert index.sync({"brain:avoid_errors": LESSONS[:1]}) == 1
+    assert len(index) == 1
+
+
+def test_ivf_partitioning_finds_exact_match(tmp_path):
+    index = _index(tmp_path, ivf_min_rows=200, nprobe=4)
+    topics = ["canvas", "sqlite", "flask", "pytest", "docker", "asyncio", "regex", "numpy"]
+    lessons = [
+        {"task": f"SYSTEM: {topics[i % 8]} taak {i}", "pattern": f"Les {i} over {topics[i % 8]} en module{i}"}
+        for i in range(400)
+    ]
+    index.sync({"journal:successful_patterns": lessons})
+    assert index.centroids is not None
+    hits = index.search("module123 pytest", k=3)
+    assert hits[0]["text"] == "Les 123 over pytest en module123"
+    assert hits[0]["source"] == "journal"
+
+
+def test_global_brain_context_uses_instruction(tmp_path, monkeypatch):
+    monkeypatch.setattr(brain, "MEMORY_FILE", str(tmp_path / "memory.json"))
+    journal = LessonsJournal(str(tmp_path / "lessons.json"), compact_every=1000)
+    journal.add_failure("WEB: snake", "Gebruik requestAnimationFrame in plaats van setInterval voor de gameloop.")
+    monkeypatch.setattr(brain, "get_lessons_journal", lambda: journal)
+    index = _index(tmp_path)
+    monkeypatch.setattr(brain, "get_lesson_index", lambda: index)
+
+    global_brain = brain.GlobalBrain()
+    for lesson in LESSONS:
+        global_brain.add_lesson("avoid_errors", lesson["content"])
+
+    context = global_brain.get_context("Maak een snake game met een soepele gameloop", k=1)
+    assert "VERMIJD: Gebruik requestAnimationFrame" in context
+    assert "calculator" not in context
+
+    # Zonder instructie of zonder NumPy: de laatste lessen, zoals voorheen
+    assert LESSONS[0]["content"] in global_brain.get_context()
+    monkeypatch.setattr(brain, "NUMPY_AVAILABLE", False)
+    assert LESSONS[0]["content"] in global_brain.get_context("snake gameloop")
+
+
+def test_web_architect_reuses_brain_and_sees_new_lessons(tmp_path, monkeypatch):
+    from src.autonomous_agents.execution import web_architect
+
+    monkeypatch.setattr(brain, "MEMORY_FILE", str(tmp_path / "memory.json"))
+    monkeypatch.setattr(brain, "NUMPY_AVAILABLE", False)
+    architect = web_architect.WebArchitect.__new__(web_architect.WebArchitect)
+    architect._brain = None
+
+    assert "VERMIJD" not in architect._lesson_context("snake game")
+    first = architect._brain
+    # Een ander proces schrijft een les weg
+    brain.GlobalBrain().add_lesson("avoid_errors", LESSONS[0]["content"])
+    assert LESSONS[0]["content"] in architect._lesson_context("snake game")
+    assert architect._brain is first
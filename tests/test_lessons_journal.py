@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.learning.lessons_journal import LessonsJournal
+
+
+def _journal(tmp_path, **kwargs):
+    kwargs.setdefault("compact_every", 1000)
+    return LessonsJournal(str(tmp_path / "lessons.json"), **kwargs)
+
+
+def test_appends_update_view_without_rewriting_snapshot(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record_metric("completed", 10.0)
+    journal.record_metric("failed", 20.0)
+    journal.add_success("SYSTEM: calc", "Error handling rond deling")
+    journal.add_failure("WEB: app", "Geen alert() gebruiken")
+
+    assert journal.metrics() == {"total_tasks": 2, "success_count": 1, "avg_duration": 15.0}
+    assert journal.get("successful_patterns") == [
+        {"task": "SYSTEM: calc", "pattern": "Error handling rond deling", "count": 1}
+    ]
+    assert not os.path.exists(tmp_path / "lessons.json")
+    with open(journal.journal_file) as f:
+        assert len(f.readlines()) == 4
+
+
+def test_reload_replays_journal_and_skips_torn_line(tmp_path):
+    journal = _journal(tmp_path)
+    journal.add_success("a", "patroon a")
+    with open(journal.journal_file, "a") as f:
+        f.write('{"op": "success", "task": "b", "pat')  # Crash midden in een append
+
+    reloaded = _journal(tmp_path)
+    assert [p["task"] for p in reloaded.get("successful_patterns")] == ["a"]
+    reloaded.add_success("c", "patroon c")
+    assert [p["task"] for p in _journal(tmp_path).get("successful_patterns")] == ["a", "c"]
+
+
+def test_compaction_writes_snapshot_and_empties_journal(tmp_path):
+    journal = _journal(tmp_path, compact_every=3)
+    for i in range(3):
+        journal.add_success(f"taak {i}", f"patroon {i}")
+    journal.wait()  # Derde append start de achtergrondcompactie
+
+    with open(tmp_path / "lessons.json") as f:
+        snapshot = json.load(f)
+    assert len(snapshot["successful_patterns"]) == 3
+    assert not os.path.exists(journal.journal_file)
+
+    journal.add_success("taak 3", "patroon 3")
+    assert len(_journal(tmp_path).get("successful_patterns")) == 4
+
+
+def test_interrupted_compaction_never_applies_events_twice(tmp_path):
+    journal = _journal(tmp_path)
+    journal.add_success("a", "patroon a")
+    journal.add_success("b", "patroon b")
+    # Crash na het schrijven van de snapshot, vóór het opruimen van het oude journal
+    journal.compact()
+    with open(journal.compacting_file, "w") as f, open(tmp_path / "lessons.json") as snap:
+        assert json.load(snap)["journal_seq"] == 2
+        f.write(json.dumps({"op": "success", "task": "a", "pattern": "patroon a", "seq": 1}) + "\n")
+        f.write(json.dumps({"op": "success", "task": "b", "pattern": "patroon b", "seq": 2}) + "\n")
+
+    reloaded = _journal(tmp_path)
+    assert [p["task"] for p in reloaded.get("successful_patterns")] == ["a", "b"]
+    assert not os.path.exists(reloaded.compacting_file)
+
+
+def test_existing_snapshot_without_sequence_is_kept(tmp_path):
+    with open(tmp_path / "lessons.json", "w") as f:
+        json.dump({"successful_patterns": [{"task": "oud", "pattern": "p"}], "failed_patterns": [], "metrics": {"total_tasks": 1, "success_count": 1, "avg_duration": 5.0}}, f)
+    journal = _journal(tmp_path)
+    journal.record_metric("completed", 15.0)
+    assert journal.metrics()["avg_duration"] == 10.0
+    assert journal.get("successful_patterns")[0]["task"] == "oud"
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.patch_applier import (
+    PatchError,
+    apply_hunks,
+    apply_patch,
+    parse_patch,
+    resolve_edit,
+)
+
+SOURCE = """import os
+
+
+def load(path):
+    with open(path) as f:
+        return f.read()
+
+
+def save(path, data):
+    with open(path, "w") as f:
+        f.write(data)
+"""
+
+
+def test_search_replace_block():
+    patch = """```python
+<<<<<<< SEARCH
+        return f.read()
+=======
+        return f.read().strip()
+>>>>>>> REPLACE
+```"""
+    result = apply_patch(SOURCE, patch)
+    assert "return f.read().strip()" in result
+    assert "def save(path, data):" in result
+
+
+def test_search_with_wrong_indentation_is_reindented():
+    patch = """<<<<<<< SEARCH
+with open(path, "w") as f:
+    f.write(data)
+=======
+with open(path, "w") as f:
+    f.write(data)
+    f.flush()
+>>>>>>> REPLACE"""
+    result = apply_patch(SOURCE, patch)
+    assert "        f.flush()" in result
+
+
+def test_fuzzy_anchor_tolerates_small_differences():
+    patch = """<<<<<<< SEARCH
+def load(path) :
+    with open(path) as fh:
+=======
+def load(path, mode="r"):
+    with open(path, mode) as f:
+>>>>>>> REPLACE"""
+    result = apply_patch(SOURCE, patch)
+    assert 'def load(path, mode="r"):' in result
+
+
+def test_unified_diff():
+    diff = """--- a/x.py
++++ b/x.py
+@@ -9,3 +9,3 @@
+ def save(path, data):
+-    with open(path, "w") as f:
++    with open(path, "a") as f:
+         f.write(data)
+"""
+    assert len(parse_patch(diff)) == 1
+    assert 'open(path, "a")' in apply_patch(SOURCE, diff)
+
+
+def test_invalid_results_and_missing_anchors_are_rejected():
+    with pytest.raises(PatchError):
+        apply_hunks(SOURCE, [(["completely unrelated line"], ["x"], None)])
+    with pytest.raises(PatchError):
+        apply_hunks(SOURCE, [(["import os"], ["import os("], None)])
+
+
+def test_resolve_edit_modes():
+    assert resolve_edit(SOURCE, "def extra():\n    return 1\n")[1] == "splice"
+    assert resolve_edit(SOURCE, "x = (")[0] is None
+    rewrite = SOURCE.replace("load", "read_file")
+    assert resolve_edit(SOURCE, rewrite) == (rewrite.strip(), "rewrite")
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.database_manager import DatabaseManager
+from src.autonomous_agents.execution.research_agent import ResearchAgent, normalize_topic
+
+
+class CountingAI:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_text(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"antwoord {self.calls}"
+
+
+def _agent(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(tmp_path)  # ResearchAgent() maakt zijn standaard database in de cwd aan
+    try:
+        agent = ResearchAgent()
+    finally:
+        os.chdir(cwd)
+    agent.ai = CountingAI()
+    agent.db = DatabaseManager(str(tmp_path / "research.db"))
+    return agent
+
+
+def test_normalize_topic_ignores_order_case_and_stopwords():
+    assert normalize_topic("Python best practices optimization for Café.py") == normalize_topic(
+        "optimization: best practices voor cafe py, python"
+    )
+
+
+def test_repeated_research_is_served_from_cache(tmp_path):
+    agent = _agent(tmp_path)
+    first = asyncio.run(agent.conduct_research("Best practices for asyncio"))
+    second = asyncio.run(agent.conduct_research("asyncio best practices"))
+    assert agent.ai.calls == 2  # Alleen de eerste run: verzamelen + synthese
+    assert second["report"] == first["report"]
+    assert second["cached"] is True
+
+
+def test_expired_report_is_not_reused(tmp_path):
+    agent = _agent(tmp_path)
+    asyncio.run(agent.conduct_research("sqlite tuning"))
+    with sqlite3.connect(agent.db.db_file) as conn:
+        conn.execute("UPDATE research_results SET timestamp = datetime('now', '-2 days')")
+    agent.cache_ttl = 3600
+    result = asyncio.run(agent.conduct_research("sqlite tuning"))
+    assert "cached" not in result
+    assert agent.ai.calls == 4
+
+
+def test_concurrent_identical_research_runs_once(tmp_path):
+    agent = _agent(tmp_path)
+
+    async def both():
+        return await asyncio.gather(
+            agent.conduct_research("caching strategies"),
+            agent.conduct_research("Caching strategies"),
+        )
+
+    first, second = asyncio.run(both())
+    assert first["report"] == second["report"]
+    assert agent.ai.calls == 2
+
+
+def test_migration_adds_topic_key_to_old_table(tmp_path):
+    db_file = str(tmp_path / "old.db")
+    with sqlite3.connect(db_file) as conn:
+        conn.execute(
+            "CREATE TABLE research_results (id INTEGER PRIMARY KEY AUTOINCREMENT, agent_name TEXT,"
+            " query TEXT, result TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        )
+    db = DatabaseManager(db_file)
+    db.insert_research_result("agent", "vraag", "rapport", "vraag")
+    assert db.get_cached_research("vraag", 60) == "rapport"
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.research_agent import ResearchAgent
+
+
+class FanOutAI:
+    """Plant 4 deelvragen; 'traag' duurt te lang, 'kapot' faalt."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.synthesis_input = None
+
+    async def generate_text(self, prompt):
+        if "Splits dit onderwerp" in prompt:
+            return "1. Snelle deelvraag een\n2. Snelle deelvraag twee\n- Trage deelvraag drie\n* Kapotte deelvraag vier"
+        if "RUWE DATA" in prompt:
+            self.synthesis_input = prompt
+            return "eindrapport"
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if "Trage" in prompt:
+                await asyncio.sleep(5)
+            await asyncio.sleep(0.05)
+            if "Kapotte" in prompt:
+                raise RuntimeError("quota")
+            return "antwoord"
+        finally:
+            self.active -= 1
+
+
+def _agent(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        agent = ResearchAgent()
+    finally:
+        os.chdir(cwd)
+    agent.ai = FanOutAI()
+    agent.cache_ttl = 0
+    agent.fan_out = 4
+    agent.research_concurrency = 2
+    agent.research_budget = 0.5
+    return agent
+
+
+def test_fan_out_tolerates_slow_and_failing_sub_questions(tmp_path):
+    agent = _agent(tmp_path)
+    start = time.monotonic()
+    result = asyncio.run(agent.conduct_research("caching in python"))
+
+    assert time.monotonic() - start < 2  # Het tijdsbudget, niet de trage deelvraag
+    assert result["report"] == "eindrapport"
+    assert (result["sub_questions"], result["answered"]) == (4, 2)
+    assert agent.ai.max_active <= 2
+    assert "### Snelle deelvraag een" in agent.ai.synthesis_input
+    assert "Niet beantwoord" in agent.ai.synthesis_input
+    assert "- Trage deelvraag drie" in agent.ai.synthesis_input
+
+
+def test_fan_out_of_one_keeps_serial_mode(tmp_path):
+    agent = _agent(tmp_path)
+    agent.fan_out = 1
+    result = asyncio.run(agent.conduct_research("caching in python"))
+    assert result == {"status": "success", "report": "eindrapport"}
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.learning import brain
+from src.autonomous_agents.learning.lessons_journal import LessonsJournal
+from src.autonomous_agents.learning.simhash import SimHashIndex, hamming, simhash
+
+PATTERN = "Het herbruikbare patroon is het creëren van een interactieve, responsive animatie in één HTML-bestand."
+
+
+def test_similar_texts_have_close_fingerprints():
+    assert simhash(PATTERN) == simhash(PATTERN.upper().replace("creëren", "creeren"))
+    assert hamming(simhash(PATTERN), simhash(PATTERN + " Met neon.")) < hamming(
+        simhash(PATTERN), simhash("Gebruik sqlite3 met een busy timeout voor de takenqueue.")
+    )
+
+
+def test_lsh_finds_every_fingerprint_within_three_bits():
+    rng = random.Random(7)
+    index = SimHashIndex(max_distance=3)
+    stored = [rng.getrandbits(64) for _ in range(500)]
+    for i, fp in enumerate(stored):
+        index.add(i, fp)
+    for i, fp in enumerate(stored[:50]):
+        flipped = fp
+        for bit in rng.sample(range(64), 3):
+            flipped ^= 1 << bit
+        assert index.find(flipped) == i
+    assert index.find(stored[0] ^ 0xFFFF) is None  # 16 bits in één band: te ver
+
+
+def test_group_allows_paraphrases_of_the_same_task():
+    index = SimHashIndex(max_distance=3, group_distance=64)
+    index.add(0, 0, group="matrix")
+    assert index.find(2**64 - 1) is None
+    assert index.find(2**64 - 1, group="matrix") == 0
+
+
+def test_journal_merges_near_duplicates_with_count(tmp_path):
+    journal = LessonsJournal(str(tmp_path / "lessons.json"), compact_every=1000)
+    journal.add_success("WEB: Matrix rain", PATTERN)
+    journal.add_success("WEB: Matrix rain", PATTERN + " ")
+    journal.add_success("SYSTEM: calculator", "Vang deling door nul af met een duidelijke foutmelding.")
+    patterns = journal.get("successful_patterns")
+    assert [p["count"] for p in patterns] == [2, 1]
+
+    # Na herladen (replay van het journal) is het resultaat hetzelfde
+    reloaded = LessonsJournal(str(tmp_path / "lessons.json"), compact_every=1000)
+    assert [p["count"] for p in reloaded.get("successful_patterns")] == [2, 1]
+
+
+def test_global_brain_merges_near_duplicates(tmp_path, monkeypatch):
+    monkeypatch.setattr(brain, "MEMORY_FILE", str(tmp_path / "memory.json"))
+    global_brain = brain.GlobalBrain()
+    global_brain.add_lesson("avoid_errors", "Gebruik geen alert() in games")
+    global_brain.add_lesson("avoid_errors", "gebruik geen alert() in games!")
+    global_brain.add_lesson("avoid_errors", "Schrijf nooit naar __init__.py")
+    assert [e["count"] for e in global_brain.memory["avoid_errors"]] == [2, 1]
+    assert [e["count"] for e in brain.GlobalBrain().memory["avoid_errors"]] == [2, 1]
@@ -0,0 +1,102 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.snapshot_store import SnapshotStore, get_snapshot_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(root=str(tmp_path / "snapshots"), max_snapshots=3, min_age=0)
+
+
+def test_restore_only_touches_snapshotted_files(store, tmp_path):
+    target = tmp_path / "target.py"
+    other = tmp_path / "other.py"
+    target.write_text("original")
+    other.write_text("untouched")
+
+    snapshot_id = store.snapshot([str(target)], label="test")
+    target.write_text("broken")
+    other.write_text("user change")
+
+    restored = store.restore(snapshot_id)
+
+    assert restored == [str(target)]
+    assert target.read_text() == "original"
+    assert other.read_text() == "user change"
+
+
+def test_restore_removes_files_that_did_not_exist(store, tmp_path):
+    new_file = tmp_path / "new.py"
+    snapshot_id = store.snapshot([str(new_file)])
+    new_file.write_text("generated")
+
+    store.restore(snapshot_id)
+
+    assert not new_file.exists()
+
+
+def test_identical_content_is_stored_once(store, tmp_path):
+    a = tmp_path / "a.py"
+    b = tmp_path / "b.py"
+    a.write_text("same")
+    b.write_text("same")
+
+    store.snapshot([str(a), str(b)])
+
+    objects = [f for _, _, files in os.walk(store.objects_dir) for f in files]
+    assert len(objects) == 1
+
+
+def test_history_is_bounded_and_gc_removes_objects(store, tmp_path):
+    target = tmp_path / "target.py"
+    ids = []
+    for i in range(5):
+        target.write_text(f"version {i}")
+        ids.append(store.snapshot([str(target)]))
+
+    assert [entry["id"] for entry in store.index] == ids[-3:]
+    objects = [f for _, _, files in os.walk(store.objects_dir) for f in files]
+    assert len(objects) == 3
+    with pytest.raises(KeyError):
+        store.restore(ids[0])
+
+
+def test_index_survives_reload(store, tmp_path):
+    target = tmp_path / "target.py"
+    target.write_text("v1")
+    snapshot_id = store.snapshot([str(target)])
+    target.write_text("v2")
+
+    reloaded = SnapshotStore(root=store.root)
+    reloaded.restore(snapshot_id)
+
+    assert target.read_text() == "v1"
+
+
+def test_instances_share_the_index_and_gc_keeps_recent_snapshots(tmp_path):
+    root = str(tmp_path / "snapshots")
+    a = SnapshotStore(root=root)
+    b = SnapshotStore(root=root, max_snapshots=3)
+    target = tmp_path / "x.py"
+    target.write_text("original")
+    snapshot_id = a.snapshot([str(target)])
+
+    other = tmp_path / "y.py"
+    for i in range(4):
+        other.write_text(f"version {i}")
+        b.snapshot([str(other)])
+    target.write_text("broken")
+
+    # B's gc ziet A's (jonge) snapshot en laat het object staan
+    a.restore(snapshot_id)
+    assert target.read_text() == "original"
+    assert snapshot_id in {entry["id"] for entry in SnapshotStore(root=root).index}
+
+
+def test_get_snapshot_store_is_shared_per_root(tmp_path):
+    root = str(tmp_path / "snapshots")
+    assert get_snapshot_store(root) is get_snapshot_store(root)
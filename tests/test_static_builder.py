@@ -0,0 +1,71 @@
+import gzip
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.static_builder import StaticSiteBuilder, minify_html
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <!-- comment -->
+    <style>
+      body  {  color : #fff ;  }  /* note */
+    </style>
+  </head>
+  <body>
+    <pre>  keep   this  </pre>
+    <script>
+      // only a comment
+      const a = 1
+      const b = a + 1
+    </script>
+  </body>
+</html>
+"""
+
+
+def test_minify_html_inline_css_and_js():
+    result = minify_html(PAGE)
+    assert "<!-- comment -->" not in result
+    assert "body{color:#fff}" in result
+    assert "<pre>  keep   this  </pre>" in result
+    # Regels blijven gescheiden (automatische puntkomma's)
+    assert "const a = 1\nconst b = a + 1" in result
+    assert "only a comment" not in result
+
+
+@pytest.fixture
+def builder(tmp_path):
+    apps = tmp_path / "apps"
+    apps.mkdir()
+    (apps / "one.html").write_text(PAGE)
+    (apps / "two.html").write_text(PAGE.replace("#fff", "#000"))
+    return StaticSiteBuilder(str(apps), str(tmp_path / "static"))
+
+
+def test_build_emits_minified_gzip_and_manifest(builder):
+    summary = builder.build()
+    assert summary["built"] == ["one.html", "two.html"]
+
+    entry = builder.manifest["one.html"]
+    assert len(entry["hash"]) == 16
+    with open(entry["path"], "rb") as f:
+        minified = f.read()
+    with open(entry["gz"], "rb") as f:
+        assert gzip.decompress(f.read()) == minified
+    assert entry["size"] < entry["source_size"]
+
+
+def test_build_is_incremental(builder, tmp_path):
+    builder.build()
+    assert builder.build()["unchanged"] == ["one.html", "two.html"]
+
+    (tmp_path / "apps" / "one.html").write_text(PAGE.replace("keep", "changed"))
+    os.remove(tmp_path / "apps" / "two.html")
+    reloaded = StaticSiteBuilder(str(tmp_path / "apps"), str(tmp_path / "static"))
+    summary = reloaded.build()
+    assert summary == {"built": ["one.html"], "unchanged": [], "removed": ["two.html"]}
+    assert not os.path.exists(tmp_path / "static" / "apps" / "two.html")
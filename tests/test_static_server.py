@@ -0,0 +1,135 @@
+import asyncio
+import gzip
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.static_builder import StaticSiteBuilder
+from src.autonomous_agents.execution.static_server import StaticServer, parse_range
+
+PAGE = "<!DOCTYPE html>\n<html>\n  <body>\n    <h1>Hallo</h1>\n  </body>\n</html>\n"
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "apps").mkdir()
+    (tmp_path / "apps" / "demo.html").write_text(PAGE)
+    (tmp_path / "data" / "images").mkdir(parents=True)
+    (tmp_path / "data" / "images" / "pic.jpg").write_bytes(bytes(range(256)) * 8)
+    (tmp_path / "data" / "output").mkdir()
+    (tmp_path / "data" / "output" / "report.md").write_text("# Report\n" * 50)
+    StaticSiteBuilder(str(tmp_path / "apps"), str(tmp_path / "data" / "static")).build()
+    return tmp_path
+
+
+async def _request(port, path, **headers):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {path} HTTP/1.1", "Host: test", "Connection: close"]
+    lines += [f"{k.replace('_', '-')}: {v}" for k, v in headers.items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    parsed = {k.lower(): v for k, v in (line.split(": ", 1) for line in header_lines)}
+    return int(status_line.split()[1]), parsed, body
+
+
+def _run(site, scenario):
+    async def main():
+        server = StaticServer(root=str(site), static_dir="data/static")
+        await server.start("127.0.0.1", 0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            return await scenario(port)
+        finally:
+            server.server.close()
+            await server.server.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=200-300", 100)
+
+
+def test_app_served_precompressed_with_etag_and_304(site):
+    async def scenario(port):
+        status, headers, body = await _request(port, "/apps/demo.html", Accept_Encoding="gzip")
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body).startswith(b"<!DOCTYPE html><html><body><h1>Hallo</h1>")
+
+        status, not_modified, body = await _request(
+            port, "/apps/demo.html", Accept_Encoding="gzip", If_None_Match=headers["etag"]
+        )
+        assert status == 304 and body == b""
+        assert "content-length" not in not_modified
+
+        status, headers, body = await _request(port, "/apps/demo.html")
+        assert "content-encoding" not in headers
+        assert body.startswith(b"<!DOCTYPE html>")
+
+    _run(site, scenario)
+
+
+def test_range_request_on_image(site):
+    async def scenario(port):
+        status, headers, body = await _request(port, "/images/pic.jpg", Range="bytes=10-19")
+        assert status == 206
+        assert headers["content-range"] == "bytes 10-19/2048"
+        assert body == bytes(range(10, 20))
+
+        status, headers, _ = await _request(port, "/images/pic.jpg", Range="bytes=5000-")
+        assert status == 416
+
+    _run(site, scenario)
+
+
+def test_output_is_gzipped_on_the_fly_and_traversal_blocked(site):
+    async def scenario(port):
+        status, headers, body = await _request(port, "/output/report.md", Accept_Encoding="gzip, br")
+        assert status == 200 and headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body).startswith(b"# Report")
+
+        status, _, _ = await _request(port, "/output/../../etc/passwd")
+        assert status == 404
+
+    _run(site, scenario)
+
+
+def test_handler_error_answers_500(site, monkeypatch):
+    async def boom(self, method, target, headers):
+        raise OSError("disk weg")
+
+    monkeypatch.setattr(StaticServer, "handle_request", boom)
+
+    async def scenario(port):
+        status, _, body = await _request(port, "/apps/demo.html")
+        assert status == 500 and body == b""
+
+    _run(site, scenario)
+
+
+def test_keep_alive_request_body_is_drained(site):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        request = "GET /output/report.md HTTP/1.1\r\nHost: test\r\n"
+        writer.write((request + "Content-Length: 5\r\n\r\nhallo" + request + "\r\n").encode())
+        statuses = []
+        for _ in range(2):
+            head = (await reader.readuntil(b"\r\n\r\n")).decode()
+            length = int(head.lower().split("content-length: ")[1].split("\r\n")[0])
+            await reader.readexactly(length)
+            statuses.append(int(head.split()[1]))
+        writer.close()
+        return statuses
+
+    assert _run(site, scenario) == [200, 200]
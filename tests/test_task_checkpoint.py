@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.database.schema import init_db
+from src.autonomous_agents.execution.task_checkpoint import TaskCheckpointStore
+from src.autonomous_agents.execution.task_queue import TaskQueue
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "tasks.db"))
+    init_db()
+
+
+def test_checkpoint_roundtrip_and_clear(database):
+    store = TaskCheckpointStore()
+    store.save(7, "BackendSquad", "tested", {"code": "x = 1", "attempt": 2, "last_output": "boom"})
+    store.save(7, "BackendSquad", "healed", {"code": "x = 2", "attempt": 3})
+
+    state = store.load(7, "BackendSquad")
+    assert state == {"stage": "healed", "code": "x = 2", "attempt": 3}
+    assert store.load(7, "FrontendSquad") is None
+
+    store.clear(7, "BackendSquad")
+    assert store.load(7, "BackendSquad") is None
+
+
+def test_without_task_id_nothing_is_stored(database):
+    store = TaskCheckpointStore()
+    store.save(None, "BackendSquad", "built", {"code": "x"})
+    assert store.load(None, "BackendSquad") is None
+
+
+def test_requeue_stale_processing_tasks(database):
+    queue = TaskQueue()
+    first = queue.add_task("SYSTEM: first")
+    queue.add_task("SYSTEM: second")
+    assert queue.get_next_pending_task()["id"] == first
+
+    # Crash: 'first' blijft op 'processing' staan
+    assert queue.requeue_stale_tasks() == 1
+    assert queue.get_next_pending_task()["id"] == first
+
+
+def _architect(tmp_path):
+    from src.autonomous_agents.execution.feature_architect import FeatureArchitect
+    from src.autonomous_agents.execution.snapshot_store import SnapshotStore
+
+    architect = FeatureArchitect()
+    architect.snapshots = SnapshotStore(root=str(tmp_path / "snapshots"))
+    return architect
+
+
+def test_resume_after_passing_tests_does_not_heal_again(database, tmp_path):
+    architect = _architect(tmp_path)
+    architect.checkpoints.save(
+        9, architect.name, "tested",
+        {"target_file": "src/playground/calc.py", "code": "x = 1", "attempt": 1, "passed": True, "last_output": "1 passed"},
+    )
+
+    async def must_not_run(*args, **kwargs):
+        raise AssertionError("geslaagde taak opnieuw uitgevoerd")
+
+    architect._functional_self_healing = must_not_run
+    architect._generate_and_run_tests = must_not_run
+
+    result = asyncio.run(architect.build_feature("SYSTEM: calc.py", workdir=str(tmp_path), task_id=9))
+    assert result["tests_passed"] is True
+    assert (tmp_path / "src" / "playground" / "calc.py").read_text() == "x = 1"
+    assert architect.checkpoints.load(9, architect.name) is None
+
+
+def test_checkpoint_is_cleared_when_build_raises(database, tmp_path):
+    architect = _architect(tmp_path)
+    architect.checkpoints.save(
+        10, architect.name, "healed",
+        {"target_file": "src/playground/calc.py", "code": "x = 1", "attempt": 2},
+    )
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("validator crashed")
+
+    architect.validator.validate = broken
+    with pytest.raises(RuntimeError):
+        asyncio.run(architect.build_feature("SYSTEM: calc.py", workdir=str(tmp_path), task_id=10))
+    assert architect.checkpoints.load(10, architect.name) is None
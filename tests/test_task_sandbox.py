@@ -0,0 +1,137 @@
+import asyncio
+import os
+import subprocess
+import sys
+from collections import deque
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.task_sandbox import TaskSandbox
+from src.autonomous_agents.master_orchestrator import TermuxMasterOrchestrator
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q")
+    _git(path, "config", "user.email", "test@example.com")
+    _git(path, "config", "user.name", "Test")
+    (path / "calc.py").write_text("def add(a, b):\n    return a + b\n")
+    _git(path, "add", ".")
+    _git(path, "commit", "-q", "-m", "init")
+    return path
+
+
+def _sandbox(repo, tmp_path, task_id):
+    return TaskSandbox(task_id, repo_path=str(repo), sandbox_root=str(tmp_path / "sandboxes"))
+
+
+def test_clean_merge_applies_sandbox_changes_and_cleans_up(repo, tmp_path):
+    async def scenario():
+        async with _sandbox(repo, tmp_path, 1) as sandbox:
+            path = sandbox.path
+            with open(os.path.join(path, "calc.py"), "a") as f:
+                f.write("\n\ndef sub(a, b):\n    return a - b\n")
+            with open(os.path.join(path, "new.py"), "w") as f:
+                f.write("x = 1\n")
+            merge = await sandbox.merge_back()
+        return merge, path
+
+    merge, path = asyncio.run(scenario())
+    assert merge["status"] == "merged"
+    assert sorted(merge["files"]) == ["calc.py", "new.py"]
+    assert "def sub" in (repo / "calc.py").read_text()
+    assert (repo / "new.py").read_text() == "x = 1\n"
+    assert not os.path.exists(path)
+
+
+def test_merge_keeps_trailing_blank_context_line(repo, tmp_path):
+    source = "import os\n\nVALUE = 1\nA = 1\nB = 2\n\ndef run():\n    return VALUE\n"
+    (repo / "m.py").write_text(source)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "m")
+
+    async def scenario():
+        async with _sandbox(repo, tmp_path, 3) as sandbox:
+            # De hunk eindigt op een lege contextregel
+            with open(os.path.join(sandbox.path, "m.py"), "w") as f:
+                f.write(source.replace("VALUE = 1", "VALUE = 2"))
+            return await sandbox.merge_back()
+
+    merge = asyncio.run(scenario())
+    assert merge["status"] == "merged", merge
+    assert (repo / "m.py").read_text() == source.replace("VALUE = 1", "VALUE = 2")
+
+
+def test_run_squad_maps_result_file_to_repo(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(repo)
+    orchestrator = object.__new__(TermuxMasterOrchestrator)
+
+    async def build(title, workdir, task_id):
+        path = os.path.join(workdir, "calc.py")
+        with open(path, "a") as f:
+            f.write("\n\ndef mul(a, b):\n    return a * b\n")
+        return {"success": True, "file": path}
+
+    result = asyncio.run(orchestrator._run_squad(build, "mul", 4, isolated=True))
+    assert result["file"] == os.path.join(os.path.realpath(repo), "calc.py")
+    assert result["merge"]["status"] == "merged"
+
+
+def test_conflicting_merge_leaves_main_tree_untouched(repo, tmp_path):
+    async def scenario():
+        async with _sandbox(repo, tmp_path, 2) as sandbox:
+            with open(os.path.join(sandbox.path, "calc.py"), "w") as f:
+                f.write("def add(a, b):\n    return b + a\n")
+            # Intussen wijzigt een andere taak dezelfde regel in de hoofdmap
+            (repo / "calc.py").write_text("def add(a, b):\n    return sum((a, b))\n")
+            return await sandbox.merge_back()
+
+    merge = asyncio.run(scenario())
+    assert merge["status"] == "conflict"
+    assert merge["conflicts"] == ["calc.py"]
+    assert (repo / "calc.py").read_text() == "def add(a, b):\n    return sum((a, b))\n"
+
+
+def test_parallel_cycle_never_exceeds_max_parallel():
+    orchestrator = object.__new__(TermuxMasterOrchestrator)
+    orchestrator.max_parallel_tasks = 2
+    orchestrator.active_tasks = set()
+    orchestrator.claimed_tasks = deque()
+    started = []
+
+    class Listener:
+        async def check_for_orders(self):
+            # Eén poll levert drie taken op
+            return {"status": "new_tasks", "tasks": [{"id": i} for i in range(3)]}
+
+    async def execute(task, isolated=False):
+        started.append(task["id"])
+        await orchestrator.release.wait()
+
+    orchestrator.listener = Listener()
+    orchestrator._execute_task = execute
+
+    async def scenario():
+        orchestrator.release = asyncio.Event()
+        await orchestrator._run_parallel_cycle()
+        await asyncio.sleep(0)
+        assert started == [0, 1]
+        assert [t["id"] for t in orchestrator.claimed_tasks] == [2]
+        orchestrator.release.set()
+        await asyncio.gather(*orchestrator.active_tasks)
+        # Volgende cyclus: eerst de al geclaimde taak
+        orchestrator.release = asyncio.Event()
+        await orchestrator._run_parallel_cycle()
+        await asyncio.sleep(0)
+        assert started[2] == 2
+        orchestrator.release.set()
+        await asyncio.gather(*orchestrator.active_tasks)
+
+    asyncio.run(scenario())
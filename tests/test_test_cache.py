@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.analysis.code_index import interface_signature
+from src.autonomous_agents.validation.test_cache import GeneratedTestCache
+
+V1 = "def add(a, b):\n    return a - b\n\n\ndef _helper():\n    return 1\n"
+V2 = "def add(a, b):\n    return a + b\n\n\ndef _helper():\n    return 2\n"
+V3 = "def add(a, b, c=0):\n    return a + b + c\n"
+
+
+def test_interface_ignores_bodies_and_private_helpers():
+    assert interface_signature(V1) == interface_signature(V2) == "def add(a, b)"
+    assert interface_signature(V3) != interface_signature(V1)
+    assert interface_signature("def broken(:") is None
+
+
+def test_cache_reuses_tests_while_interface_is_unchanged(tmp_path):
+    cache = GeneratedTestCache(cache_file=str(tmp_path / "tests.json"))
+    cache.put("src/playground/adder.py", V1, "def test_add(): ...")
+    assert cache.get("src/playground/adder.py", V2) == "def test_add(): ..."
+    assert cache.get("src/playground/adder.py", V3) is None
+    assert cache.get("src/playground/other.py", V2) is None
+
+    reloaded = GeneratedTestCache(cache_file=str(tmp_path / "tests.json"))
+    assert reloaded.get("src/playground/adder.py", V2) == "def test_add(): ..."
+
+
+def test_unverified_tests_are_dropped_after_repeated_failures(tmp_path):
+    cache = GeneratedTestCache(cache_file=str(tmp_path / "tests.json"))
+    cache.put("adder.py", V1, "bad test")
+    cache.record_result("adder.py", V1, passed=False)
+    assert cache.get("adder.py", V2) == "bad test"
+    cache.record_result("adder.py", V2, passed=False)
+    assert cache.get("adder.py", V2) is None
+
+    cache.put("adder.py", V1, "good test")
+    cache.record_result("adder.py", V1, passed=True)
+    for _ in range(3):
+        cache.record_result("adder.py", V2, passed=False)
+    assert cache.get("adder.py", V2) == "good test"
+
+
+def test_new_instruction_with_same_interface_gets_new_tests(tmp_path):
+    cache = GeneratedTestCache(cache_file=str(tmp_path / "tests.json"))
+    cache.put("calc.py", V1, "old behaviour test", instruction="Maak een calculator")
+    cache.record_result("calc.py", V1, passed=True, instruction="Maak een calculator")
+    assert cache.get("calc.py", V2, instruction="Maak een calculator") == "old behaviour test"
+    assert cache.get("calc.py", V2, instruction="Laat divide None teruggeven i.p.v. te raisen") is None
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.validation.test_worker_pool import TestWorkerPool
+
+PASSING = "def test_ok():\n    assert 1 + 1 == 2\n"
+FAILING = "def test_broken():\n    assert 1 + 1 == 3\n"
+HANGING = "import time\n\n\ndef test_hangs():\n    time.sleep(60)\n"
+
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="zygotes hebben os.fork nodig")
+
+
+def _write(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(source)
+    return str(path)
+
+
+def _run(pool, *runs):
+    async def scenario():
+        try:
+            return [await pool.run(path, cwd=cwd, timeout=timeout) for path, cwd, timeout in runs]
+        finally:
+            await pool.close()
+
+    return asyncio.run(scenario())
+
+
+@needs_fork
+def test_zygote_reports_pass_and_fail(tmp_path):
+    pool = TestWorkerPool(size=1)
+    ok, broken = _run(
+        pool,
+        (_write(tmp_path, "test_ok.py", PASSING), tmp_path, 30),
+        (_write(tmp_path, "test_broken.py", FAILING), tmp_path, 30),
+    )
+    assert pool.enabled
+    assert ok["passed"] and ok["returncode"] == 0 and not ok["timed_out"]
+    assert not broken["passed"] and broken["returncode"] == 1
+    assert "1 failed" in broken["output"]
+
+
+@needs_fork
+def test_timeout_kills_only_the_child(tmp_path):
+    pool = TestWorkerPool(size=1)
+    pids = []
+
+    async def scenario():
+        try:
+            await pool.start()
+            pids.append(pool._idle._queue[0].pid)
+            hung = await pool.run(_write(tmp_path, "test_hang.py", HANGING), cwd=tmp_path, timeout=1)
+            pids.append(pool._idle._queue[0].pid)
+            ok = await pool.run(_write(tmp_path, "test_ok.py", PASSING), cwd=tmp_path, timeout=30)
+            return hung, ok
+        finally:
+            await pool.close()
+
+    hung, ok = asyncio.run(scenario())
+    assert hung["timed_out"] and not hung["passed"]
+    assert "TIMEOUT" in hung["output"]
+    assert hung["duration"] < 10
+    assert pids[0] == pids[1]  # Zygote bleef warm
+    assert ok["passed"]
+
+
+def test_falls_back_to_plain_pytest_without_fork(tmp_path, monkeypatch):
+    monkeypatch.delattr(os, "fork", raising=False)
+    pool = TestWorkerPool(size=1)
+    assert not pool.enabled
+    ok, broken = _run(
+        pool,
+        (_write(tmp_path, "test_ok.py", PASSING), tmp_path, 60),
+        (_write(tmp_path, "test_broken.py", FAILING), tmp_path, 60),
+    )
+    assert ok["passed"]
+    assert not broken["passed"] and broken["returncode"] == 1
+    assert pool._idle is None  # Geen zygotes gestart
+
+
+def test_plain_pytest_timeout_is_killed(tmp_path, monkeypatch):
+    monkeypatch.delattr(os, "fork", raising=False)
+    (hung,) = _run(TestWorkerPool(size=1), (_write(tmp_path, "test_hang.py", HANGING), tmp_path, 1))
+    assert hung["timed_out"] and not hung["passed"]
+    assert hung["duration"] < 10
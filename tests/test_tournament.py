@@ -0,0 +1,71 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+sys.path.append(os.getcwd())
+from src.autonomous_agents.execution.feature_architect import FeatureArchitect
+
+
+class StubAI:
+    """Elke nieuwe kandidaat krijgt een eigen versie van de code."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_text(self, prompt):
+        self.calls += 1
+        return f"```python\nVALUE = {self.calls}\n```"
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+def test_first_passing_candidate_wins_and_losers_are_cleaned_up(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src" / "playground").mkdir(parents=True)
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "test@example.com")
+    _git(repo, "config", "user.name", "Test")
+    (repo / "README.md").write_text("repo\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+
+    architect = FeatureArchitect()
+    architect.ai = StubAI()
+    architect.tournament_size = 3
+    sandboxes = {}
+    cancelled = []
+
+    async def valid(code, target_file, workdir):
+        return True, None
+
+    async def fake_tests(code, target_file, workdir=".", instruction=""):
+        sandboxes[code] = workdir
+        if code == "VALUE = 0":
+            return False, "1 failed"  # Kandidaat 0: faalt
+        if code == "VALUE = 1":
+            await asyncio.sleep(0.05)
+            return True, "1 passed"  # Eerste die slaagt
+        try:
+            await asyncio.sleep(30)  # Te traag: moet geannuleerd worden
+        except asyncio.CancelledError:
+            cancelled.append(code)
+            raise
+        return True, "1 passed"
+
+    architect.validator.validate = valid
+    architect._generate_and_run_tests = fake_tests
+    target = str(repo / "src" / "playground" / "value.py")
+
+    winner, finished = asyncio.run(
+        architect._run_tournament("VALUE = 0", "SYSTEM: value", target, "", str(repo))
+    )
+
+    assert winner["code"] == "VALUE = 1"
+    assert [c["code"] for c in finished] == ["VALUE = 0", "VALUE = 1"]
+    assert cancelled == ["VALUE = 2"]
+    assert len(sandboxes) == 3
+    assert not any(os.path.exists(path) for path in sandboxes.values())
+    assert _git(repo, "worktree", "list").count("\n") == 1  # Alleen de hoofd-worktree